@@ -0,0 +1,239 @@
+# benchmarks/bench_core.py - tempo e pico de memória das funções centrais (geoprocessamento, score e PDF)
+"""
+Uso:
+    python -m benchmarks.bench_core                                  # 1e3 a 1e6, grava JSON em benchmarks/resultados/
+    python -m benchmarks.bench_core --sizes 1000 10000 --casos pois_to_gdf create_buffers
+    python -m benchmarks.bench_core --sizes 1000 10000 100000 --salvar-baseline   # resultado vira o baseline
+    python -m benchmarks.bench_core --sizes 1000 10000 100000 --limite 0.2
+
+Cada caso roda sobre dados sintéticos de São Paulo (pontos uniformes na mancha
+urbana; setores censitários numa grade de `--setores` x `--setores` células).
+A preparação da entrada fica fora da medição. Para cada caso e tamanho:
+
+- tempo: menor de `--repeticoes` execuções (perf_counter), após uma
+  execução de aquecimento;
+- pico de memória: uma execução extra sob `tracemalloc` (alocações Python e
+  numpy; a memória interna do GEOS não entra).
+
+Cada (caso, tamanho) presente no resultado e no baseline (`--baseline`; por
+padrão `benchmarks/baseline.json`, se existir) é comparado, e a saída termina
+com código 1 se o tempo ou o pico passarem do baseline por mais de `--limite`
+(0.2 = 20%). Casos abaixo de `--tempo-minimo` segundos ou de `--pico-minimo`
+MB nos dois arquivos não contam como regressão daquela grandeza (ruído de
+medição).
+
+O `benchmarks/baseline.json` versionado foi gerado com 1e3, 1e4 e 1e5 pontos.
+Em CI, gere o baseline na mesma máquina do job (os tempos dependem do
+hardware) e compare o branch contra ele:
+
+    git checkout <branch base> && python -m benchmarks.bench_core --sizes 1000 10000 100000 --salvar-baseline
+    git checkout <branch do PR> && python -m benchmarks.bench_core --sizes 1000 10000 100000
+
+`create_pdf_report` usa `src.report.build_pdf_report` sem gráficos e sem
+anexo: o tamanho é o nº de campanhas agregadas (o anexo tem benchmark
+próprio em `bench_pdf_appendix`).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data import generate_report_data
+from src.geoprocess import create_buffers, pois_to_gdf, spatial_join_population
+from src.report import build_pdf_report
+from src.scoring import compute_score
+
+SP_BBOX = (-23.75, -46.80, -23.40, -46.40)  # lat mín, lon mín, lat máx, lon máx
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+# -------------------------------
+# DADOS SINTÉTICOS
+# -------------------------------
+def synthetic_points(n: int, seed: int = 42) -> pd.DataFrame:
+    """Pontos uniformes em São Paulo com as colunas usadas por `compute_score`."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(n),
+        'lat': rng.uniform(SP_BBOX[0], SP_BBOX[2], n),
+        'lon': rng.uniform(SP_BBOX[1], SP_BBOX[3], n),
+        'pop_500m': rng.integers(0, 40_000, n),
+        'avg_bus_count': rng.gamma(2.0, 6.0, n),
+        'pib_percapita': rng.normal(60_000, 15_000, n),
+    })
+
+
+def synthetic_tracts(cells: int = 100, seed: int = 7):
+    """Grade `cells` x `cells` de setores retangulares cobrindo São Paulo, com população."""
+    import geopandas as gpd
+    import shapely
+
+    lat = np.linspace(SP_BBOX[0], SP_BBOX[2], cells + 1)
+    lon = np.linspace(SP_BBOX[1], SP_BBOX[3], cells + 1)
+    x0, y0 = np.meshgrid(lon[:-1], lat[:-1])
+    x1, y1 = np.meshgrid(lon[1:], lat[1:])
+    boxes = shapely.box(x0.ravel(), y0.ravel(), x1.ravel(), y1.ravel())
+    pop = np.random.default_rng(seed).integers(200, 3_000, boxes.size)
+    return gpd.GeoDataFrame({'pop': pop}, geometry=boxes, crs='EPSG:4326')
+
+
+# -------------------------------
+# CASOS: preparação (fora da medição) -> função medida
+# -------------------------------
+def _case_pois_to_gdf(n: int, args) -> Callable[[], object]:
+    df = synthetic_points(n)
+    return lambda: pois_to_gdf(df)
+
+
+def _case_create_buffers(n: int, args) -> Callable[[], object]:
+    gdf = pois_to_gdf(synthetic_points(n))
+    return lambda: create_buffers(gdf, radius_m=500)
+
+
+def _case_spatial_join(n: int, args) -> Callable[[], object]:
+    buffers = create_buffers(pois_to_gdf(synthetic_points(n)), radius_m=500)
+    tracts = synthetic_tracts(args.setores)
+    return lambda: spatial_join_population(buffers, tracts)
+
+
+def _case_compute_score(n: int, args) -> Callable[[], object]:
+    df = synthetic_points(n)
+    return lambda: compute_score(df.copy())
+
+
+def _case_pdf_report(n: int, args) -> Callable[[], object]:
+    df = generate_report_data(n)
+    return lambda: build_pdf_report(df, 'Dez', 0.25, charts=False)
+
+
+CASES: Dict[str, Callable] = {
+    'pois_to_gdf': _case_pois_to_gdf,
+    'create_buffers': _case_create_buffers,
+    'spatial_join_population': _case_spatial_join,
+    'compute_score': _case_compute_score,
+    'create_pdf_report': _case_pdf_report,
+}
+
+
+# -------------------------------
+# MEDIÇÃO
+# -------------------------------
+def measure(fn: Callable[[], object], repeats: int) -> Tuple[float, float]:
+    """(menor tempo em s, pico de memória em MB)."""
+    fn()  # aquecimento: importações tardias (geopandas, fpdf) e caches fora da medição
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak / 1e6
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def run(cases: List[str], sizes: List[int], args) -> dict:
+    results = []
+    print(f"{'caso':<24} | {'n':>9} | {'tempo (s)':>9} | {'pico (MB)':>9}")
+    print("-" * 61)
+    for case in cases:
+        for n in sizes:
+            fn = CASES[case](n, args)
+            wall, peak = measure(fn, args.repeticoes)
+            results.append({'caso': case, 'n': n, 'tempo_s': round(wall, 6), 'pico_mb': round(peak, 3)})
+            print(f"{case:<24} | {n:>9,} | {wall:>9.3f} | {peak:>9.1f}")
+            del fn
+    return {
+        'meta': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'repeticoes': args.repeticoes,
+            'setores': args.setores ** 2,
+        },
+        'resultados': results,
+    }
+
+
+def compare(current: dict, baseline: dict, limit: float, min_time: float = 0.0, min_peak: float = 0.0) -> List[dict]:
+    """Razões atual/baseline por (caso, n); `regressao` quando tempo ou pico passam de 1 + limit."""
+    base = {(r['caso'], r['n']): r for r in baseline['resultados']}
+    rows = []
+    for r in current['resultados']:
+        b = base.get((r['caso'], r['n']))
+        if b is None:
+            continue
+        t_ratio = r['tempo_s'] / b['tempo_s'] if b['tempo_s'] > 0 else float('inf')
+        m_ratio = r['pico_mb'] / b['pico_mb'] if b['pico_mb'] > 0 else 1.0
+        slow = t_ratio > 1 + limit and max(r['tempo_s'], b['tempo_s']) >= min_time
+        heavy = m_ratio > 1 + limit and max(r['pico_mb'], b['pico_mb']) >= min_peak
+        rows.append({'caso': r['caso'], 'n': r['n'], 'tempo': t_ratio, 'pico': m_ratio,
+                     'regressao': slow or heavy})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--casos', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--setores', type=int, default=100, help='lado da grade de setores censitários')
+    parser.add_argument('--saida', help='arquivo JSON do resultado (padrão: benchmarks/resultados/<data>.json)')
+    parser.add_argument('--baseline', default=BASELINE_PATH if os.path.exists(BASELINE_PATH) else None,
+                        help='JSON de referência para comparação (padrão: benchmarks/baseline.json, se existir)')
+    parser.add_argument('--limite', type=float, default=0.2, help='piora tolerada (0.2 = 20%%)')
+    parser.add_argument('--tempo-minimo', type=float, default=0.05, help='s; abaixo disso o tempo não acusa regressão')
+    parser.add_argument('--pico-minimo', type=float, default=1.0, help='MB; abaixo disso o pico não acusa regressão')
+    parser.add_argument('--salvar-baseline', action='store_true', help=f'grava o resultado também em {BASELINE_PATH}')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore', DeprecationWarning)
+
+    result = run(args.casos, args.sizes, args)
+
+    out = args.saida or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    targets = [out] + ([BASELINE_PATH] if args.salvar_baseline else [])
+    for path in targets:
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(result, fh, ensure_ascii=False, indent=2)
+    print(f"\nResultado: {', '.join(targets)}")
+
+    if args.baseline and not args.salvar_baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        rows = compare(result, baseline, args.limite, args.tempo_minimo, args.pico_minimo)
+        print(f"\nComparação com {args.baseline} (commit {baseline['meta'].get('commit') or '?'}), limite +{args.limite:.0%}")
+        print(f"{'caso':<24} | {'n':>9} | {'tempo':>7} | {'pico':>7} |")
+        print("-" * 60)
+        for r in rows:
+            flag = 'REGRESSÃO' if r['regressao'] else ''
+            print(f"{r['caso']:<24} | {r['n']:>9,} | {r['tempo']:>6.2f}x | {r['pico']:>6.2f}x | {flag}")
+        if any(r['regressao'] for r in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
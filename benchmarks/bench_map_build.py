@@ -0,0 +1,86 @@
+# benchmarks/bench_map_build.py - tempo de montagem do mapa e tamanho do HTML (marcadores vs. GeoJSON)
+"""
+Uso:
+    python -m benchmarks.bench_map_build --sizes 1000 10000 100000
+
+Compara o caminho antigo (um `folium.CircleMarker` com popup por linha via
+`iterrows`) com o builder vetorizado de `src.maplayers` (um GeoJson por camada).
+O caminho antigo é limitado por `--legacy-max`, pois fica impraticável em 100k.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import folium
+
+from src.maplayers import poi_feature_collections, poi_layer_groups
+
+
+def synthetic_pois(n: int, seed: int = 42) -> pd.DataFrame:
+    """POIs aleatórios na mancha urbana de São Paulo (metade ônibus, metade outdoors)."""
+    rng = np.random.default_rng(seed)
+    is_bus = rng.random(n) < 0.5
+    return pd.DataFrame({
+        'id': np.arange(n),
+        'lat': rng.uniform(-23.75, -23.40, n),
+        'lon': rng.uniform(-46.80, -46.40, n),
+        'highway': np.where(is_bus, 'bus_stop', None),
+        'advertising': np.where(is_bus, None, 'billboard'),
+        'name': [f'POI {i}' for i in range(n)],
+    })
+
+
+def build_legacy(df: pd.DataFrame) -> folium.Map:
+    """Reproduz o loop original da página de mapa (um marcador por linha)."""
+    m = folium.Map(location=[-23.55, -46.63], zoom_start=12, tiles="CartoDB positron")
+    for poi_type in ['bus_stop', 'billboard']:
+        group = folium.FeatureGroup(name=poi_type).add_to(m)
+        subset = df[(df.get("advertising") == poi_type) | (df.get("highway") == poi_type)]
+        for _, r in subset.iterrows():
+            color = "green" if r.get("highway") == "bus_stop" else "red"
+            folium.CircleMarker(
+                location=[r.lat, r.lon], radius=5, color=color, fill=True, fill_color=color, fill_opacity=0.8, weight=2,
+                popup=folium.Popup(f"<b>{poi_type.replace('_', ' ').title()}</b><br>Nome: {r.get('name', 'N/A')}", max_width=300)
+            ).add_to(group)
+    return m
+
+
+def build_geojson(df: pd.DataFrame) -> folium.Map:
+    """Caminho novo: um FeatureCollection por camada."""
+    m = folium.Map(location=[-23.55, -46.63], zoom_start=12, tiles="CartoDB positron")
+    for group in poi_layer_groups(poi_feature_collections(df, ['bus_stop', 'billboard'])):
+        group.add_to(m)
+    return m
+
+
+def measure(builder, df: pd.DataFrame) -> dict:
+    """Mede montagem + renderização do HTML (o que o st_folium envia ao navegador)."""
+    t0 = time.perf_counter()
+    m = builder(df)
+    t1 = time.perf_counter()
+    html = m.get_root().render()
+    t2 = time.perf_counter()
+    return {'build_s': t1 - t0, 'render_s': t2 - t1, 'html_mb': len(html.encode('utf-8')) / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--legacy-max', type=int, default=10_000, help='maior tamanho medido no caminho antigo')
+    args = parser.parse_args()
+
+    print(f"{'pontos':>8} | {'método':<8} | {'montagem (s)':>12} | {'render (s)':>10} | {'HTML (MB)':>9}")
+    print("-" * 60)
+    for n in args.sizes:
+        df = synthetic_pois(n)
+        methods = [('geojson', build_geojson)]
+        if n <= args.legacy_max:
+            methods.insert(0, ('legacy', build_legacy))
+        for name, builder in methods:
+            r = measure(builder, df)
+            print(f"{n:>8,} | {name:<8} | {r['build_s']:>12.3f} | {r['render_s']:>10.3f} | {r['html_mb']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_pdf_appendix.py - tempo e pico de memória do anexo do PDF conforme o nº de campanhas
+"""
+Uso:
+    python -m benchmarks.bench_pdf_appendix --sizes 1000 10000 50000
+
+Compara uma tabela montada célula a célula (`iterrows` + um `pdf.cell` por
+campo, como na seção 7 do relatório) com `src.report.write_appendix` (blocos
+formatados por coluna, uma linha de texto por campanha). O pico de memória é
+medido com `tracemalloc` e inclui o `pdf.output()`.
+"""
+import argparse
+import time
+import tracemalloc
+import warnings
+
+from fpdf import FPDF
+
+from src.report import APPENDIX_COLUMNS, generate_report_data, write_appendix
+
+
+def build_legacy(df) -> bytes:
+    """Tabela célula a célula, com quebra de página automática do FPDF."""
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", "", 7)
+    widths = [18, 15, 20, 20, 20, 20, 20, 20]
+    for _, row in df.sort_values(by='Investimento_Mil_R$', ascending=False).iterrows():
+        for (col, _, _, fmt), w in zip(APPENDIX_COLUMNS, widths):
+            text = str(row[col]) if fmt is None else fmt % row[col]
+            pdf.cell(w, 5, text, 1, 0, "L" if fmt is None else "R")
+        pdf.ln()
+    return bytes(pdf.output())
+
+
+def build_appendix(df) -> bytes:
+    pdf = FPDF()
+    write_appendix(pdf, df)
+    return bytes(pdf.output())
+
+
+def measure(builder, df) -> dict:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = builder(df)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'s': elapsed, 'peak_mb': peak / 1e6, 'pdf_mb': len(out) / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--legacy-max', type=int, default=10_000, help='maior tamanho medido no caminho antigo')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore', DeprecationWarning)
+
+    print(f"{'linhas':>8} | {'método':<8} | {'tempo (s)':>9} | {'pico (MB)':>9} | {'PDF (MB)':>8}")
+    print("-" * 56)
+    for n in args.sizes:
+        df = generate_report_data(n)
+        methods = [('anexo', build_appendix)]
+        if n <= args.legacy_max:
+            methods.insert(0, ('legacy', build_legacy))
+        for name, builder in methods:
+            r = measure(builder, df)
+            print(f"{n:>8,} | {name:<8} | {r['s']:>9.2f} | {r['peak_mb']:>9.1f} | {r['pdf_mb']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,59 +1,96 @@
 # pages/1_Mapa_Interativo.py
+import time
 import streamlit as st
 import pandas as pd
 import folium
-from folium.plugins import MarkerCluster, HeatMap
+from folium.plugins import HeatMap
 from folium import FeatureGroup, LayerControl
 from streamlit_folium import st_folium
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError 
+from src.fetchers import fetch_pois_overpass
+from src.geoprocess import pois_to_gdf, create_buffers
+from src.clustering import GridClusterer, bounds_from_center
+from src.viewport import TileCache, tiles_for_bounds, neighbor_tiles, MAX_VIEW_TILES
+from src.heatmap import bin_heatmap, HEAT_CELL_PX
+from src.maplayers import poi_feature_collections, cluster_feature_collection, poi_layer_groups, cluster_layer_group
+from src.gazetteer import Gazetteer
+from src.utils import set_page_config_and_style, get_secret, span, render_debug_panel
 
 # -------------------------------
 # CONFIGURAÇÕES DE PERFORMANCE E CONSTANTES
 # -------------------------------
-MAX_POINTS = 1000        # limite de POIs exibidos
-DELTA_DEG = 0.01         # ~1 km em cada direção (para a bbox do Overpass)
+CLUSTER_RADIUS_PX = 64   # raio (px) das células de cluster calculadas no servidor
+DEBOUNCE_S = 0.4         # espera antes de buscar tiles de um novo enquadramento
 MAX_BUFFERS = 30         # evita poluição visual de buffers
 MAP_DEFAULT_CENTER = (-23.55, -46.63) # São Paulo (Latitude, Longitude)
-
-# -------------------------------
-# MOCKS/SIMULAÇÃO E UTILS (GARANTIR QUE O CÓDIGO RODE)
-# -------------------------------
-# Assegure-se de que seus arquivos 'src/' contenham as implementações REAIS dessas funções.
-try:
-    from src.fetchers import fetch_pois_overpass
-    from src.geoprocess import pois_to_gdf, create_buffers
-    # Tenta importar uma função de estilo se existir
-    from src.utils import set_page_config_and_style
-except ImportError:
-    # Mocks para desenvolvimento da UI
-    def fetch_pois_overpass(bbox): return pd.DataFrame()
-    def pois_to_gdf(df): return df
-    def create_buffers(gdf, radius_m): return gdf
-    def set_page_config_and_style(page_title, main_title, subtitle):
-        st.set_page_config(layout="wide", page_title=page_title)
-        st.title(main_title)
-        st.markdown(f"**{subtitle}**")
+GAZETTEER_PATH = "data/gazetteer_sp.csv"  # bairros, ruas e pontos de referência (IBGE/OSM)
+GAZETTEER_LEARNED_PATH = "data/gazetteer_aprendido.csv"  # resultados do Nominatim, acrescentados em uso
 
 # -------------------------------
 # FUNÇÕES DE CACHE
 # -------------------------------
+@st.cache_resource
+def get_gazetteer() -> Gazetteer:
+    """Índice local (prefixo + trigramas) carregado uma vez por processo."""
+    return Gazetteer.from_csv(
+        get_secret("GAZETTEER_PATH", GAZETTEER_PATH),
+        get_secret("GAZETTEER_LEARNED_PATH", GAZETTEER_LEARNED_PATH),
+    )
+
+
 @st.cache_data(ttl=3600) 
 def geocode_address(address):
-    """Converte endereço ou nome para coordenadas (lat/lon) usando Nominatim."""
+    """
+    Converte endereço ou nome para coordenadas (lat, lon, fonte).
+    Consulta primeiro o gazetteer local; o Nominatim só é chamado em caso de falha.
+    Sem efeitos colaterais: quem chama decide guardar o resultado (`remember_geocode`).
+    """
+    hit = get_gazetteer().resolve(address, min_score=0.9)  # endereços com número vão ao Nominatim
+    if hit:
+        return hit["lat"], hit["lon"], "gazetteer"
+
+    # geopy só é importado quando o gazetteer não resolve (raro)
+    from geopy.geocoders import Nominatim
+    from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+
     geolocator = Nominatim(user_agent="ooh_analysis_app")
     try:
         location = geolocator.geocode(address, timeout=10) 
         if location:
-            return location.latitude, location.longitude
-        return None, None
+            return location.latitude, location.longitude, "nominatim"
+        return None, None, None
     except GeocoderTimedOut:
         # Não podemos usar st.sidebar.error aqui, a exceção será tratada no corpo principal
-        return None, None
+        return None, None, None
     except GeocoderServiceError:
-        return None, None
+        return None, None, None
     except Exception:
-        return None, None
+        return None, None, None
+
+
+def remember_geocode(address, lat, lon):
+    """Acrescenta um resultado do Nominatim ao gazetteer (índice compartilhado e CSV aprendido)."""
+    get_gazetteer().add(
+        address.split(",")[0], lat, lon,
+        persist_to=get_secret("GAZETTEER_LEARNED_PATH", GAZETTEER_LEARNED_PATH)
+    )
+
+
+@st.cache_resource
+def get_tile_cache() -> TileCache:
+    """Cache de POIs por tile compartilhado por todas as sessões do processo."""
+    return TileCache(lambda bbox: fetch_pois_overpass(bbox, raise_errors=True))
+
+
+@st.cache_resource(max_entries=8)
+def get_clusterer(coords: pd.DataFrame) -> GridClusterer:
+    """Indexa os POIs por nível de zoom uma única vez por conjunto de coordenadas."""
+    return GridClusterer(coords["lat"].to_numpy(), coords["lon"].to_numpy(), radius_px=CLUSTER_RADIUS_PX)
+
+
+@st.cache_data(max_entries=32)
+def get_buffers(coords: pd.DataFrame, radius_m: int):
+    """Polígonos de buffer dos POIs exibidos, calculados uma vez por recorte de dados e raio."""
+    return create_buffers(pois_to_gdf(coords), radius_m=radius_m)[["geometry"]]
 
 
 # -------------------------------
@@ -108,6 +145,22 @@ show_buffers = st.sidebar.checkbox(
     value=False,
     key='show_buffers_map'
 )
+
+prefetch_neighbors = st.sidebar.checkbox(
+    "Pré-carregar áreas vizinhas",
+    value=False,
+    key='prefetch_map',
+    help="Busca em segundo plano os tiles ao redor da área visível (no máximo uma consulta ao Overpass a cada 2 s)."
+)
+
+view_mode = st.sidebar.radio(
+    "Modo de visualização",
+    ["Clusters", "HeatMap"],
+    index=0,
+    key='view_mode_map',
+    help="Clusters e HeatMap são calculados no servidor para o zoom e a área visíveis, sem amostragem."
+)
+
 st.sidebar.markdown("---")
 
 
@@ -117,15 +170,20 @@ st.sidebar.markdown("---")
 if st.session_state.run_search and st.session_state.search_input:
     # O spinner agora está no CORPO PRINCIPAL
     with st.spinner(f"Buscando coordenadas para '{st.session_state.search_input}'..."):
-        new_lat, new_lon = geocode_address(st.session_state.search_input)
+        new_lat, new_lon, fonte = geocode_address(st.session_state.search_input)
+        if fonte == "nominatim":
+            remember_geocode(st.session_state.search_input, new_lat, new_lon)
         
         # Reseta o estado
         st.session_state.run_search = False 
         
         if new_lat and new_lon:
             # Atualiza o estado da sessão
-            st.session_state.map_lat = new_lat
-            st.session_state.map_lon = new_lon
+            st.session_state.map_view = {
+                "center": {"lat": new_lat, "lng": new_lon},
+                "zoom": max(st.session_state.get("map_view", {}).get("zoom", 13), 14),
+                "bounds": None,
+            }
             st.session_state.click_lat = new_lat
             st.session_state.click_lon = new_lon
             st.success(f"Mapa centralizado em: **{st.session_state.search_input}**.")
@@ -140,187 +198,222 @@ st.markdown("""
 ### 💡 Como Usar:
 1.  Use a **Barra Lateral** para pesquisar um local (bairro/rua).
 2.  Ou, **clique diretamente no mapa** (onde diz "Leaflet") para selecionar a região de interesse.
+3.  Depois disso, os POIs acompanham a **área visível**: arraste ou aproxime o mapa para carregar novas regiões.
 """)
 
 
 # -------------------------------
-# MAPA INICIAL/ATUALIZADO (FOLIUM)
+# ESTADO DO MAPA ÚNICO (PERSISTENTE ENTRE RERUNS)
 # -------------------------------
-center_lat, center_lon = st.session_state.get("map_lat", MAP_DEFAULT_CENTER[0]), \
-                         st.session_state.get("map_lon", MAP_DEFAULT_CENTER[1])
-if "zoom_level" not in st.session_state:
-    st.session_state.zoom_level = 13
-
-m = folium.Map(
-    location=[center_lat, center_lon], 
-    zoom_start=st.session_state.zoom_level,
-    tiles="CartoDB positron" 
-)
+if "map_view" not in st.session_state:
+    st.session_state.map_view = {
+        "center": {"lat": MAP_DEFAULT_CENTER[0], "lng": MAP_DEFAULT_CENTER[1]},
+        "zoom": 13,
+        "bounds": None,
+    }
+
+
+def build_data_layers() -> list:
+    """
+    Carrega e filtra os POIs da área visível do mapa e devolve as camadas
+    (FeatureGroups) que serão enviadas ao mapa como atualização incremental.
+    """
+    view = st.session_state.map_view
+    view_bounds = view.get("bounds") or bounds_from_center(
+        view["center"]["lat"], view["center"]["lng"], view["zoom"], 900, 600
+    )
+
+    st.markdown("---")
+    st.subheader("Resultados de POIs na Área Visível")
+
+    tiles = tiles_for_bounds(view_bounds)
+    if len(tiles) > MAX_VIEW_TILES:
+        st.info("Área visível muito grande para consultar o Overpass. Aproxime o mapa para carregar os POIs.")
+        return []
+
+    tile_cache = get_tile_cache()
+    missing = [t for t in tiles if t not in tile_cache]
+    if missing and tiles != st.session_state.get("loaded_tiles"):
+        # Debounce: um novo pan/zoom durante a espera interrompe esta execução
+        time.sleep(DEBOUNCE_S)
+
+    with st.spinner(f"Consultando Overpass API para {len(missing)} de {len(tiles)} tiles da área visível..."):
+        failed = []
+        with span("mapa.tiles", tiles=len(tiles), faltantes=len(missing)) as s:
+            df = tile_cache.get(tiles, failed=failed)
+            s.set(linhas=len(df), falhas=len(failed))
+    # Tiles com erro não entram em cache: o próximo rerun tenta de novo
+    st.session_state.loaded_tiles = None if failed else tiles
+    if failed:
+        st.warning(f"O Overpass não respondeu para {len(failed)} de {len(tiles)} tiles (limite de uso ou timeout). "
+                   "Mova o mapa ou recarregue para tentar novamente.")
+
+    # Vizinhos em segundo plano (opcional, com limite de taxa): o próximo pan já encontra os dados em cache
+    if prefetch_neighbors:
+        tile_cache.prefetch(neighbor_tiles(tiles))
+
+    if df.empty:
+        st.info("Nenhum Ponto de Interesse (POI) relevante encontrado nesta área.")
+        return []
+
+    # 1. Determina tipos de POI para filtro
+    poi_types = set()
+    if "advertising" in df.columns:
+        poi_types.update(df["advertising"].dropna().unique())
+    if "highway" in df.columns:
+        poi_types.update(df["highway"].dropna().unique())
+
+    poi_types = sorted(list(poi_types))
+
+    # UI para filtrar tipos de POI
+    col_type_filter, col_metrics = st.columns([2, 1])
+
+    with col_type_filter:
+        selected_types = st.multiselect(
+            "Filtrar Tipos de Ponto de Interesse (POI)",
+            poi_types,
+            default=[t for t in poi_types if t in ['bus_stop', 'billboard', 'poster_box']]
+        )
+
+    # Aplica o filtro
+    conditions = []
+    if "advertising" in df.columns:
+        conditions.append(df["advertising"].isin(selected_types))
+    if "highway" in df.columns:
+        conditions.append(df["highway"].isin(selected_types))
+
+    if conditions:
+        mask = pd.concat(conditions, axis=1).any(axis=1)
+        df_filtered = df[mask]
+    else:
+        df_filtered = df.copy()
+
+    # Checa se o filtro resultou em algo
+    total_encontrado = len(df_filtered)
+    if total_encontrado == 0:
+        st.warning("O filtro selecionado não resultou em nenhum POI. Ajuste os filtros.")
+        return []
+
+    # Exibe métricas
+    with col_metrics:
+        st.metric("Total de POIs Encontrados", f"{total_encontrado:,}")
+
+    # 2. Processamento geográfico
+    gdf = pois_to_gdf(df_filtered)
+    st.session_state.df_pois = df_filtered
+
+    # 3. Camadas dinâmicas para o zoom/bounds atuais do mapa
+    groups = []
+    with span("mapa.camadas", modo=view_mode):
+        if view_mode == "HeatMap":
+            # HeatMap pré-agregado: no máximo MAX_HEAT_CELLS células, qualquer que seja o volume
+            # Peso = contagem de POIs: o Overpass não traz população nem score por ponto
+            heat_data = bin_heatmap(gdf["lat"], gdf["lon"], bounds=view_bounds, zoom=view["zoom"])
+            heat_group = FeatureGroup(name="HeatMap")
+            HeatMap(heat_data.tolist(), radius=int(HEAT_CELL_PX * 1.5), blur=HEAT_CELL_PX).add_to(heat_group)
+            groups.append(heat_group)
+            st.caption(f"{len(heat_data):,} células de HeatMap representando {len(gdf):,} POIs.")
+        else:
+            # Clusters calculados no servidor: só o que é visível no zoom/bounds atuais
+            gdf = gdf[gdf["lat"].notna() & gdf["lon"].notna()].reset_index(drop=True)
+            clusterer = get_clusterer(gdf[["lat", "lon"]])
+            visible = clusterer.get_clusters(view_bounds, view["zoom"])
+
+            # Um único GeoJson por camada (estilo e popup vêm das properties)
+            groups.append(cluster_layer_group(cluster_feature_collection(visible)))
+            leaves = gdf.iloc[visible.loc[visible["point_index"] >= 0, "point_index"]]
+            groups.extend(poi_layer_groups(poi_feature_collections(leaves, selected_types)))
+            st.caption(f"{len(visible):,} clusters/pontos visíveis representando {len(gdf):,} POIs.")
+
+        # Buffers: só os MAX_BUFFERS exibidos, e só com a opção ligada
+        coords = gdf.loc[gdf["lat"].notna() & gdf["lon"].notna(), ["lat", "lon"]] if show_buffers else gdf.iloc[:0]
+        if len(coords) > 0:
+            if len(coords) > MAX_BUFFERS:
+                st.info(f"Mostrando apenas {MAX_BUFFERS} de {len(coords)} buffers.")
+            with span("mapa.buffers", pontos=min(len(coords), MAX_BUFFERS)):
+                buf_subset = get_buffers(coords.head(MAX_BUFFERS).reset_index(drop=True), buffer_m)
+
+            buffer_group = FeatureGroup(name=f"Buffers ({buffer_m}m)", show=True)
+            folium.GeoJson(
+                buf_subset,
+                style_function=lambda x: {"color": "darkred", "fillOpacity": 0.05, "weight": 1.5},
+            ).add_to(buffer_group)
+            groups.append(buffer_group)
+
+    return groups
+
 
-# Captura clique
-map_data = st_folium(m, width=900, height=550, returned_objects=["last_clicked", "zoom"], key="initial_map_view")
+# -------------------------------
+# CONSULTA DA ÁREA VISÍVEL (APÓS O PRIMEIRO CLIQUE/PESQUISA) -> CAMADAS INCREMENTAIS
+# -------------------------------
+data_layers = []
+if "click_lat" in st.session_state and "click_lon" in st.session_state:
+    try:
+        with span("mapa.dados"):
+            data_layers = build_data_layers()
+    except Exception as e:
+        st.error(f"Erro na análise de POI: {type(e).__name__}: {e}")
+        st.info("Certifique-se de que as funções em 'src/' e as bibliotecas Geopy/GeoPandas estão corretas.")
 
-# Atualiza o zoom_level para manter o estado
-if map_data and map_data.get("zoom") is not None:
-    st.session_state.zoom_level = map_data["zoom"]
+# -------------------------------
+# MAPA ÚNICO (FOLIUM)
+# -------------------------------
+# O mapa base é sempre idêntico, então o componente não é recriado no navegador:
+# centro, zoom e camadas de dados chegam como atualizações incrementais.
+with span("mapa.folium"):
+    m = folium.Map(
+        location=list(MAP_DEFAULT_CENTER),
+        zoom_start=13,
+        tiles="CartoDB positron"
+    )
+
+view = st.session_state.map_view
+with span("mapa.st_folium", camadas=len(data_layers)):
+    map_data = st_folium(
+        m,
+        width=900,
+        height=600,
+        center=(view["center"]["lat"], view["center"]["lng"]),
+        zoom=view["zoom"],
+        feature_group_to_add=data_layers or None,
+        layer_control=LayerControl() if data_layers else None,
+        returned_objects=["last_clicked", "zoom", "bounds", "center"],
+        key="mapa_unico",
+    )
 
 # -------------------------------
-# TRATAMENTO DO CLIQUE MANUAL
+# TRATAMENTO DO CLIQUE MANUAL E DO ENQUADRAMENTO
 # -------------------------------
-if map_data.get("last_clicked"):
+needs_rerun = False
+if map_data and map_data.get("zoom") is not None and map_data.get("center"):
+    new_view = {"center": map_data["center"], "zoom": map_data["zoom"], "bounds": map_data.get("bounds")}
+    if new_view != st.session_state.map_view:
+        st.session_state.map_view = new_view
+        # Clusters e HeatMap dependem do enquadramento: pan/zoom recalcula as camadas
+        needs_rerun = bool(data_layers)
+
+if map_data and map_data.get("last_clicked"):
     lat = map_data["last_clicked"]["lat"]
     lon = map_data["last_clicked"]["lng"]
-    
+
     # Só atualiza se for um novo ponto
     if lat != st.session_state.get("click_lat") or lon != st.session_state.get("click_lon"):
         st.session_state.click_lat = lat
         st.session_state.click_lon = lon
-        st.session_state.map_lat = lat
-        st.session_state.map_lon = lon
-        st.info(f"Novo ponto clicado: Lat {lat:.4f}, Lon {lon:.4f}. Iniciando consulta de POIs...")
-
-
-# -------------------------------
-# CONSULTA E EXIBIÇÃO APÓS CLIQUE/PESQUISA (LÓGICA COMPLETA)
-# -------------------------------
+        st.session_state.map_view = {
+            "center": {"lat": lat, "lng": lon},
+            "zoom": max(st.session_state.map_view["zoom"], 14),
+            "bounds": None,
+        }
+        needs_rerun = True
 
-if "click_lat" in st.session_state and "click_lon" in st.session_state:
-    lat = st.session_state.click_lat
-    lon = st.session_state.click_lon
-
-    bbox = f"{lat - DELTA_DEG},{lon - DELTA_DEG},{lat + DELTA_DEG},{lon + DELTA_DEG}"
-
-    with st.container():
-        st.markdown("---")
-        st.subheader(f"Resultados de POIs na Região (BBox ~4km²)")
-        
-        with st.spinner(f"Consultando Overpass API ao redor de {lat:.4f}, {lon:.4f}..."):
-            try:
-                df = fetch_pois_overpass(bbox)
-                
-                if df.empty:
-                    st.info("Nenhum Ponto de Interesse (POI) relevante encontrado nesta área.")
-                    st.stop()
-                    
-                # 1. Determina tipos de POI para filtro
-                poi_types = set()
-                if "advertising" in df.columns:
-                    poi_types.update(df["advertising"].dropna().unique())
-                if "highway" in df.columns:
-                    poi_types.update(df["highway"].dropna().unique())
-
-                poi_types = sorted(list(poi_types))
-                
-                # UI para filtrar tipos de POI
-                col_type_filter, col_metrics = st.columns([2, 1])
-                
-                with col_type_filter:
-                    selected_types = st.multiselect(
-                        "Filtrar Tipos de Ponto de Interesse (POI)", 
-                        poi_types, 
-                        default=[t for t in poi_types if t in ['bus_stop', 'billboard', 'poster_box']]
-                    )
-
-                # Aplica o filtro
-                conditions = []
-                if "advertising" in df.columns:
-                    conditions.append(df["advertising"].isin(selected_types))
-                if "highway" in df.columns:
-                    conditions.append(df["highway"].isin(selected_types))
-
-                if conditions:
-                    mask = pd.concat(conditions, axis=1).any(axis=1)
-                    df_filtered = df[mask]
-                else:
-                    df_filtered = df.copy()
-
-                # Checa se o filtro resultou em algo
-                total_encontrado = len(df_filtered)
-                if total_encontrado == 0:
-                    st.warning("O filtro selecionado não resultou em nenhum POI. Ajuste os filtros.")
-                    st.stop()
-                
-                # Exibe métricas
-                with col_metrics:
-                    st.metric("Total de POIs Encontrados", f"{total_encontrado:,}")
-                
-                # Limite de pontos
-                if total_encontrado > MAX_POINTS:
-                    st.warning(f"Exibindo apenas {MAX_POINTS:,} aleatórios para performance.")
-                    df_filtered = df_filtered.sample(MAX_POINTS, random_state=42)
-                
-                
-                # 2. Processamento geográfico
-                gdf = pois_to_gdf(df_filtered)
-                gdf_buf = create_buffers(gdf, radius_m=buffer_m)
-
-
-                # 3. RE-CRIAÇÃO DO MAPA PARA PLOTAGEM DE DADOS
-                m_plot = folium.Map(
-                    location=[lat, lon], 
-                    zoom_start=st.session_state.zoom_level if st.session_state.zoom_level > 12 else 14,
-                    tiles="CartoDB positron"
-                )
-                
-                if len(gdf) > 500:
-                    # HeatMap para grandes volumes
-                    heat_data = [[row.lat, row.lon] for _, row in gdf.iterrows() if pd.notna(row.lat) and pd.notna(row.lon)]
-                    HeatMap(heat_data, radius=15).add_to(m_plot)
-                    st.info("HeatMap ativado devido ao grande volume de POIs.")
-                else:
-                    # Marcadores e Clusters para menor volume
-                    layers = {}
-                    for poi_type in selected_types:
-                        layer_name = poi_type.replace("_", " ").title()
-                        layers[poi_type] = FeatureGroup(name=layer_name).add_to(m_plot)
-                        cluster = MarkerCluster().add_to(layers[poi_type])
-
-                        subset = gdf[
-                            (gdf.get("advertising") == poi_type) |
-                            (gdf.get("highway") == poi_type)
-                        ]
-                        
-                        for _, r in subset.iterrows():
-                            lat_r, lon_r = r.lat, r.lon
-                            if pd.isna(lat_r) or pd.isna(lon_r): continue
-
-                            # Define cor
-                            if poi_type == "bus_stop" or r.get("highway") == "bus_stop":
-                                color = "green"
-                            elif poi_type in ["billboard", "poster_box", "column"] or r.get("advertising") in ["billboard", "poster_box", "column"]:
-                                color = "red"
-                            else:
-                                color = "blue"
-
-                            folium.CircleMarker(
-                                location=[lat_r, lon_r], radius=5, color=color, fill=True, fill_color=color, fill_opacity=0.8, weight=2,
-                                popup=folium.Popup(f"<b>{poi_type.replace('_', ' ').title()}</b><br>Nome: {r.get('name', 'N/A')}", max_width=300)
-                            ).add_to(cluster)
-                
-                # Buffers
-                if show_buffers and len(gdf_buf) > 0:
-                    buf_subset = gdf_buf.head(MAX_BUFFERS)
-                    if len(gdf_buf) > MAX_BUFFERS:
-                        st.info(f"Mostrando apenas {MAX_BUFFERS} de {len(gdf_buf)} buffers.")
-                    
-                    buffer_group = FeatureGroup(name=f"Buffers ({buffer_m}m)", show=True).add_to(m_plot)
-                    for _, r in buf_subset.iterrows():
-                        folium.GeoJson(
-                            r.geometry.__geo_interface__,
-                            style_function=lambda x: {"color": "darkred", "fillOpacity": 0.05, "weight": 1.5},
-                        ).add_to(buffer_group)
-
-                # Controle de camadas e exibição final
-                LayerControl().add_to(m_plot)
-                st.session_state.df_pois = df_filtered
-                st_folium(m_plot, width=900, height=600, key="final_map")
-
-            except Exception as e:
-                st.error(f"Erro na análise de POI: {type(e).__name__}: {e}")
-                st.info("Certifique-se de que as funções em 'src/' e as bibliotecas Geopy/GeoPandas estão corretas.")
+if needs_rerun:
+    st.rerun()
 
 # -------------------------------
 # Rodapé informativo
 # -------------------------------
 st.markdown("---")
-st.caption("Dados fornecidos pela Overpass API (OpenStreetMap) e Geocoding por Nominatim/OpenStreetMap.")
+st.caption("Dados fornecidos pela Overpass API (OpenStreetMap) e Geocoding pelo gazetteer local (IBGE/OSM) com fallback no Nominatim/OpenStreetMap.")
+
+render_debug_panel()
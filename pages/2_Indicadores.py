@@ -3,7 +3,7 @@ import streamlit as st
 import pandas as pd
 from src.fetchers import fetch_population_ibge
 
-from src.utils import set_page_config_and_style # IMPORTAÇÃO DO NOVO MÓDULO
+from src.utils import set_page_config_and_style, render_debug_panel # IMPORTAÇÃO DO NOVO MÓDULO
 
 # -------------------------------
 # Configurações
@@ -78,3 +78,5 @@ if st.button("Buscar dados do IBGE", type="primary"):
 
 else:
     st.info("Clique em **Buscar dados do IBGE** para carregar.")
+
+render_debug_panel()
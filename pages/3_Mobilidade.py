@@ -1,8 +1,9 @@
+import os
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import requests
 from src.utils import set_page_config_and_style # Importa a função de padronização
+from src.gtfs import GTFS_PATH, load_departures
 
 # -------------------------------
 # DEFINIÇÃO DO TOKEN (INPUT REMOVIDO)
@@ -19,6 +20,28 @@ set_page_config_and_style(
     subtitle="Ônibus em operação, fluxo de viagens e projeções por hora/dia"
 )
 
+# -------------------------------
+# PARTIDAS DE ÔNIBUS (GTFS SPTRANS, QUANDO O ZIP ESTÁ EM data/)
+# -------------------------------
+TIPO_DIA = {
+    "Segunda": "util", "Terça": "util", "Quarta": "util", "Quinta": "util", "Sexta": "util",
+    "Sábado": "sabado", "Domingo": "domingo"
+}
+
+@st.cache_resource
+def get_partidas_gtfs(versao_arquivo):
+    """Partidas por parada x tipo de dia x hora do feed local (None sem feed); recarrega se o zip mudar."""
+    return load_departures()
+
+def fator_hora_padrao(h):
+    """Fator por hora (pico manhã/tarde) usado quando não há GTFS."""
+    f_hora = 2.0 if h in [7,8,17,18] else 1.0
+    if 6 <= h <= 9 or 16 <= h <= 19:
+        f_hora = 1.8
+    elif 9 < h < 16 or 19 < h < 22:
+        f_hora = 1.2
+    return f_hora
+
 # -------------------------------
 # Controles de Seleção
 # -------------------------------
@@ -68,19 +91,30 @@ if st.button("Buscar dados de mobilidade", type="primary"):
         # --- 3. Projeção de fluxo (OD Metrô 2025) ---
         fluxo_base_diario = 2_864_000 # Viagens/dia (ônibus + metrô)
         
-        # Fator por dia da semana
-        fator_dia = {
-            "Segunda": 1.15, "Terça": 1.15, "Quarta": 1.15,
-            "Quinta": 1.10, "Sexta": 1.20,
-            "Sábado": 0.70, "Domingo": 0.55
-        }[dia_semana]
-
-        # Fator por hora (pico manhã/tarde)
-        fator_hora = 2.0 if hora in [7,8,17,18] else 1.0
-        if 6 <= hora <= 9 or 16 <= hora <= 19:
-            fator_hora = 1.8
-        elif 9 < hora < 16 or 19 < hora < 22:
-            fator_hora = 1.2
+        partidas = get_partidas_gtfs(os.path.getmtime(GTFS_PATH) if os.path.exists(GTFS_PATH) else None)
+        if partidas is not None:
+            # Fatores medidos: partidas do tipo de dia / média da semana e partidas da hora / média do dia
+            tipo_dia = TIPO_DIA[dia_semana]
+            totais = partidas.daily_totals()
+            media_semana = (5 * totais['util'] + totais['sabado'] + totais['domingo']) / 7
+            fator_dia = totais[tipo_dia] / media_semana if media_semana else 1.0
+            perfil = partidas.profile(tipo_dia)
+            fatores_hora = (perfil / perfil.mean()).tolist() if perfil.sum() else [1.0] * 24
+            partidas_hora = int(perfil[hora])
+            fonte_fluxo = "GTFS SPTrans + OD Metrô 2025"
+        else:
+            # Fator por dia da semana
+            fator_dia = {
+                "Segunda": 1.15, "Terça": 1.15, "Quarta": 1.15,
+                "Quinta": 1.10, "Sexta": 1.20,
+                "Sábado": 0.70, "Domingo": 0.55
+            }[dia_semana]
+
+            # Fator por hora (pico manhã/tarde)
+            fatores_hora = [fator_hora_padrao(h) for h in range(24)]
+            partidas_hora = None
+            fonte_fluxo = "OD Metrô 2025"
+        fator_hora = fatores_hora[hora]
 
         # Fluxo por hora
         fluxo_por_hora = int((fluxo_base_diario * fator_dia) / 24 * fator_hora)
@@ -111,8 +145,10 @@ if st.button("Buscar dados de mobilidade", type="primary"):
             {"Indicador": "Ônibus", "Valor": num_onibus, "Fonte": onibus_fonte},
             {"Indicador": "Pedestres", "Valor": f"{pedestres:,}".replace(",", "."), "Fonte": "CET-SP (proj.)"},
             {"Indicador": "Veículos", "Valor": f"{veiculos:,}".replace(",", "."), "Fonte": "CET-SP (proj.)"},
-            {"Indicador": "Fluxo (viagens/h)", "Valor": f"{fluxo_por_hora:,}".replace(",", "."), "Fonte": "OD Metrô 2025"},
-        ])
+            {"Indicador": "Fluxo (viagens/h)", "Valor": f"{fluxo_por_hora:,}".replace(",", "."), "Fonte": fonte_fluxo},
+        ] + ([
+            {"Indicador": "Partidas de ônibus (hora)", "Valor": f"{partidas_hora:,}".replace(",", "."), "Fonte": "GTFS SPTrans"}
+        ] if partidas_hora is not None else []))
         st.dataframe(df, use_container_width=True, hide_index=True)
 
 
@@ -121,14 +157,7 @@ if st.button("Buscar dados de mobilidade", type="primary"):
         # GRÁFICO DE FLUXO POR HORA (ATUALIZADO COM DIA SELECIONADO)
         # -------------------------------
         horas = list(range(24))
-        fluxo_horas = []
-        for h in horas:
-            f_hora = 2.0 if h in [7,8,17,18] else 1.0
-            if 6 <= h <= 9 or 16 <= h <= 19:
-                f_hora = 1.8
-            elif 9 < h < 16 or 19 < h < 22:
-                f_hora = 1.2
-            fluxo_horas.append(int((fluxo_base_diario * fator_dia) / 24 * f_hora))
+        fluxo_horas = [int((fluxo_base_diario * fator_dia) / 24 * fatores_hora[h]) for h in horas]
 
         fig = go.Figure()
         fig.add_trace(go.Bar(
@@ -162,7 +191,7 @@ if st.button("Buscar dados de mobilidade", type="primary"):
 
     st.markdown("---")
     st.success("Dados de mobilidade atualizados com sucesso!")
-    st.caption("Fonte: SPTrans (Olho Vivo), CET-SP (Projeções), Pesquisa OD Metrô 2025.")
+    st.caption("Fonte: SPTrans (Olho Vivo e GTFS, quando disponível), CET-SP (Projeções), Pesquisa OD Metrô 2025.")
 
 else:
     st.info("Selecione os parâmetros e clique em **Buscar dados de mobilidade** para carregar os indicadores e o gráfico de fluxo.")
@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from src.utils import set_page_config_and_style # Importa a função de padronização
-import requests
-from datetime import datetime
+from src.utils import set_page_config_and_style, render_debug_panel, span # Importa a função de padronização
+import numpy as np
+from src.data import get_table, table_version
+from src.weather_impact import STATIONS, condition_labels, hourly_forecast, portfolio_impact, reduction_factor
+from src.climatology import CLIMATOLOGY_DIR, Climatology
+import os
+from datetime import date
 
 # -------------------------------
 # CONFIGURAÇÕES GERAIS E ESTILO PADRÃO
@@ -18,44 +22,47 @@ set_page_config_and_style(
 )
 
 # -------------------------------
-# FUNÇÃO SIMULADA DE FETCH (para o exemplo)
+# PREVISÃO (TODAS AS ESTAÇÕES DE UMA VEZ, SEM LAÇO POR HORA)
 # -------------------------------
 @st.cache_data(ttl=3600)
 def fetch_weather_data(cidade: str):
     """
-    Simula a busca de dados climáticos (você pode integrar com OpenWeatherMap, etc.)
-    Retorna uma previsão horária simulada para 24h.
+    Previsão horária simulada das próximas 24h na estação INMET principal da cidade,
+    com o fator de redução de fluxo OOH calculado de forma vetorizada.
     """
-    # Dados de exemplo: 24 horas simuladas
-    data_base = datetime.now().replace(minute=0, second=0, microsecond=0)
+    k = int(np.flatnonzero(STATIONS['cidade'].to_numpy() == cidade)[0])
+    horarios, temp, chuva = hourly_forecast(STATIONS)
+    fator = reduction_factor(chuva[k], temp[k])
     
-    dados = []
-    for h in range(24):
-        hora = data_base + pd.Timedelta(hours=h)
-        temp = 18 + (h % 10) # Variação de temperatura
-        chuva = 0
-        condicao = "Sol"
-        
-        if 14 <= h <= 18 and h % 2 == 0:
-            chuva = 2 + (h / 4) # Chuva na tarde
-            condicao = "Chuva Forte" if chuva > 4 else "Chuvisco"
-        elif 6 <= h <= 9:
-            condicao = "Nublado"
-        
-        # Fator de Redução de Fluxo (impacto no OOH)
-        fator_reducao = 1.0 - (chuva * 0.05) - ((temp - 25) * 0.01 if temp > 25 else 0)
-        fator_reducao = max(0.8, fator_reducao) # Mínimo de 20% de fluxo
-        
-        dados.append({
-            "Hora": hora,
-            "Temperatura (°C)": temp,
-            "Chuva (mm/h)": chuva,
-            "Condição": condicao,
-            "Fluxo OOH Redução (%)": f"{int((1 - fator_reducao) * 100)}%",
-            "Fluxo OOH Fator": fator_reducao,
-        })
-        
-    return pd.DataFrame(dados)
+    return pd.DataFrame({
+        "Hora": horarios,
+        "Temperatura (°C)": temp[k],
+        "Chuva (mm/h)": chuva[k],
+        "Condição": condition_labels(chuva[k], np.arange(len(horarios))),
+        "Fluxo OOH Redução (%)": [f"{p}%" for p in ((1 - fator) * 100).astype(int)],
+        "Fluxo OOH Fator": fator,
+    })
+
+@st.cache_data(ttl=3600)
+def fetch_portfolio_impact(versao_inventario: str):
+    """Audiência das próximas 24h de todos os pontos do inventário, ajustada pela estação INMET mais próxima."""
+    df_pontos = get_table('inventario')
+    impacto = portfolio_impact(df_pontos, audience_col='Audiência Diária (Milhares)')
+    base = impacto['baseline'].sum(axis=1)
+    ajustada = impacto['audience'].sum(axis=1)
+    return pd.DataFrame({
+        "Ponto": df_pontos['ID_Ponto'].astype(str),
+        "Zona": df_pontos['Zona'].astype(str),
+        "Estação INMET": STATIONS['nome'].to_numpy()[impacto['station']],
+        "Audiência Base (mil)": base.round(1),
+        "Audiência Ajustada (mil)": ajustada.round(1),
+        "Redução (%)": ((1 - ajustada / base) * 100).round(1),
+    })
+
+@st.cache_resource
+def get_climatologia(versao_arquivo: float):
+    """Climatologia INMET em memória mapeada (None se o job `python -m src.climatology` ainda não rodou)."""
+    return Climatology.load()
 
 # -------------------------------
 # CONTROLES E BOTÃO
@@ -82,7 +89,8 @@ with col_btn:
 if st.session_state.get('carregar_clima'):
     
     with st.spinner(f"Buscando dados climáticos para {cidade_selecionada}..."):
-        df_clima = fetch_weather_data(cidade_selecionada)
+        with span("clima.previsao", cidade=cidade_selecionada):
+            df_clima = fetch_weather_data(cidade_selecionada)
     
     # --- 1. MÉTRICAS CHAVE ---
     st.markdown("### Condições Atuais e Impacto Máximo (Próximas 24h)")
@@ -151,6 +159,24 @@ if st.session_state.get('carregar_clima'):
         
         st.dataframe(df_display.head(10), use_container_width=True, hide_index=True)
         
+    # --- 3. IMPACTO NO PORTFÓLIO (todos os pontos x 24h) ---
+    st.markdown("---")
+    st.markdown("### Impacto no Portfólio OOH (Próximas 24h)")
+    with span("clima.impacto_portfolio"):
+        df_impacto = fetch_portfolio_impact(table_version('inventario'))
+    total_base = df_impacto["Audiência Base (mil)"].sum()
+    total_ajustada = df_impacto["Audiência Ajustada (mil)"].sum()
+    
+    col_p1, col_p2, col_p3 = st.columns(3)
+    with col_p1:
+        st.metric("Audiência Base (24h)", f"{total_base:,.0f} mil".replace(",", "."))
+    with col_p2:
+        st.metric("Audiência Ajustada pelo Clima", f"{total_ajustada:,.0f} mil".replace(",", "."))
+    with col_p3:
+        st.metric("Perda de Audiência", f"{(1 - total_ajustada / total_base) * 100:.1f}%", delta_color="inverse")
+    
+    st.dataframe(df_impacto.sort_values("Redução (%)", ascending=False), use_container_width=True, hide_index=True)
+
     st.markdown("---")
     st.success("Dados climáticos e projeção de impacto OOH atualizados.")
     st.caption("Fonte: Dados simulados/Estimativas internas. Integre sua API de clima para dados reais.")
@@ -158,3 +184,52 @@ if st.session_state.get('carregar_clima'):
 else:
     st.info(f"Clique em **Atualizar Previsão** para carregar os dados climáticos de {MUNIC_NOME} e o impacto projetado no fluxo OOH.")
     st.session_state['carregar_clima'] = False
+
+# -------------------------------
+# CLIMATOLOGIA (PLANEJAMENTO DE MESES À FRENTE)
+# -------------------------------
+meta_climatologia = os.path.join(CLIMATOLOGY_DIR, 'stations.json')
+climatologia = get_climatologia(os.path.getmtime(meta_climatologia)) if os.path.exists(meta_climatologia) else None
+if climatologia is not None:
+    st.markdown("---")
+    st.markdown("### Climatologia Horária (Histórico INMET)")
+    estacoes = STATIONS[STATIONS['codigo'].isin(climatologia.stations)]
+    col_est, col_data = st.columns(2)
+    with col_est:
+        nome_estacao = st.selectbox("Estação INMET", estacoes['nome'].tolist())
+    with col_data:
+        data_plano = st.date_input("Data da campanha", value=date.today())
+    codigo = estacoes.loc[estacoes['nome'] == nome_estacao, 'codigo'].iloc[0]
+    with span("clima.climatologia", estacao=codigo):
+        df_tipico = climatologia.day(codigo, data_plano)
+    anos = climatologia.meta['years']
+
+    col_c1, col_c2, col_c3 = st.columns(3)
+    with col_c1:
+        st.metric("Prob. Máxima de Chuva", f"{df_tipico['Prob. Chuva (%)'].max():.0f}%")
+    with col_c2:
+        st.metric("Faixa de Temperatura (p10–p90)", f"{df_tipico['Temp. p10 (°C)'].min():.0f}–{df_tipico['Temp. p90 (°C)'].max():.0f}°C")
+    with col_c3:
+        st.metric("Fator OOH Médio Esperado", f"{df_tipico['Fator OOH Esperado'].mean():.3f}")
+
+    fig_clim = go.Figure()
+    fig_clim.add_trace(go.Bar(x=df_tipico["Hora"], y=df_tipico["Prob. Chuva (%)"], name="Prob. Chuva (%)", marker_color='lightblue'))
+    fig_clim.add_trace(go.Scatter(x=df_tipico["Hora"], y=df_tipico["Temp. p50 (°C)"], name="Temp. mediana (°C)",
+                                  yaxis='y2', mode='lines', line=dict(color='orange', width=2)))
+    fig_clim.add_trace(go.Scatter(x=df_tipico["Hora"], y=df_tipico["Temp. p90 (°C)"], name="Temp. p90 (°C)",
+                                  yaxis='y2', mode='lines', line=dict(color='orange', dash='dot')))
+    fig_clim.add_trace(go.Scatter(x=df_tipico["Hora"], y=df_tipico["Temp. p10 (°C)"], name="Temp. p10 (°C)",
+                                  yaxis='y2', mode='lines', line=dict(color='orange', dash='dot'), fill='tonexty'))
+    fig_clim.update_layout(
+        title=f"Semana {climatologia.week_of(data_plano) + 1} – dia típico ({anos[0]}–{anos[-1]})" if anos else "Dia típico",
+        template="simple_white",
+        height=420,
+        xaxis=dict(title="Hora do Dia"),
+        yaxis=dict(title="Prob. Chuva (%)", range=[0, 100]),
+        yaxis2=dict(title="Temp. (°C)", side='right', overlaying='y', showgrid=False),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_clim, use_container_width=True)
+    st.caption("Fonte: histórico horário INMET agregado por semana do ano e hora local.")
+
+render_debug_panel()
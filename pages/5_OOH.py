@@ -1,8 +1,11 @@
+import math
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from src.utils import set_page_config_and_style # Importa a função de padronização
-import numpy as np
+from src.data import get_table, table_version
+from src.cube import get_cube
+from src.filters import BitmapIndex
 
 # -------------------------------
 # CONFIGURAÇÕES GERAIS E ESTILO PADRÃO
@@ -14,33 +17,18 @@ set_page_config_and_style(
 )
 
 # -------------------------------
-# FUNÇÃO SIMULADA DE GERAÇÃO DE DADOS
+# DADOS (CAMADA COMPARTILHADA, SOMENTE LEITURA)
 # -------------------------------
-@st.cache_data(ttl=3600)
-def generate_campaign_data():
-    """Gera dados simulados de várias campanhas OOH."""
-    data = {
-        'Campanha': [f'Campanha {i}' for i in range(1, 11)],
-        'Investimento (R$)': np.random.randint(50000, 300000, 10),
-        'Reach (Milhões)': np.random.uniform(0.8, 4.5, 10).round(2),
-        'Impressões (Milhões)': np.random.uniform(5.0, 30.0, 10).round(1),
-        'Frequência Média': np.random.uniform(4.0, 7.0, 10).round(1),
-        'Tipo de Mídia': ['Digital', 'Estática'] * 5,
-        'Mês': ['Jan', 'Fev', 'Mar', 'Abr', 'Maio'] * 2
-    }
-    df = pd.DataFrame(data)
-    
-    # Calcular CPM (Custo por Mil Impressões)
-    df['CPM (R$)'] = (df['Investimento (R$)'] / df['Impressões (Milhões)']) / 1000
-    df['CPM (R$)'] = df['CPM (R$)'].round(2)
-    
-    # Calcular CPP (Custo por Ponto de Audiência, simplificado)
-    df['CPP (R$)'] = df['Investimento (R$)'] / (df['Reach (Milhões)'] * 1000000)
-    df['CPP (R$)'] = df['CPP (R$)'].round(2)
-    
-    return df
+df_campanhas = get_table('campanhas')
+
 
-df_campanhas = generate_campaign_data()
+@st.cache_resource
+def get_indice_campanhas(versao):
+    """Bitmaps de Mês/Tipo de Mídia e CPM ordenado, montados uma vez por versão da tabela."""
+    return BitmapIndex(get_table('campanhas'), categorical=['Mês', 'Tipo de Mídia'], ranges=['CPM (R$)'])
+
+
+indice = get_indice_campanhas(table_version('campanhas'))
 
 # -------------------------------
 # CONTROLES (Filtros)
@@ -49,20 +37,21 @@ st.markdown("### Filtros de Análise")
 col_mes, col_tipo_midia, col_cpm_min = st.columns(3)
 
 with col_mes:
-    meses_selecionados = st.multiselect("Filtrar por Mês", df_campanhas['Mês'].unique(), default=df_campanhas['Mês'].unique())
+    meses_selecionados = st.multiselect("Filtrar por Mês", indice.values('Mês'), default=indice.values('Mês'))
 
 with col_tipo_midia:
-    tipos_selecionados = st.multiselect("Filtrar por Tipo de Mídia", df_campanhas['Tipo de Mídia'].unique(), default=df_campanhas['Tipo de Mídia'].unique())
+    tipos_selecionados = st.multiselect("Filtrar por Tipo de Mídia", indice.values('Tipo de Mídia'), default=indice.values('Tipo de Mídia'))
 
 with col_cpm_min:
-    cpm_max = st.slider("CPM Máximo (R$)", min_value=1.0, max_value=df_campanhas['CPM (R$)'].max() + 5, value=df_campanhas['CPM (R$)'].max(), step=0.5)
+    cpm_teto = math.ceil(float(df_campanhas['CPM (R$)'].max()) * 2) / 2  # na grade de 0,5 do slider e do cubo
+    cpm_max = st.slider("CPM Máximo (R$)", min_value=1.0, max_value=cpm_teto + 5, value=cpm_teto, step=0.5)
 
-# Aplicar Filtros
-df_filtrado = df_campanhas[
-    (df_campanhas['Mês'].isin(meses_selecionados)) &
-    (df_campanhas['Tipo de Mídia'].isin(tipos_selecionados)) &
-    (df_campanhas['CPM (R$)'] <= cpm_max)
-].copy()
+# Aplicar Filtros (OR dos bitmaps de cada coluna, AND entre colunas, CPM por busca binária)
+linhas = indice.query(
+    equals={'Mês': meses_selecionados, 'Tipo de Mídia': tipos_selecionados},
+    ranges={'CPM (R$)': (None, cpm_max)},
+)
+df_filtrado = df_campanhas.iloc[linhas]
 
 # -------------------------------
 # 1. MÉTRICAS CHAVE (Key Performance Indicators)
@@ -70,11 +59,19 @@ df_filtrado = df_campanhas[
 st.markdown("### KPIs Consolidados")
 if not df_filtrado.empty:
     
-    # Cálculos Consolidados
-    total_investimento = df_filtrado['Investimento (R$)'].sum()
-    media_cpm = df_filtrado['CPM (R$)'].mean()
-    total_reach = df_filtrado['Reach (Milhões)'].sum() # Soma simples
-    total_impressoes = df_filtrado['Impressões (Milhões)'].sum()
+    # Cálculos Consolidados (cubo mês x tipo de mídia x faixa de CPM, mesmos filtros)
+    kpis = get_cube('campanhas').agg(
+        equals={'Mês': meses_selecionados, 'Tipo de Mídia': tipos_selecionados},
+        ranges={'CPM (R$)': (None, cpm_max)},
+        total_investimento=('Investimento (R$)', 'sum'),
+        media_cpm=('CPM (R$)', 'mean'),
+        total_reach=('Reach (Milhões)', 'sum'),  # Soma simples
+        total_impressoes=('Impressões (Milhões)', 'sum'),
+    )
+    total_investimento = kpis['total_investimento']
+    media_cpm = kpis['media_cpm']
+    total_reach = kpis['total_reach']
+    total_impressoes = kpis['total_impressoes']
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 from src.utils import set_page_config_and_style # Importa a função de padronização
+from src.data import get_table, table_version
+from src.cube import get_cube
+from src.filters import BitmapIndex
 
 # -------------------------------
 # CONFIGURAÇÕES GERAIS E ESTILO PADRÃO
@@ -14,48 +16,18 @@ set_page_config_and_style(
 )
 
 # -------------------------------
-# FUNÇÃO SIMULADA DE GERAÇÃO DE DADOS
+# DADOS (CAMADA COMPARTILHADA, SOMENTE LEITURA)
 # -------------------------------
-@st.cache_data(ttl=3600)
-def generate_ooh_points():
-    """Gera dados simulados de pontos OOH (Out-of-Home) em São Paulo."""
-    
-    # Coordenadas aproximadas de pontos centrais e estratégicos de SP
-    data = {
-        'ID_Ponto': [f'OOH-{i:03}' for i in range(1, 26)],
-        'Latitude': [
-            -23.5505, -23.5430, -23.5614, -23.5520, -23.5630, # Centro/Paulista
-            -23.5850, -23.6000, -23.5780, -23.5700, -23.5480, # Zona Oeste/Sul
-            -23.5200, -23.5000, -23.4800, -23.4700, -23.4500, # Zona Norte
-            -23.6500, -23.6300, -23.6100, -23.5900, -23.5300, # Zona Sul/Marginal
-            -23.5400, -23.5350, -23.5450, -23.5550, -23.5650, # Outros
-        ],
-        'Longitude': [
-            -46.6333, -46.6500, -46.6667, -46.6833, -46.6200,
-            -46.6900, -46.6700, -46.6550, -46.6450, -46.6350,
-            -46.6100, -46.5900, -46.5700, -46.5500, -46.5300,
-            -46.6000, -46.5800, -46.5600, -46.5400, -46.6400,
-            -46.6700, -46.6800, -46.6600, -46.6550, -46.6450,
-        ],
-        'Audiência Diária (Milhares)': np.random.randint(20, 150, 25),
-        'Custo Mensal (R$ Mil)': np.random.uniform(5.0, 50.0, 25).round(1),
-        'Tipo': ['Digital', 'Estático'] * 12 + ['Digital'],
-        'Zona': ['Centro', 'Oeste', 'Sul', 'Norte', 'Leste'] * 5
-    }
-    df = pd.DataFrame(data)
-    
-    # --- Cálculo do Score (Métrica principal para ranking) ---
-    # Score é Audiência * (1 / Custo) * Fator de Impacto
-    df['Custo por Audiência (R$/mil)'] = (df['Custo Mensal (R$ Mil)'] * 1000) / df['Audiência Diária (Milhares)']
-    df['Fator de Impacto'] = np.random.uniform(0.8, 1.2, 25).round(2)
-    
-    # Exemplo simples de Score: quanto maior, melhor
-    df['Score OOH'] = (df['Audiência Diária (Milhares)'] / df['Custo por Audiência (R$/mil)']) * df['Fator de Impacto']
-    df['Score OOH'] = df['Score OOH'].rank(ascending=False).astype(int)
-    
-    return df
+df_pontos = get_table('inventario')
 
-df_pontos = generate_ooh_points()
+
+@st.cache_resource
+def get_indice_pontos(versao):
+    """Bitmaps de Tipo/Zona e custo ordenado, montados uma vez por versão do inventário."""
+    return BitmapIndex(get_table('inventario'), categorical=['Tipo', 'Zona'], ranges=['Custo Mensal (R$ Mil)'])
+
+
+indice = get_indice_pontos(table_version('inventario'))
 
 # -------------------------------
 # CONTROLES E FILTROS
@@ -64,24 +36,24 @@ st.markdown("### Seleção e Filtros de Pontos")
 col_tipo, col_zona, col_custo = st.columns(3)
 
 with col_tipo:
-    tipos_selecionados = st.multiselect("Filtrar por Tipo de Mídia", df_pontos['Tipo'].unique(), default=df_pontos['Tipo'].unique())
+    tipos_selecionados = st.multiselect("Filtrar por Tipo de Mídia", indice.values('Tipo'), default=indice.values('Tipo'))
 
 with col_zona:
-    zonas_selecionadas = st.multiselect("Filtrar por Zona", df_pontos['Zona'].unique(), default=df_pontos['Zona'].unique())
+    zonas_selecionadas = st.multiselect("Filtrar por Zona", indice.values('Zona'), default=indice.values('Zona'))
 
 with col_custo:
     custo_max = st.slider("Custo Mensal Máximo (R$ Mil)", 
                           min_value=5.0, 
-                          max_value=df_pontos['Custo Mensal (R$ Mil)'].max().round() + 5, 
-                          value=df_pontos['Custo Mensal (R$ Mil)'].max().round(), 
+                          max_value=float(df_pontos['Custo Mensal (R$ Mil)'].max().round()) + 5, 
+                          value=float(df_pontos['Custo Mensal (R$ Mil)'].max().round()), 
                           step=1.0)
 
-# Aplicar Filtros
-df_filtrado = df_pontos[
-    (df_pontos['Tipo'].isin(tipos_selecionados)) &
-    (df_pontos['Zona'].isin(zonas_selecionadas)) &
-    (df_pontos['Custo Mensal (R$ Mil)'] <= custo_max)
-].copy()
+# Aplicar Filtros (bitmaps por Tipo/Zona + faixa de custo no array ordenado)
+linhas = indice.query(
+    equals={'Tipo': tipos_selecionados, 'Zona': zonas_selecionadas},
+    ranges={'Custo Mensal (R$ Mil)': (None, custo_max)},
+)
+df_filtrado = df_pontos.iloc[linhas]
 
 # Ordenar por Score para o ranking
 df_ranking = df_filtrado.sort_values(by='Score OOH', ascending=True)
@@ -157,12 +129,19 @@ if not df_filtrado.empty:
     st.markdown("---")
     st.markdown("### Métricas de Performance do Portfólio Selecionado")
     
-    total_audiencia = df_filtrado['Audiência Diária (Milhares)'].sum()
-    total_custo = df_filtrado['Custo Mensal (R$ Mil)'].sum()
+    # Totais do cubo tipo x zona x faixa de custo (mesmos filtros, sem varrer os pontos)
+    kpis = get_cube('inventario').agg(
+        equals={'Tipo': tipos_selecionados, 'Zona': zonas_selecionadas},
+        ranges={'Custo Mensal (R$ Mil)': (None, custo_max)},
+        total_audiencia=('Audiência Diária (Milhares)', 'sum'),
+        total_custo=('Custo Mensal (R$ Mil)', 'sum'),
+    )
+    total_audiencia = kpis['total_audiencia']
+    total_custo = kpis['total_custo']
     
     col_a, col_b, col_c = st.columns(3)
     with col_a:
-        st.metric("Total de Ativos", len(df_filtrado))
+        st.metric("Total de Ativos", kpis['linhas'])
     with col_b:
         st.metric("Audiência Diária Total", f"{total_audiencia:,.0f} mil".replace(",", "."))
     with col_c:
@@ -4,6 +4,8 @@ import pandas as pd
 import plotly.graph_objects as go
 # Importa a função de padronização
 from src.utils import set_page_config_and_style 
+from src.calendario import MESES, get_multipliers, holidays
+from src.forecast import get_forecast
 
 # -------------------------------
 # CONFIGURAÇÕES GERAIS E ESTILO PADRÃO
@@ -33,46 +35,26 @@ EMOJIS = {
     "fireworks": "&#x1F386;",        # Réveillon
 }
 
-# -------------------------------
-# DADOS BASE 2025 (SOMENTE PORTUGUÊS)
-# -------------------------------
-DADOS_BASE = [
-    {"mes": "Janeiro", "data": "01/01", "evento": "Ano Novo", "tipo": "Feriado", "pedestres": 20, "onibus": 15, "nivel": 3, "detalhe": "Compras pós-festas", "icone": "party-popper"},
-    {"mes": "Fevereiro/Março", "data": "03-04/03", "evento": "Carnaval", "tipo": "Feriado", "pedestres": 50, "onibus": 40, "nivel": 4, "detalhe": "Blocos e eventos", "icone": "mask"},
-    {"mes": "Abril", "data": "18/04", "evento": "Sexta-Feira Santa", "tipo": "Feriado", "pedestres": 10, "onibus": 5, "nivel": 2, "detalhe": "Missas", "icone": "church"},
-    {"mes": "Abril", "data": "21/04", "evento": "Tiradentes", "tipo": "Feriado", "pedestres": 15, "onibus": 10, "nivel": 2, "detalhe": "Viagens", "icone": "flag"},
-    {"mes": "Maio", "data": "01/05", "evento": "Dia do Trabalho", "tipo": "Feriado", "pedestres": 25, "onibus": 20, "nivel": 3, "detalhe": "Protestos", "icone": "briefcase"},
-    {"mes": "Junho", "data": "19/06", "evento": "Corpus Christi", "tipo": "Ponto Facultativo", "pedestres": 15, "onibus": 10, "nivel": 2, "detalhe": "Procissões", "icone": "church"},
-    {"mes": "Setembro", "data": "07/09", "evento": "Independência", "tipo": "Feriado", "pedestres": 20, "onibus": 15, "nivel": 3, "detalhe": "Desfiles", "icone": "flag"},
-    {"mes": "Outubro", "data": "12/10", "evento": "Nossa Senhora Aparecida + Dia das Crianças", "tipo": "Feriado", "pedestres": 30, "onibus": 25, "nivel": 4, "detalhe": "Compras", "icone": "baby"},
-    {"mes": "Novembro", "data": "02/11", "evento": "Finados", "tipo": "Feriado", "pedestres": 10, "onibus": 8, "nivel": 1, "detalhe": "Cemitérios", "icone": "candle"},
-    {"mes": "Novembro", "data": "15/11", "evento": "Proclamação da República", "tipo": "Feriado", "pedestres": 15, "onibus": 12, "nivel": 2, "detalhe": "Viagens", "icone": "scroll"},
-    {"mes": "Novembro", "data": "20/11", "evento": "Consciência Negra", "tipo": "Feriado SP", "pedestres": 25, "onibus": 20, "nivel": 3, "detalhe": "Eventos", "icone": "raised-fist"},
-    {"mes": "Dezembro", "data": "25/12", "evento": "Natal", "tipo": "Feriado", "pedestres": 40, "onibus": 30, "nivel": 4, "detalhe": "Compras", "icone": "christmas-tree"},
-    {"mes": "Dezembro", "data": "31/12", "evento": "Réveillon", "tipo": "Ponto Facultativo", "pedestres": 50, "onibus": 40, "nivel": 4, "detalhe": "Festas", "icone": "fireworks"},
-]
-
 # -------------------------------
 # FUNÇÃO PARA GERAR DADOS POR ANO
 # -------------------------------
 @st.cache_data
 def gerar_dados_ano(ano_base=2025, crescimento_anual=0.15):
+    """Eventos do ano calculados pelo calendário (datas móveis pela Páscoa e feriados de SP)."""
     fator = (1 + crescimento_anual) ** (ano_base - 2025)
-    dados = []
-    for d in DADOS_BASE:
-        dados.append({
-            "ano": ano_base,
-            "mes": d["mes"],
-            "data": d["data"],
-            "evento": d["evento"],
-            "tipo": d["tipo"],
-            "pedestres": int(d["pedestres"] * fator),
-            "onibus": int(d["onibus"] * fator),
-            "nivel": d["nivel"],
-            "detalhe": d["detalhe"],
-            "emoji": EMOJIS[d["icone"]]  # USAR EMOJI REAL
-        })
-    return pd.DataFrame(dados)
+    df = holidays([ano_base])
+    return pd.DataFrame({
+        "ano": ano_base,
+        "mes": df["mes"],
+        "data": df["data"],
+        "evento": df["evento"],
+        "tipo": df["tipo"],
+        "pedestres": (df["pedestres"] * fator).astype(int),
+        "onibus": (df["onibus"] * fator).astype(int),
+        "nivel": df["nivel"],
+        "detalhe": df["detalhe"],
+        "emoji": df["icone"].map(EMOJIS),  # USAR EMOJI REAL
+    })
 
 # -------------------------------
 # SELETOR DE ANOS
@@ -136,7 +118,7 @@ with col1:
 with col2:
     st.markdown("### Comparação de Impacto por Ano")
     fig = go.Figure()
-    meses_ordenados = ["Janeiro", "Fevereiro/Março", "Abril", "Maio", "Junho", "Setembro", "Outubro", "Novembro", "Dezembro"]
+    meses_ordenados = [m for m in MESES if m in set(df_completo["mes"])]
     
     for ano in anos_selecionados:
         df_ano = df_completo[df_completo["ano"] == ano]
@@ -161,12 +143,14 @@ with col2:
 
     # MÉTRICAS
     st.markdown("### Projeção de Crescimento")
-    base = 2_800_000
+    # Audiência média diária do inventário (soma dos pontos), ajustada/projetada por ponto
+    media_ano = get_forecast().yearly_total()
+    base = media_ano.loc[2024]
     cols = st.columns(3)
     for i, ano in enumerate(anos_selecionados[:3]):
-        fator = (1.15) ** (ano - 2024)
-        projetado = int(base * fator)
-        delta = f"+{int((fator-1)*100)}%"
+        fator = media_ano.loc[ano] / base
+        projetado = int(media_ano.loc[ano] * 1000)
+        delta = f"{(fator-1)*100:+.0f}%"
         with cols[i]:
             # Mantido o HTML customizado para as métricas, pois é um design bonito.
             st.markdown(f"""
@@ -177,6 +161,24 @@ with col2:
             </div>
             """.replace(",", "."), unsafe_allow_html=True)
 
+    # MULTIPLICADOR DIÁRIO (calendário de feriados)
+    st.markdown(f"### Multiplicador Diário de Fluxo – {ano_exibir}")
+    df_dias = get_multipliers().frame(ano_exibir)
+    fig_dias = go.Figure()
+    fig_dias.add_trace(go.Scatter(x=df_dias["data"], y=df_dias["pedestres"], name="Pedestres",
+                                  mode='lines', line=dict(color=CORES_ANO[ano_exibir], shape='hv'),
+                                  text=df_dias["evento"], hovertemplate="%{x|%d/%m}: %{y:.2f}x %{text}"))
+    fig_dias.add_trace(go.Scatter(x=df_dias["data"], y=df_dias["onibus"], name="Ônibus",
+                                  mode='lines', line=dict(color="#555", dash='dot', shape='hv'),
+                                  text=df_dias["evento"], hovertemplate="%{x|%d/%m}: %{y:.2f}x %{text}"))
+    fig_dias.update_layout(
+        yaxis_title="Multiplicador (1 = dia comum)",
+        template="simple_white",
+        height=300,
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+    )
+    st.plotly_chart(fig_dias, use_container_width=True)
+
     # TABELA NATAL
     st.markdown("### Tabela Comparativa (Natal)")
     natal = df_completo[df_completo["evento"].str.contains("Natal", case=False)]
@@ -198,4 +200,4 @@ st.success("""
 - 2026 → Domínio (+32%) 
 Planeje campanhas com 2 anos de antecedência!
 """)
-st.caption("Projeção com +15% anual (Artesp, CET-SP, tendência urbana SP)")
+st.caption("Projeção por ponto do inventário: tendência, sazonalidade semanal e anual e feriados (Artesp, CET-SP, tendência urbana SP)")
@@ -3,16 +3,25 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
-from datetime import datetime
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import plotly.express as px 
-from PIL import Image 
-from fpdf import FPDF 
+
+from src.cube import get_cube
+from src.data import MES_ORDER, get_table, table_version
+from src.exports import FORMATS, export_bytes
+from src.forecast import get_forecast
+from src.report import build_pdf_report, compute_aggregates
 
 # Tenta importar a função utilitária. Se falhar, define um fallback.
 try:
-    from src.utils import set_page_config_and_style
+    from src.utils import set_page_config_and_style, render_debug_panel, span
 except ImportError:
+    import contextlib
+
+    def span(name, **attrs): return contextlib.nullcontext()
+    def render_debug_panel(): pass
     def set_page_config_and_style(page_title, main_title, subtitle):
         st.set_page_config(layout="wide", page_title=page_title)
         st.title(main_title)
@@ -28,50 +37,28 @@ set_page_config_and_style(
 )
 
 # -------------------------------
-# DADOS MOCK E CÁLCULOS (AUMENTO DE DADOS E SAZONALIDADE)
+# DADOS (CAMADA COMPARTILHADA) E CÁLCULOS
 # -------------------------------
-@st.cache_data
-def get_mock_data():
-    """Gera um DataFrame unificado simulando 100 campanhas ao longo de 12 meses."""
-    N_CAMPANHAS = 100
-    np.random.seed(42) 
-
-    meses_full = ['Jan', 'Fev', 'Mar', 'Abr', 'Maio', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-    # Probabilidade (sazonalidade)
-    meses = np.random.choice(meses_full, N_CAMPANHAS, p=[0.06, 0.07, 0.08, 0.07, 0.08, 0.08, 0.08, 0.07, 0.08, 0.09, 0.10, 0.14])
-    
-    tipos_midia = np.random.choice(['Digital', 'Estática'], N_CAMPANHAS, p=[0.6, 0.4])
-    
-    investimentos = np.random.uniform(50, 400, N_CAMPANHAS).round(1)
-    for i, mes in enumerate(meses):
-        if mes == 'Dez':
-            investimentos[i] *= 1.5 
-
-    reach = (investimentos * np.random.uniform(0.015, 0.025, N_CAMPANHAS)).round(2) 
-    
-    cpm = np.random.uniform(2.0, 7.0, N_CAMPANHAS).round(2)
-    cpm[tipos_midia == 'Digital'] *= 0.8 
-
-    frequencia = np.random.uniform(3.0, 8.0, N_CAMPANHAS).round(1)
-
-    data = {
-        'ID_Campanha': [f'C{i:03d}' for i in range(1, N_CAMPANHAS + 1)],
-        'Mes': meses,
-        'Tipo_Midia': tipos_midia,
-        'Investimento_Mil_R$': investimentos,
-        'Reach_Milhoes': reach,
-        'Frequencia': frequencia,
-        'CPM_R$': cpm,
-        'Audiencia_Pico_K': np.random.randint(70, 300, N_CAMPANHAS)
-    }
-    return pd.DataFrame(data)
-
-# Variáveis Globais
-df_relatorio = get_mock_data()
-total_investimento = df_relatorio['Investimento_Mil_R$'].sum()
-media_cpm = df_relatorio['CPM_R$'].mean()
-total_reach = df_relatorio['Reach_Milhoes'].sum().round(1)
-num_campanhas = len(df_relatorio)
+@st.cache_resource
+def get_report_aggregates(versao: str) -> dict:
+    """Agregados + superfície de projeção (12 meses x aumentos), calculados uma vez por versão dos dados."""
+    return compute_aggregates(get_table('campanhas_relatorio'), cube=get_cube('campanhas_relatorio'))
+
+# Variáveis Globais (totais lidos do cubo mês x tipo de mídia, sem varrer as linhas)
+df_relatorio = get_table('campanhas_relatorio')
+versao_dados = table_version('campanhas_relatorio')
+with span("relatorio.agregados"):
+    aggregates = get_report_aggregates(versao_dados)
+cubo = get_cube('campanhas_relatorio')
+totais = cubo.agg(
+    total_investimento=('Investimento_Mil_R$', 'sum'),
+    media_cpm=('CPM_R$', 'mean'),
+    total_reach=('Reach_Milhoes', 'sum'),
+)
+total_investimento = totais['total_investimento']
+media_cpm = totais['media_cpm']
+total_reach = round(totais['total_reach'], 1)
+num_campanhas = totais['linhas']
 
 # -------------------------------
 # 1. RESUMO EXECUTIVO NA TELA (Mantido)
@@ -87,10 +74,7 @@ st.markdown("---")
 
 # Visualização do gráfico no dashboard (opcional)
 if st.checkbox("Mostrar Gráfico de Investimento (Visão Dashboard)"):
-    df_agg = df_relatorio.groupby('Mes')['Investimento_Mil_R$'].sum().reset_index()
-    mes_order = ['Jan', 'Fev', 'Mar', 'Abr', 'Maio', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-    df_agg['Mes'] = pd.Categorical(df_agg['Mes'], categories=mes_order, ordered=True)
-    df_agg = df_agg.sort_values('Mes')
+    df_agg = cubo.agg(by='Mes', **{'Investimento_Mil_R$': ('Investimento_Mil_R$', 'sum')})
     fig_dash = px.bar(
         df_agg, 
         x='Mes', 
@@ -101,17 +85,51 @@ if st.checkbox("Mostrar Gráfico de Investimento (Visão Dashboard)"):
     st.plotly_chart(fig_dash, use_container_width=True)
 
 # -------------------------------
-# 2. DOWNLOAD CSV (Mantido)
+# PROJEÇÃO DE AUDIÊNCIA DO INVENTÁRIO (previsão por ponto já calculada)
 # -------------------------------
-st.markdown("### 📥 Download em CSV")
-csv = df_relatorio.to_csv(index=False).encode('utf-8')
-st.download_button(
-    label="Baixar Dados em CSV",
-    data=csv,
-    file_name='relatorio_ooh_detalhado.csv',
-    mime='text/csv',
-    type="primary"
+st.markdown("### Projeção de Audiência do Inventário (Próximos 12 Meses)")
+hoje = pd.Timestamp.today()
+with span("relatorio.previsao_audiencia"):
+    df_prev = get_forecast().monthly_total(f"{hoje:%Y-%m}", meses=12)
+col_prev1, col_prev2 = st.columns(2)
+with col_prev1:
+    st.metric("Audiência Projetada (12 meses, Milhões)", f"{df_prev['audiencia'].sum() / 1000:,.1f}".replace(",", "_").replace(".", ",").replace("_", "."))
+with col_prev2:
+    pico = df_prev.loc[df_prev['audiencia'].idxmax()]
+    st.metric("Mês de Pico", f"{pico['mes']:%m/%Y}")
+fig_prev = px.bar(
+    df_prev.assign(Mes=df_prev['mes'].dt.strftime('%m/%Y'), Origem=np.where(df_prev['projetado'], 'Projetado', 'Realizado + ajuste')),
+    x='Mes', y='audiencia', color='Origem',
+    title='Audiência Mensal do Inventário (Milhares)',
+    labels={'audiencia': 'Audiência (Milhares)', 'Mes': 'Mês'},
+    color_discrete_sequence=['#1E90FF', '#FF8C00']
 )
+st.plotly_chart(fig_prev, use_container_width=True)
+
+st.markdown("---")
+
+# -------------------------------
+# 2. DOWNLOAD CSV (Mantido)
+# -------------------------------
+st.markdown("### 📥 Download dos Dados")
+# Arquivos gerados só no clique (em blocos, comprimidos) e reaproveitados enquanto os dados não mudarem
+df_export = df_relatorio
+col_csv, col_parquet = st.columns(2)
+with col_csv:
+    st.download_button(
+        label="Baixar Dados em CSV (gzip)",
+        data=lambda: export_bytes(df_export, 'csv.gz', versao_dados),
+        file_name='relatorio_ooh_detalhado.csv.gz',
+        mime=FORMATS['csv.gz'],
+        type="primary"
+    )
+with col_parquet:
+    st.download_button(
+        label="Baixar Dados em Parquet",
+        data=lambda: export_bytes(df_export, 'parquet', versao_dados),
+        file_name='relatorio_ooh_detalhado.parquet',
+        mime=FORMATS['parquet'],
+    )
 
 
 # -------------------------------
@@ -120,7 +138,7 @@ st.download_button(
 st.markdown("### 📄 Configuração da Projeção para o PDF")
 
 # CONTROLES INTERATIVOS PARA PROJEÇÃO
-meses_disponiveis = ['Jan', 'Fev', 'Mar', 'Abr', 'Maio', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+meses_disponiveis = MES_ORDER
 col_proj1, col_proj2 = st.columns(2)
 
 with col_proj1:
@@ -143,301 +161,133 @@ with col_proj2:
     # Converte o percentual para decimal (ex: 25 -> 0.25)
     aumento_investimento_decimal = aumento_investimento_percent / 100.0
 
+# Resultado da simulação: leitura direta da superfície pré-calculada (sem recalcular agregados)
+projecao = aggregates['projection']
+ponto = projecao.point(projecao_mes_selecionado, aumento_investimento_percent)
+col_sim1, col_sim2 = st.columns(2)
+with col_sim1:
+    st.metric(
+        f"Investimento Projetado em {projecao_mes_selecionado} (Mil R$)",
+        f"{ponto['novo_investimento']:,.0f}".replace(",", "."),
+        delta=f"{ponto['incremento_investimento']:,.0f}".replace(",", ".")
+    )
+with col_sim2:
+    st.metric(
+        f"Reach Projetado em {projecao_mes_selecionado} (Milhões)",
+        f"{ponto['novo_reach']:,.1f}".replace(",", "_").replace(".", ",").replace("_", "."),
+        delta=f"{ponto['incremento_reach']:,.1f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    )
+if not ponto['has_history']:
+    st.caption("Mês sem histórico: a projeção usa a média mensal como base.")
+
+with st.expander("Tabela de sensibilidade (todos os meses x aumentos)"):
+    metrica_sens = st.radio("Métrica", ["Reach (Milhões)", "Investimento (Mil R$)"], horizontal=True)
+    tabela_sens = projecao.sensitivity_table(
+        'reach' if metrica_sens.startswith("Reach") else 'investimento',
+        percents=range(10, 101, 10)
+    )
+    st.dataframe(tabela_sens.style.format("{:,.1f}"), use_container_width=True)
+
+incluir_anexo = st.checkbox(
+    "Incluir anexo com todas as campanhas",
+    value=False,
+    help="Acrescenta ao PDF a tabela completa de campanhas, com cabeçalho repetido em cada página."
+)
+
 
-def create_pdf_report(df: pd.DataFrame, projecao_mes: str, aumento_investimento_percent: float) -> bytes:
+def create_pdf_report(df: pd.DataFrame, projecao_mes: str, aumento_investimento_percent: float,
+                      anexo: bool = False, aggregates: dict = None) -> bytes:
     """
     Função que gera um relatório PDF focado em storytelling, detalhamento e projeção futura
-    baseada na sazonalidade, utilizando parâmetros interativos.
+    baseada na sazonalidade, utilizando parâmetros interativos (montagem em `src.report`).
     """
-    try:
-        # 1. PRÉ-CÁLCULOS
-        
-        # Agregação Mensal Completa
-        mes_order = ['Jan', 'Fev', 'Mar', 'Abr', 'Maio', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-        df['Mes'] = pd.Categorical(df['Mes'], categories=mes_order, ordered=True)
-        df_monthly = df.groupby('Mes', observed=True).agg(
-            Total_Investimento=('Investimento_Mil_R$', 'sum'),
-            Media_CPM=('CPM_R$', 'mean'),
-            Total_Reach=('Reach_Milhoes', 'sum'),
-            Media_Frequencia=('Frequencia', 'mean') 
-        ).reset_index()
-        df_monthly = df_monthly.sort_values('Mes') 
-
-        df_monthly['Media_Frequencia'] = df_monthly['Media_Frequencia'].round(1)
-        df_monthly['Media_CPM'] = df_monthly['Media_CPM'].round(2)
-        df_monthly['Total_Reach'] = df_monthly['Total_Reach'].round(1)
-        df_monthly['Total_Investimento'] = df_monthly['Total_Investimento'].round(0)
-
-        # Agregação por Mídia para Detalhe
-        df_media = df.groupby('Tipo_Midia').agg(
-            Media_CPM=('CPM_R$', 'mean'),
-            Total_Reach=('Reach_Milhoes', 'sum'),
-            Total_Investimento=('Investimento_Mil_R$', 'sum'),
-            Media_Frequencia=('Frequencia', 'mean')
-        ).reset_index()
-        df_media['Media_Frequencia'] = df_media['Media_Frequencia'].round(1)
-        df_media['Media_CPM'] = df_media['Media_CPM'].round(2)
-        df_media['Total_Reach'] = df_media['Total_Reach'].round(1)
-        df_media['Total_Investimento'] = df_media['Total_Investimento'].round(0)
-
-        # ENCONTRAR MÉTRICAS CHAVE GERAIS
-        melhor_midia_cpm = df_media.loc[df_media['Media_CPM'].idxmin()]
-        total_investimento_geral = df_monthly['Total_Investimento'].sum()
-        maior_investimento_mes = df_monthly.loc[df_monthly['Total_Investimento'].idxmax()]
-        
-        # 2. DEFINIÇÃO DA PROJEÇÃO
-        df_mes_projecao = df_monthly[df_monthly['Mes'] == projecao_mes]
-        
-        if df_mes_projecao.empty:
-            cpm_base_projecao = df_monthly['Media_CPM'].mean()
-            investimento_base = df_monthly['Total_Investimento'].mean()
-            reach_base = df_monthly['Total_Reach'].mean()
-            narrativa_sazonal = "Média Geral"
-        else:
-            cpm_base_projecao = df_mes_projecao['Media_CPM'].iloc[0]
-            investimento_base = df_mes_projecao['Total_Investimento'].iloc[0]
-            reach_base = df_mes_projecao['Total_Reach'].iloc[0]
-            narrativa_sazonal = f"Performance Histórica de {projecao_mes}"
-
-        # CÁLCULO DA PROJEÇÃO
-        novo_investimento = investimento_base * (1 + aumento_investimento_percent)
-        novo_reach_proj_milhoes = (novo_investimento * 1000) / cpm_base_projecao / 1000
-        
-        
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # --- CONFIGURAÇÕES BÁSICAS ---
-        pdf.set_auto_page_break(auto=True, margin=15)
-        
-        # --- TÍTULO ---
-        pdf.set_font("Arial", "B", 18) 
-        pdf.cell(200, 10, "Relatório Executivo de Performance OOH", 0, 1, "C")
-        pdf.set_font("Arial", "", 10)
-        pdf.cell(200, 5, f"Período Analisado: 12 Meses | Projeção para: {projecao_mes} | Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M')}", 0, 1, "C")
-        pdf.ln(10)
-
-        # ------------------------------------------------------------------
-        # --- SEÇÃO 1: RESUMO EXECUTIVO (STORYTELLING) ---
-        # ------------------------------------------------------------------
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(200, 10, "1. Análise Sumária do Período", 0, 1, "L")
-        
-        pdf.set_font("Arial", "", 12)
-        pdf.multi_cell(0, 6, 
-            f"O período analisado (Total de {num_campanhas} campanhas) demonstrou um investimento total de "
-            f"R$ {total_investimento_geral:,.0f} mil. O alcance total foi de {df.loc[:, 'Reach_Milhoes'].sum():,.1f} milhões, com um CPM médio de R$ {df.loc[:, 'CPM_R$'].mean():.2f}. "
-            f"O mês com maior investimento foi **{maior_investimento_mes['Mes']}** (R$ {maior_investimento_mes['Total_Investimento']:,.0f} mil)."
-        )
-        pdf.ln(5)
-
-        # ------------------------------------------------------------------
-        # --- SEÇÃO 2: PERFORMANCE CONSOLIDADA POR MÍDIA (NARRATIVA) ---
-        # ------------------------------------------------------------------
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(200, 10, "2. Performance Tática por Tipo de Mídia", 0, 1, "L")
-        
-        pdf.set_font("Arial", "", 12)
-        
-        cpm_digital = df_media[df_media['Tipo_Midia'] == 'Digital']['Media_CPM'].iloc[0]
-        cpm_estatica = df_media[df_media['Tipo_Midia'] == 'Estática']['Media_CPM'].iloc[0]
-        
-        reach_digital = df_media[df_media['Tipo_Midia'] == 'Digital']['Total_Reach'].iloc[0]
-        freq_digital = df_media[df_media['Tipo_Midia'] == 'Digital']['Media_Frequencia'].iloc[0]
-        
-        narrativa_midia = (
-            f"A mídia **Digital** se estabeleceu como a opção mais eficiente, com um CPM médio de R$ {cpm_digital:.2f} (vs. R$ {cpm_estatica:.2f} da Estática). "
-            f"Esta eficiência resultou em um Reach total de {reach_digital:.1f} milhões, acompanhado por uma alta frequência média ({freq_digital:.1f} exposições). "
-            f"Recomendamos uma alocação prioritária em mídias com o menor custo por resultado para maximizar o alcance por real investido."
-        )
-        pdf.multi_cell(0, 6, narrativa_midia)
-        
-        pdf.ln(5)
-
-        # ------------------------------------------------------------------
-        # --- SEÇÃO 3: ANÁLISE REACH vs. FREQUÊNCIA (NOVO DETALHE) ---
-        # ------------------------------------------------------------------
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(200, 10, "3. Análise: O Equilíbrio entre Alcance (Reach) e Frequência", 0, 1, "L")
-        
-        pdf.set_font("Arial", "", 12)
-        
-        frequencia_geral = df['Frequencia'].mean()
-        if frequencia_geral > 5.5:
-            foco_estrategico = "A estratégia da campanha se inclinou para garantir uma **Frequência** elevada, com média de {frequencia_geral:.1f} exposições por pessoa, otimizando a memorização da mensagem. A manutenção deste nível de frequência requer um investimento constante."
-        else:
-            foco_estrategico = "A estratégia foi balanceada, com maior foco no **Reach** (alcance) e uma frequência média de {frequencia_geral:.1f}. O próximo passo pode ser otimizar campanhas específicas para aumentar a frequência em segmentos-chave."
-            
-        pdf.multi_cell(0, 6, foco_estrategico.format(frequencia_geral=frequencia_geral))
-        
-        pdf.ln(5)
-        
-        # Quebra de página para começar a projeção e detalhamento na próxima folha
-        pdf.add_page()
-        
-        # ------------------------------------------------------------------
-        # --- SEÇÃO 4: PROJEÇÃO SAZONAL ---
-        # ------------------------------------------------------------------
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(200, 10, f"4. Projeção Estratégica: Campanha Sazonal {projecao_mes}", 0, 1, "L")
-        
-        pdf.set_font("Arial", "", 12)
-        pdf.multi_cell(0, 6, 
-            f"Focando no próximo período sazonal de **{projecao_mes}**, que historicamente demonstrou alta demanda (Base de Performance: **{narrativa_sazonal}**), esta projeção simula o potencial de alcance com um aumento de **{aumento_investimento_percent*100:.0f}%** no investimento."
-        )
-        pdf.ln(3)
-
-        # Tabela de Projeção
-        pdf.set_font("Arial", "B", 11)
-        col_widths_proj = [50, 40, 40, 40]
-        headers_proj = ["Métrica", "Cenário Histórico", "Cenário Projetado", "Incremento"]
-        
-        for col, width in zip(headers_proj, col_widths_proj):
-            pdf.cell(width, 7, col, 1, 0, "C")
-        pdf.ln()
-
-        pdf.set_font("Arial", "", 10)
-
-        # Linha Investimento
-        incremento_investimento = novo_investimento - investimento_base
-        pdf.cell(col_widths_proj[0], 7, "Investimento (R$K)", 1, 0)
-        pdf.cell(col_widths_proj[1], 7, f"R$ {investimento_base:,.0f}", 1, 0, "R")
-        pdf.set_font("Arial", "B", 10)
-        pdf.cell(col_widths_proj[2], 7, f"R$ {novo_investimento:,.0f}", 1, 0, "R")
-        pdf.set_font("Arial", "", 10)
-        pdf.cell(col_widths_proj[3], 7, f"R$ {incremento_investimento:,.0f}", 1, 0, "R")
-        pdf.ln()
-
-        # Linha Reach
-        incremento_reach = novo_reach_proj_milhoes - reach_base
-        pdf.cell(col_widths_proj[0], 7, "Reach (Milhões)", 1, 0)
-        pdf.cell(col_widths_proj[1], 7, f"{reach_base:.1f}", 1, 0, "R")
-        pdf.set_font("Arial", "B", 10)
-        pdf.cell(col_widths_proj[2], 7, f"{novo_reach_proj_milhoes:.1f}", 1, 0, "R")
-        pdf.set_font("Arial", "", 10)
-        pdf.cell(col_widths_proj[3], 7, f"{incremento_reach:.1f}", 1, 0, "R")
-        pdf.ln()
-        
-        pdf.ln(8)
-        
-        # ------------------------------------------------------------------
-        # --- SEÇÃO 5: PERFORMANCE CONSOLIDADA POR MÍDIA (TABELA) ---
-        # ------------------------------------------------------------------
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(200, 10, "5. Detalhe Consolidado por Tipo de Mídia", 0, 1, "L")
-        
-        pdf.set_font("Arial", "B", 10)
-        col_widths_media = [40, 40, 40, 40, 30]
-        headers_media = ["Mídia", "Investimento (R$K)", "Reach (Milhões)", "CPM Médio (R$)", "Freq. Média"]
-        
-        for col, width in zip(headers_media, col_widths_media):
-            pdf.cell(width, 7, col, 1, 0, "C")
-        pdf.ln()
-
-        pdf.set_font("Arial", "", 10)
-        for _, row in df_media.iterrows():
-            pdf.cell(col_widths_media[0], 7, row['Tipo_Midia'], 1, 0)
-            pdf.cell(col_widths_media[1], 7, f"R$ {row['Total_Investimento']:,.0f}", 1, 0, "R")
-            pdf.cell(col_widths_media[2], 7, f"{row['Total_Reach']:.1f}", 1, 0, "R")
-            
-            if row['Media_CPM'] == melhor_midia_cpm['Media_CPM']:
-                pdf.set_font("Arial", "B", 10)
-            pdf.cell(col_widths_media[3], 7, f"R$ {row['Media_CPM']:.2f}", 1, 0, "R")
-            pdf.set_font("Arial", "", 10) 
-            
-            pdf.cell(col_widths_media[4], 7, f"{row['Media_Frequencia']:.1f}", 1, 0, "R")
-            pdf.ln()
-        
-        pdf.ln(5)
-
-        # ------------------------------------------------------------------
-        # --- SEÇÃO 6: TABELA DE PERFORMANCE MENSAL ---
-        # ------------------------------------------------------------------
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(200, 10, "6. Detalhe Completo de Evolução Mensal", 0, 1, "L")
-        
-        pdf.set_font("Arial", "B", 9)
-        col_widths = [30, 35, 35, 35, 35]
-        headers = ["Mês", "Investimento (R$K)", "Reach (Milhões)", "CPM Médio (R$)", "Freq. Média"] 
-        
-        for col, width in zip(headers, col_widths):
-            pdf.cell(width, 7, col, 1, 0, "C")
-        pdf.ln()
-
-        pdf.set_font("Arial", "", 9)
-        for _, row in df_monthly.iterrows():
-            pdf.cell(col_widths[0], 7, row['Mes'], 1, 0)
-            pdf.cell(col_widths[1], 7, f"R$ {row['Total_Investimento']:,.0f}", 1, 0, "R")
-            pdf.cell(col_widths[2], 7, f"{row['Total_Reach']:.1f}", 1, 0, "R")
-            
-            if row['Media_CPM'] > df_monthly['Media_CPM'].mean() * 1.1:
-                pdf.set_text_color(255, 0, 0) # Alto CPM
-            pdf.cell(col_widths[3], 7, f"R$ {row['Media_CPM']:.2f}", 1, 0, "R")
-            pdf.set_text_color(0, 0, 0) 
-            
-            pdf.cell(col_widths[4], 7, f"{row['Media_Frequencia']:.1f}", 1, 0, "R") 
-            pdf.ln()
-
-        pdf.ln(10)
-        
-        # Quebra de página para a última tabela
-        pdf.add_page()
-
-        # ------------------------------------------------------------------
-        # --- SEÇÃO 7: DETALHE COMPLETO DA CAMPANHA (TOP 10) ---
-        # ------------------------------------------------------------------
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(200, 10, "7. Detalhe Tático por Campanha (Top 10 em Investimento)", 0, 1, "L")
-        
-        pdf.set_font("Arial", "I", 10)
-        pdf.cell(200, 5, "Análise detalhada das 10 campanhas com maior investimento no período.", 0, 1, "L")
-        pdf.ln(2)
-
-        pdf.set_font("Arial", "B", 7) 
-        col_widths_detalhe = [18, 15, 20, 20, 20, 20, 20, 20]
-        headers_detalhe = ["ID", "Mês", "Mídia", "Invest.(K)", "Reach(MM)", "Freq.", "CPM", "Audiência(K)"]
-        
-        for col, width in zip(headers_detalhe, col_widths_detalhe):
-            pdf.cell(width, 7, col, 1, 0, "C")
-        pdf.ln()
-
-        pdf.set_font("Arial", "", 7)
-        df_detail = df.sort_values(by='Investimento_Mil_R$', ascending=False).head(10)
-        
-        for _, row in df_detail.iterrows():
-            pdf.cell(col_widths_detalhe[0], 5, row['ID_Campanha'], 1, 0)
-            pdf.cell(col_widths_detalhe[1], 5, row['Mes'], 1, 0, "C")
-            pdf.cell(col_widths_detalhe[2], 5, row['Tipo_Midia'], 1, 0)
-            pdf.cell(col_widths_detalhe[3], 5, f"{row['Investimento_Mil_R$']:.1f}", 1, 0, "R")
-            pdf.cell(col_widths_detalhe[4], 5, f"{row['Reach_Milhoes']:.1f}", 1, 0, "R")
-            pdf.cell(col_widths_detalhe[5], 5, f"{row['Frequencia']:.1f}", 1, 0, "R")
-            pdf.cell(col_widths_detalhe[6], 5, f"{row['CPM_R$']:.2f}", 1, 0, "R")
-            pdf.cell(col_widths_detalhe[7], 5, f"{row['Audiencia_Pico_K']}", 1, 0, "R")
-            pdf.ln()
-
-        # RETORNO BINÁRIO
-        buffer = io.BytesIO(pdf.output(dest='S'))
-        return buffer.getvalue() 
-        
-    except ImportError:
-        st.error("Erro: A biblioteca `fpdf` não foi encontrada. Certifique-se de que está instalada (pip install fpdf2).")
-        return b"ERRO: Instale 'fpdf2' para gerar o PDF."
-
-    except Exception as e:
-        st.error(f"Erro Crítico ao gerar PDF: {type(e).__name__}: {e}")
-        return f"ERRO CRÍTICO NA GERAÇÃO DO PDF: {type(e).__name__}: {e}".encode('utf-8')
+    return build_pdf_report(df, projecao_mes, aumento_investimento_percent, aggregates, appendix=anexo)
+
+# -------------------------------
+# CACHE DE PDFs (GERADOS SOB DEMANDA, FORA DO RERUN)
+# -------------------------------
+class PdfBuildCache:
+    """
+    PDFs prontos (ou em construção) por chave de dados + parâmetros, compartilhados
+    entre sessões. A construção roda num pool de threads e pedidos simultâneos da
+    mesma chave aguardam o mesmo Future em vez de gerar o documento duas vezes.
+    """
+
+    def __init__(self, max_entries: int = 16, max_workers: int = 2):
+        self.max_entries = max_entries
+        self._futures = OrderedDict()
+        self._errors = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-report")
+
+    def get(self, key: str, build_fn) -> bytes:
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._executor.submit(build_fn)
+                self._futures[key] = future
+            self._futures.move_to_end(key)
+            while len(self._futures) > self.max_entries:
+                self._futures.popitem(last=False)
+        try:
+            pdf = future.result()
+        except Exception as e:
+            # Falha não fica em cache: o próximo clique tenta de novo e o erro
+            # é mostrado pela página no próximo rerun (esta thread não tem contexto do Streamlit)
+            with self._lock:
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+                self._errors[key] = e
+            raise
+        with self._lock:
+            self._errors.pop(key, None)
+        return pdf
+
+    def last_error(self, key: str):
+        """Exceção da última tentativa de gerar o PDF desta chave, se falhou."""
+        with self._lock:
+            return self._errors.get(key)
+
+
+@st.cache_resource
+def get_pdf_cache() -> PdfBuildCache:
+    return PdfBuildCache()
+
 
 # -------------------------------
 # Botão de Download PDF (chama a função com os parâmetros interativos)
 # -------------------------------
 st.markdown("---")
-pdf_bytes = create_pdf_report(df_relatorio, projecao_mes_selecionado, aumento_investimento_decimal)
+pdf_key = f"{versao_dados}|{projecao_mes_selecionado}|{aumento_investimento_percent}|{incluir_anexo}"
+df_pdf = df_export
+
+
+def timed_pdf(*args) -> bytes:
+    with span("relatorio.pdf", mes=projecao_mes_selecionado, anexo=incluir_anexo):
+        return create_pdf_report(*args)
+
+
+def build_pdf_on_demand() -> bytes:
+    """Executado só no clique de download (em outra thread); reaproveita PDFs já gerados."""
+    return get_pdf_cache().get(
+        pdf_key,
+        lambda: timed_pdf(df_pdf, projecao_mes_selecionado, aumento_investimento_decimal, incluir_anexo, aggregates),
+    )
+
+
+erro_pdf = get_pdf_cache().last_error(pdf_key)
+if isinstance(erro_pdf, ImportError):
+    st.error("Erro: A biblioteca `fpdf` não foi encontrada. Certifique-se de que está instalada (pip install fpdf2).")
+elif erro_pdf is not None:
+    st.error(f"Erro Crítico ao gerar PDF: {type(erro_pdf).__name__}: {erro_pdf}")
 
 st.download_button(
     label="Baixar Relatório em PDF",
-    data=pdf_bytes,
+    data=build_pdf_on_demand,
     file_name=f'relatorio_executivo_projecao_{projecao_mes_selecionado}.pdf',
     mime='application/pdf',
     type="primary",
     help="Gera um relatório PDF detalhado com análise sazonal e projeção de investimento futura."
 )
+
+render_debug_panel()
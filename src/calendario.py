@@ -0,0 +1,181 @@
+# src/calendario.py - feriados (fixos, móveis pela Páscoa e regionais de SP) e multiplicadores diários de fluxo
+"""
+Cada evento é uma regra, não uma data digitada:
+
+    ('fixa', mes, dia)      mesma data todo ano (Natal, Tiradentes, aniversário de SP...)
+    ('pascoa', deslocamento) dias em relação ao domingo de Páscoa
+                            (Carnaval -48, Sexta-Feira Santa -2, Corpus Christi +60)
+
+A Páscoa é calculada pelo algoritmo gregoriano anônimo (Meeus/Jones/Butcher)
+para um array de anos de uma vez, então o calendário de qualquer faixa de
+anos sai sem laço por ano.
+
+`get_multipliers()` devolve os multiplicadores diários de pedestres e ônibus
+de ANO_INICIO a ANO_FIM (1 = dia comum, 1.5 = +50%) como arrays indexados
+pelo dia (`DailyMultipliers.at(datas)`), montados uma vez por processo.
+"""
+import threading
+from datetime import date
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+ANO_INICIO, ANO_FIM = 2024, 2040
+
+MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 'Julho',
+         'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+
+# Aumento de fluxo (%) observado no dia, nível de impacto (1-4) e regra da data
+EVENTOS = [
+    {"evento": "Ano Novo", "tipo": "Feriado", "regra": ('fixa', 1, 1), "dias": 1, "pedestres": 20, "onibus": 15, "nivel": 3, "detalhe": "Compras pós-festas", "icone": "party-popper"},
+    {"evento": "Aniversário de São Paulo", "tipo": "Feriado SP", "regra": ('fixa', 1, 25), "dias": 1, "pedestres": 20, "onibus": 10, "nivel": 3, "detalhe": "Eventos no Centro", "icone": "flag"},
+    {"evento": "Carnaval", "tipo": "Feriado", "regra": ('pascoa', -48), "dias": 2, "pedestres": 50, "onibus": 40, "nivel": 4, "detalhe": "Blocos e eventos", "icone": "mask"},
+    {"evento": "Sexta-Feira Santa", "tipo": "Feriado", "regra": ('pascoa', -2), "dias": 1, "pedestres": 10, "onibus": 5, "nivel": 2, "detalhe": "Missas", "icone": "church"},
+    {"evento": "Tiradentes", "tipo": "Feriado", "regra": ('fixa', 4, 21), "dias": 1, "pedestres": 15, "onibus": 10, "nivel": 2, "detalhe": "Viagens", "icone": "flag"},
+    {"evento": "Dia do Trabalho", "tipo": "Feriado", "regra": ('fixa', 5, 1), "dias": 1, "pedestres": 25, "onibus": 20, "nivel": 3, "detalhe": "Protestos", "icone": "briefcase"},
+    {"evento": "Corpus Christi", "tipo": "Ponto Facultativo", "regra": ('pascoa', 60), "dias": 1, "pedestres": 15, "onibus": 10, "nivel": 2, "detalhe": "Procissões", "icone": "church"},
+    {"evento": "Revolução Constitucionalista", "tipo": "Feriado SP", "regra": ('fixa', 7, 9), "dias": 1, "pedestres": 10, "onibus": 5, "nivel": 2, "detalhe": "Viagens", "icone": "scroll"},
+    {"evento": "Independência", "tipo": "Feriado", "regra": ('fixa', 9, 7), "dias": 1, "pedestres": 20, "onibus": 15, "nivel": 3, "detalhe": "Desfiles", "icone": "flag"},
+    {"evento": "Nossa Senhora Aparecida + Dia das Crianças", "tipo": "Feriado", "regra": ('fixa', 10, 12), "dias": 1, "pedestres": 30, "onibus": 25, "nivel": 4, "detalhe": "Compras", "icone": "baby"},
+    {"evento": "Finados", "tipo": "Feriado", "regra": ('fixa', 11, 2), "dias": 1, "pedestres": 10, "onibus": 8, "nivel": 1, "detalhe": "Cemitérios", "icone": "candle"},
+    {"evento": "Proclamação da República", "tipo": "Feriado", "regra": ('fixa', 11, 15), "dias": 1, "pedestres": 15, "onibus": 12, "nivel": 2, "detalhe": "Viagens", "icone": "scroll"},
+    {"evento": "Consciência Negra", "tipo": "Feriado SP", "regra": ('fixa', 11, 20), "dias": 1, "pedestres": 25, "onibus": 20, "nivel": 3, "detalhe": "Eventos", "icone": "raised-fist"},
+    {"evento": "Natal", "tipo": "Feriado", "regra": ('fixa', 12, 25), "dias": 1, "pedestres": 40, "onibus": 30, "nivel": 4, "detalhe": "Compras", "icone": "christmas-tree"},
+    {"evento": "Réveillon", "tipo": "Ponto Facultativo", "regra": ('fixa', 12, 31), "dias": 1, "pedestres": 50, "onibus": 40, "nivel": 4, "detalhe": "Festas", "icone": "fireworks"},
+]
+
+
+def easter(anos) -> np.ndarray:
+    """Domingo de Páscoa (datetime64[D]) de cada ano do array `anos`."""
+    y = np.asarray(anos, dtype=np.int64)
+    a, b, c = y % 19, y // 100, y % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes = (h + l - 7 * m + 114) // 31
+    dia = (h + l - 7 * m + 114) % 31 + 1
+    return _ymd(y, mes, dia)
+
+
+def _ymd(y, m, d) -> np.ndarray:
+    """Arrays de ano, mês e dia -> datetime64[D]."""
+    y, m, d = np.broadcast_arrays(np.asarray(y, dtype=np.int64), np.asarray(m, dtype=np.int64), np.asarray(d, dtype=np.int64))
+    meses = (y - 1970) * 12 + (m - 1)
+    return meses.astype('datetime64[M]').astype('datetime64[D]') + (d - 1).astype('timedelta64[D]')
+
+
+def _rotulo_data(inicio: pd.Timestamp, dias: int) -> str:
+    fim = inicio + pd.Timedelta(days=dias - 1)
+    if dias == 1:
+        return inicio.strftime('%d/%m')
+    if inicio.month == fim.month:
+        return f"{inicio:%d}-{fim:%d}/{fim:%m}"
+    return f"{inicio:%d/%m}-{fim:%d/%m}"
+
+
+def holidays(anos: Iterable[int]) -> pd.DataFrame:
+    """Eventos de `EVENTOS` nos anos pedidos, com data de início, rótulo da data e mês (nome)."""
+    anos = np.asarray(list(anos), dtype=np.int64)
+    pascoa = easter(anos)
+    partes = []
+    for ordem, ev in enumerate(EVENTOS):
+        regra = ev['regra']
+        if regra[0] == 'pascoa':
+            inicio = pascoa + np.timedelta64(regra[1], 'D')
+        else:
+            inicio = _ymd(anos, regra[1], regra[2])
+        partes.append(pd.DataFrame({'ano': anos, 'ordem': ordem, 'inicio': inicio}))
+    df = pd.concat(partes, ignore_index=True)
+    info = pd.DataFrame(EVENTOS).drop(columns='regra')
+    df = df.join(info, on='ordem').sort_values(['ano', 'inicio', 'ordem'], ignore_index=True)
+    df['data'] = [_rotulo_data(i, n) for i, n in zip(df['inicio'], df['dias'])]
+    df['mes'] = [MESES[m - 1] for m in df['inicio'].dt.month]
+    return df
+
+
+class DailyMultipliers:
+    """Multiplicadores diários (pedestres, ônibus) e nível do evento, indexados por dia desde `inicio`."""
+
+    def __init__(self, ano_inicio: int = ANO_INICIO, ano_fim: int = ANO_FIM):
+        self.inicio = np.datetime64(f"{ano_inicio}-01-01", 'D')
+        fim = np.datetime64(f"{ano_fim + 1}-01-01", 'D')
+        n = int((fim - self.inicio).astype(np.int64))
+        self.pedestres = np.ones(n, dtype=np.float32)
+        self.onibus = np.ones(n, dtype=np.float32)
+        self.nivel = np.zeros(n, dtype=np.uint8)
+        self.evento = np.full(n, -1, dtype=np.int16)  # índice em EVENTOS (-1: dia comum)
+
+        ev = holidays(range(ano_inicio, ano_fim + 1))
+        dias = ev['dias'].to_numpy()
+        pos = np.repeat((ev['inicio'].to_numpy().astype('datetime64[D]') - self.inicio).astype(np.int64), dias)
+        pos += np.arange(len(pos)) - np.repeat(np.cumsum(dias) - dias, dias)  # dias seguintes do mesmo evento
+        ok = (pos >= 0) & (pos < n)
+        pos = pos[ok]
+        ped = (1 + np.repeat(ev['pedestres'].to_numpy(), dias) / 100)[ok]
+        bus = (1 + np.repeat(ev['onibus'].to_numpy(), dias) / 100)[ok]
+        niv = np.repeat(ev['nivel'].to_numpy(), dias)[ok]
+        ordem = np.repeat(ev['ordem'].to_numpy(), dias)[ok]
+
+        # Eventos no mesmo dia: vale o maior aumento
+        np.maximum.at(self.pedestres, pos, ped.astype(np.float32))
+        np.maximum.at(self.onibus, pos, bus.astype(np.float32))
+        np.maximum.at(self.nivel, pos, niv.astype(np.uint8))
+        ordem_ped = np.argsort(ped, kind='stable')
+        self.evento[pos[ordem_ped]] = ordem[ordem_ped]
+
+    def __len__(self):
+        return len(self.pedestres)
+
+    def index(self, datas) -> np.ndarray:
+        """Posição de cada data nos arrays (ValueError fora da faixa)."""
+        d = np.asarray(datas, dtype='datetime64[D]')
+        pos = (d - self.inicio).astype(np.int64)
+        if np.any((pos < 0) | (pos >= len(self))):
+            raise ValueError(f"Datas fora da faixa do calendário ({self.inicio} + {len(self)} dias)")
+        return pos
+
+    def at(self, datas) -> Tuple[np.ndarray, np.ndarray]:
+        """Multiplicadores (pedestres, ônibus) das datas pedidas."""
+        pos = self.index(datas)
+        return self.pedestres[pos], self.onibus[pos]
+
+    def frame(self, ano: int) -> pd.DataFrame:
+        """Série diária de um ano: data, multiplicadores, nível e nome do evento."""
+        dias = np.arange(np.datetime64(f"{ano}-01-01"), np.datetime64(f"{ano + 1}-01-01"), dtype='datetime64[D]')
+        pos = self.index(dias)
+        nomes = np.array([e['evento'] for e in EVENTOS] + [''], dtype=object)
+        return pd.DataFrame({
+            'data': pd.to_datetime(dias),
+            'pedestres': self.pedestres[pos],
+            'onibus': self.onibus[pos],
+            'nivel': self.nivel[pos],
+            'evento': nomes[self.evento[pos]],  # -1 cai no '' do fim
+        })
+
+
+# -------------------------------
+# UMA SÉRIE POR FAIXA DE ANOS E POR PROCESSO
+# -------------------------------
+_series: Dict[Tuple[int, int], DailyMultipliers] = {}
+_lock = threading.Lock()
+
+
+def get_multipliers(ano_inicio: int = ANO_INICIO, ano_fim: int = ANO_FIM) -> DailyMultipliers:
+    """Multiplicadores diários de `ano_inicio` a `ano_fim`, calculados uma vez por processo."""
+    key = (ano_inicio, ano_fim)
+    if key not in _series:
+        with _lock:
+            if key not in _series:
+                _series[key] = DailyMultipliers(ano_inicio, ano_fim)
+    return _series[key]
+
+
+def multiplier(dia: date) -> Tuple[float, float]:
+    """Multiplicadores (pedestres, ônibus) de um dia."""
+    ped, bus = get_multipliers().at([dia])
+    return float(ped[0]), float(bus[0])
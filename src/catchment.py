@@ -0,0 +1,399 @@
+# src/catchment.py - áreas de influência a pé pela rede viária (isócronas) em vez de círculos
+"""
+Círculos de `create_buffers` contam como alcançável o outro lado de trilhos,
+rios e Marginais. Aqui a área de influência de cada ponto é o que se alcança
+andando pelas ruas até `radius_m` metros (≈ `radius_m / WALK_SPEED_MS` s):
+
+1. `WalkGraph.from_osm(arquivo)`: lê um extrato OSM XML (.osm, .osm.bz2 ou
+   .osm.gz) em streaming, mantém só vias caminháveis e monta uma adjacência
+   CSR compacta (indptr / indices / comprimentos em metros, float32);
+2. `CatchmentEngine.reachable(lats, lons, radius_m)`: um único Dijkstra
+   limitado com fila de prioridade compartilhada por todos os pontos
+   (multi-origem; cada rótulo carrega a sua origem), parando em `radius_m`;
+3. `CatchmentEngine.isochrones(...)`: polígono de cada ponto = trechos de rua
+   alcançados (inclusive a fração final de cada trecho) com uma faixa de
+   `EDGE_BUFFER_M` metros.
+
+Resultados ficam em cache por (ponto, raio), e o grafo fica em cache em disco
+(`<sha256 do extrato>.npz`). `create_catchments(gdf, radius_m)` tem a mesma
+assinatura e saída de `create_buffers` e serve direto para
+`spatial_join_population`.
+
+Uso:
+    python -m src.catchment data/sao-paulo.osm.bz2
+"""
+import bz2
+import gzip
+import heapq
+import os
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+
+from src.data import DATA_DIR
+from src.exports import file_version
+from src.proximity import EARTH_RADIUS_M, pairs_within
+
+OSM_PATH = os.path.join(DATA_DIR, "sao-paulo.osm.bz2")
+CATCHMENT_DIR = os.path.join(tempfile.gettempdir(), "ooh_catchment")
+WALK_SPEED_MS = 1.25      # 4,5 km/h
+SNAP_RADIUS_M = 150       # distância máxima do ponto até a rede para entrar a pé
+EDGE_BUFFER_M = 25        # meia largura da faixa em volta das ruas alcançadas
+MAX_CACHED = 20_000       # áreas de influência em memória (LRU)
+
+WALKABLE_HIGHWAYS = {
+    'footway', 'pedestrian', 'path', 'steps', 'living_street', 'residential', 'service',
+    'unclassified', 'tertiary', 'tertiary_link', 'secondary', 'secondary_link',
+    'primary', 'primary_link', 'track', 'corridor', 'cycleway', 'road',
+}
+NO_ACCESS = {'no', 'private'}
+
+
+def _open(path: str):
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _walkable(tags: Dict[str, str]) -> bool:
+    """Vias de pedestre e ruas comuns; vias expressas (motorway/trunk) só com foot=yes."""
+    foot = tags.get('foot')
+    if foot in NO_ACCESS or (tags.get('access') in NO_ACCESS and foot != 'yes'):
+        return False
+    return tags.get('highway') in WALKABLE_HIGHWAYS or (foot in ('yes', 'designated') and 'highway' in tags)
+
+
+# -------------------------------
+# GRAFO DE PEDESTRES (CSR)
+# -------------------------------
+class WalkGraph:
+    """Grafo não direcionado em CSR: vizinhos de u em indices[indptr[u]:indptr[u+1]]."""
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 lengths: np.ndarray):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.lengths = np.asarray(lengths, dtype=np.float32)
+        self.lat0 = float(self.lats.mean()) if len(self.lats) else 0.0
+        self.x, self.y = self.to_meters(self.lats, self.lons)
+
+    def __len__(self):
+        return len(self.lats)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices) // 2
+
+    def to_meters(self, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        return (np.radians(lons) * EARTH_RADIUS_M * np.cos(np.radians(self.lat0)),
+                np.radians(lats) * EARTH_RADIUS_M)
+
+    def to_lonlat(self, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        return (np.degrees(np.asarray(x) / (EARTH_RADIUS_M * np.cos(np.radians(self.lat0)))),
+                np.degrees(np.asarray(y) / EARTH_RADIUS_M))
+
+    @classmethod
+    def from_edges(cls, lats: np.ndarray, lons: np.ndarray, u: np.ndarray, v: np.ndarray) -> 'WalkGraph':
+        """Monta o CSR a partir de arestas (u, v) entre nós com coordenadas; comprimento por haversine."""
+        la, lo = np.radians(lats), np.radians(lons)
+        a = (np.sin((la[v] - la[u]) / 2) ** 2
+             + np.cos(la[u]) * np.cos(la[v]) * np.sin((lo[v] - lo[u]) / 2) ** 2)
+        length = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+        src = np.concatenate([u, v])
+        dst = np.concatenate([v, u])
+        length = np.concatenate([length, length])
+        order = np.argsort(src, kind='stable')
+        indptr = np.zeros(len(lats) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(lats)), out=indptr[1:])
+        return cls(lats, lons, indptr, dst[order], length[order])
+
+    @classmethod
+    def from_osm(cls, path: str) -> 'WalkGraph':
+        """Lê nós e vias caminháveis do XML em streaming e descarta nós fora da rede de pedestres."""
+        node_ids, node_lat, node_lon = array('q'), array('d'), array('d')
+        edge_u, edge_v = array('q'), array('q')
+
+        with _open(path) as fh:
+            root = None
+            for event, elem in ET.iterparse(fh, events=('start', 'end')):
+                if root is None:
+                    root = elem
+                if event == 'start':
+                    continue
+                if elem.tag == 'node':
+                    node_ids.append(int(elem.get('id')))
+                    node_lat.append(float(elem.get('lat')))
+                    node_lon.append(float(elem.get('lon')))
+                elif elem.tag == 'way':
+                    tags = {t.get('k'): t.get('v') for t in elem.iter('tag')}
+                    if 'highway' in tags and _walkable(tags):
+                        refs = [int(nd.get('ref')) for nd in elem.iter('nd')]
+                        edge_u.extend(refs[:-1])
+                        edge_v.extend(refs[1:])
+                elif elem.tag != 'relation':
+                    continue
+                root.clear()  # descarta os elementos já lidos (memória constante)
+
+        ids = np.frombuffer(node_ids, dtype=np.int64)
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        u, v = np.frombuffer(edge_u, dtype=np.int64), np.frombuffer(edge_v, dtype=np.int64)
+
+        def lookup(refs):
+            pos = np.clip(np.searchsorted(sorted_ids, refs), 0, max(len(sorted_ids) - 1, 0))
+            found = sorted_ids[pos] == refs if len(sorted_ids) else np.zeros(len(refs), dtype=bool)
+            return order[pos], found
+
+        iu, ok_u = lookup(u)
+        iv, ok_v = lookup(v)
+        keep = ok_u & ok_v & (iu != iv)
+        iu, iv = iu[keep], iv[keep]
+
+        # Renumera só os nós usados pela rede de pedestres
+        used, inverse = np.unique(np.concatenate([iu, iv]), return_inverse=True)
+        lats = np.frombuffer(node_lat, dtype=np.float64)[used]
+        lons = np.frombuffer(node_lon, dtype=np.float64)[used]
+        return cls.from_edges(lats, lons, inverse[:len(iu)], inverse[len(iu):])
+
+    def save(self, path: str) -> None:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            np.savez(fh, lats=self.lats, lons=self.lons, indptr=self.indptr, indices=self.indices,
+                     lengths=self.lengths)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'WalkGraph':
+        with np.load(path) as z:
+            return cls(z['lats'], z['lons'], z['indptr'], z['indices'], z['lengths'])
+
+    def nearest_nodes(self, lats, lons, max_dist_m: float = SNAP_RADIUS_M) -> Tuple[np.ndarray, np.ndarray]:
+        """Nó da rede mais próximo de cada ponto (-1 se nenhum a até `max_dist_m`) e a distância até ele."""
+        lats, lons = np.atleast_1d(np.asarray(lats, dtype=float)), np.atleast_1d(np.asarray(lons, dtype=float))
+        node = np.full(len(lats), -1, dtype=np.int64)
+        dist = np.full(len(lats), np.inf)
+        i, j = pairs_within(lats, lons, self.lats, self.lons, max_dist_m)
+        if len(i):
+            px, py = self.to_meters(lats[i], lons[i])
+            d = np.hypot(px - self.x[j], py - self.y[j])
+            order = np.lexsort((d, i))
+            first = order[np.r_[True, i[order][1:] != i[order][:-1]]]
+            node[i[first]] = j[first]
+            dist[i[first]] = d[first]
+        return node, dist
+
+
+# -------------------------------
+# DIJKSTRA LIMITADO, MULTI-ORIGEM
+# -------------------------------
+def bounded_dijkstra(graph: WalkGraph, sources: np.ndarray, limits: np.ndarray) -> List[Dict[int, float]]:
+    """
+    Distâncias pela rede de cada origem até os nós a no máximo `limits[k]` metros.
+    Todas as origens compartilham uma fila de prioridade; o rótulo (dist, k, nó)
+    só é fechado uma vez por origem, então o custo total é a soma dos tamanhos
+    das áreas de influência, não nº de origens x tamanho do grafo.
+    """
+    indptr, indices, lengths = graph.indptr.tolist(), graph.indices.tolist(), graph.lengths.tolist()
+    settled: List[Dict[int, float]] = [{} for _ in range(len(sources))]
+    tentative: List[Dict[int, float]] = [{} for _ in range(len(sources))]
+    heap = [(0.0, k, int(s)) for k, s in enumerate(sources) if s >= 0 and limits[k] >= 0]
+    heapq.heapify(heap)
+    limits = [float(x) for x in limits]
+
+    while heap:
+        d, k, u = heapq.heappop(heap)
+        done = settled[k]
+        if u in done:
+            continue
+        done[u] = d
+        best, limit = tentative[k], limits[k]
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            if v in done:
+                continue
+            nd = d + lengths[e]
+            if nd <= limit and nd < best.get(v, limit + 1.0):
+                best[v] = nd
+                heapq.heappush(heap, (nd, k, v))
+    return settled
+
+
+class CatchmentEngine:
+    """Áreas de influência a pé sobre um `WalkGraph`, com cache LRU por (ponto, raio)."""
+
+    def __init__(self, graph: WalkGraph, max_cached: int = MAX_CACHED):
+        self.graph = graph
+        self.max_cached = max_cached
+        self._cache: 'OrderedDict[tuple, dict]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(lat: float, lon: float, radius_m: float) -> tuple:
+        return (round(float(lat), 6), round(float(lon), 6), float(radius_m))
+
+    def _compute(self, lats: np.ndarray, lons: np.ndarray, radius_m: float) -> List[dict]:
+        """Dijkstra único para todos os pontos; a caminhada até a rede desconta do raio."""
+        nodes, snap = self.graph.nearest_nodes(lats, lons)
+        limits = np.where(nodes >= 0, radius_m - snap, -1.0)
+        settled = bounded_dijkstra(self.graph, nodes, limits)
+        out = []
+        for k, reached in enumerate(settled):
+            ids = np.fromiter(reached.keys(), dtype=np.int64, count=len(reached))
+            dists = np.fromiter(reached.values(), dtype=np.float64, count=len(reached))
+            snap_k = float(snap[k]) if nodes[k] >= 0 else 0.0
+            out.append({'lat': float(lats[k]), 'lon': float(lons[k]), 'node': int(nodes[k]), 'snap': snap_k,
+                        'limit': float(limits[k]), 'nodes': ids, 'dist': dists + snap_k, 'polygon': None})
+        return out
+
+    def reachable(self, lats, lons, radius_m: float) -> List[dict]:
+        """
+        Para cada ponto: {'nodes', 'dist' (m, incluindo a ida até a rede), 'node', 'polygon'};
+        só os pontos fora do cache entram no Dijkstra.
+        """
+        lats, lons = np.atleast_1d(np.asarray(lats, dtype=float)), np.atleast_1d(np.asarray(lons, dtype=float))
+        keys = [self._key(a, b, radius_m) for a, b in zip(lats, lons)]
+        with self._lock:
+            missing = sorted({i for i, key in enumerate(keys) if key not in self._cache},
+                             key=lambda i: keys[i])
+            seen, todo = set(), []
+            for i in missing:
+                if keys[i] not in seen:
+                    seen.add(keys[i])
+                    todo.append(i)
+        if todo:
+            results = self._compute(lats[todo], lons[todo], radius_m)
+            with self._lock:
+                for i, result in zip(todo, results):
+                    self._cache[keys[i]] = result
+        with self._lock:
+            out = []
+            for key in keys:
+                self._cache.move_to_end(key)
+                out.append(self._cache[key])
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return out
+
+    def _polygon(self, result: dict):
+        """Trechos de rua alcançados (com a fração final dos trechos não completados) + faixa de EDGE_BUFFER_M."""
+        g = self.graph
+        px, py = g.to_meters(result['lat'], result['lon'])
+        point = shapely.Point(float(px), float(py)).buffer(EDGE_BUFFER_M)
+        if result['node'] < 0:
+            return point
+
+        nodes, limit = result['nodes'], result['limit']
+        order = np.argsort(nodes)
+        nodes_sorted = nodes[order]
+        d_node = result['dist'][order] - result['snap']  # distância pela rede a partir do nó de entrada
+
+        starts, ends = g.indptr[nodes_sorted], g.indptr[nodes_sorted + 1]
+        deg = ends - starts
+        u = np.repeat(nodes_sorted, deg)
+        du = np.repeat(d_node, deg)
+        e = np.repeat(starts, deg) + (np.arange(deg.sum()) - np.repeat(np.cumsum(deg) - deg, deg))
+        v = g.indices[e].astype(np.int64)
+        length = g.lengths[e].astype(np.float64)
+
+        pos = np.clip(np.searchsorted(nodes_sorted, v), 0, len(nodes_sorted) - 1)
+        v_reached = nodes_sorted[pos] == v
+        full = v_reached & (u < v)
+        partial = ~v_reached
+        frac = np.clip((limit - du[partial]) / np.maximum(length[partial], 1e-9), 0, 1)
+
+        x0, y0 = g.x[u], g.y[u]
+        x1, y1 = g.x[v], g.y[v]
+        segments = np.concatenate([
+            np.stack([np.c_[x0[full], y0[full]], np.c_[x1[full], y1[full]]], axis=1),
+            np.stack([np.c_[x0[partial], y0[partial]],
+                      np.c_[x0[partial] + (x1[partial] - x0[partial]) * frac,
+                            y0[partial] + (y1[partial] - y0[partial]) * frac]], axis=1),
+        ])
+        access = shapely.LineString([(float(px), float(py)), (g.x[result['node']], g.y[result['node']])])
+        lines = shapely.MultiLineString(list(segments) + [np.asarray(access.coords)])
+        return shapely.union(lines.buffer(EDGE_BUFFER_M, quad_segs=4), point)
+
+    def isochrones(self, lats, lons, radius_m: float) -> list:
+        """Polígono (lon/lat, shapely) da área alcançável a pé de cada ponto."""
+        results = self.reachable(lats, lons, radius_m)
+        polygons = []
+        for result in results:
+            if result['polygon'] is None:
+                poly_m = self._polygon(result)
+                result['polygon'] = shapely.transform(poly_m, lambda xy: np.c_[self.graph.to_lonlat(xy[:, 0], xy[:, 1])])
+            polygons.append(result['polygon'])
+        return polygons
+
+
+# -------------------------------
+# GRAFO PADRÃO E INTEGRAÇÃO COM O GEOPROCESSAMENTO
+# -------------------------------
+_engines: Dict[str, CatchmentEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def load_walk_graph(osm_path: str = OSM_PATH, cache_dir: str = CATCHMENT_DIR) -> Optional[WalkGraph]:
+    """Grafo do extrato em `osm_path` (lido do XML só na primeira vez por versão do arquivo); None sem extrato."""
+    if not os.path.exists(osm_path):
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{file_version(osm_path)}.npz")
+    if os.path.exists(path):
+        return WalkGraph.load(path)
+    graph = WalkGraph.from_osm(osm_path)
+    graph.save(path)
+    return graph
+
+
+def get_engine(osm_path: str = OSM_PATH) -> Optional[CatchmentEngine]:
+    """Motor compartilhado pelo processo para o extrato `osm_path` (None se o arquivo não existir)."""
+    if osm_path not in _engines:
+        with _engines_lock:
+            if osm_path not in _engines:
+                graph = load_walk_graph(osm_path)
+                if graph is None:
+                    return None
+                _engines[osm_path] = CatchmentEngine(graph)
+    return _engines[osm_path]
+
+
+def create_catchments(gdf_points, radius_m: float = 500, engine: Optional[CatchmentEngine] = None):
+    """
+    Substituto de `create_buffers`: mesma entrada (GeoDataFrame de pontos) e saída
+    (polígonos em EPSG:4326, mesmo índice), mas com a área alcançável a pé.
+    Sem extrato OSM, devolve os círculos de `create_buffers`.
+    """
+    from src.geoprocess import create_buffers
+
+    engine = engine or get_engine()
+    if engine is None:
+        return create_buffers(gdf_points, radius_m=radius_m)
+    pts = gdf_points.to_crs(epsg=4326)
+    out = pts.copy()
+    out['geometry'] = engine.isochrones(pts.geometry.y.to_numpy(), pts.geometry.x.to_numpy(), radius_m)
+    return out.set_crs(epsg=4326, allow_override=True)
+
+
+if __name__ == '__main__':
+    osm_path = sys.argv[1] if len(sys.argv) > 1 else OSM_PATH
+    t0 = time.perf_counter()
+    graph = WalkGraph.from_osm(osm_path)
+    os.makedirs(CATCHMENT_DIR, exist_ok=True)
+    out = os.path.join(CATCHMENT_DIR, f"{file_version(osm_path)}.npz")
+    graph.save(out)
+    print(f"{len(graph):,} nós, {graph.n_edges:,} trechos caminháveis "
+          f"({time.perf_counter() - t0:.1f}s) -> {out}")
@@ -0,0 +1,62 @@
+# src/charts.py - rasterização de figuras Plotly em PNG para o PDF (Kaleido, cache por hash da figura)
+"""
+`render_many({'nome': fig, ...})` devolve o caminho de um PNG por figura.
+
+- Cache em disco: o arquivo se chama `<sha256 da especificação da figura>.png`,
+  então a mesma figura (mesmos dados, layout e tamanho) nunca é rasterizada
+  duas vezes, nem entre sessões nem entre os processos do relatório em lote.
+- Rasterização pelo Kaleido (exportação oficial do Plotly, em requirements.txt).
+  Sem ele instalado, `render_many` devolve `{}` e o PDF sai sem gráficos.
+- As figuras que faltam são rasterizadas em sequência: o Kaleido já roda num
+  processo próprio, e o paralelismo do relatório em lote vem do pool de
+  processos de `src.report`.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Dict
+
+CHART_DIR = os.path.join(tempfile.gettempdir(), "ooh_charts")
+CHART_WIDTH = 1000   # px
+CHART_HEIGHT = 450   # px
+
+
+def figure_hash(fig, width: int = CHART_WIDTH, height: int = CHART_HEIGHT) -> str:
+    """Hash da especificação completa da figura (dados + layout) e do tamanho da imagem."""
+    spec = fig.to_json(pretty=False) + f"|{width}x{height}"
+    return hashlib.sha256(spec.encode('utf-8')).hexdigest()
+
+
+def kaleido_available() -> bool:
+    try:
+        import kaleido  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _write_png(fig, width: int, height: int, path: str) -> str:
+    """Rasteriza a figura com o Kaleido e grava o PNG de forma atômica em `path`."""
+    png = fig.to_image(format='png', width=width, height=height, engine='kaleido')
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as fh:
+        fh.write(png)
+    os.replace(tmp, path)
+    return path
+
+
+def render_png(fig, width: int = CHART_WIDTH, height: int = CHART_HEIGHT, chart_dir: str = CHART_DIR) -> str:
+    """Caminho do PNG da figura, rasterizando apenas se este hash ainda não estiver no cache."""
+    os.makedirs(chart_dir, exist_ok=True)
+    path = os.path.join(chart_dir, f"{figure_hash(fig, width, height)}.png")
+    if not os.path.exists(path):
+        _write_png(fig, width, height, path)
+    return path
+
+
+def render_many(figs: Dict[str, object], width: int = CHART_WIDTH, height: int = CHART_HEIGHT,
+                chart_dir: str = CHART_DIR) -> Dict[str, str]:
+    """Rasteriza as figuras que faltam no cache; retorna {nome: caminho do PNG} ({} sem Kaleido)."""
+    if not kaleido_available():
+        return {}
+    return {name: render_png(fig, width, height, chart_dir) for name, fig in figs.items()}
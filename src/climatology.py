@@ -0,0 +1,209 @@
+# src/climatology.py - climatologia INMET estação x semana do ano x hora (arrays .npy em memória mapeada)
+"""
+Job em lote que percorre o histórico horário de várias estações (um ano por
+requisição de `fetch_inmet_station_data`) e reduz tudo em acumuladores fixos,
+sem guardar as observações:
+
+    n[estação, semana, hora]           observações válidas de chuva
+    n_chuva / soma_mm                  horas com chuva (>= RAIN_MM) e soma dos mm
+    hist_temp[estação, semana, hora, bin]  histograma de temperatura (TEMP_STEP °C)
+
+No fim, grava em `CLIMATOLOGY_DIR` (um .npy por grandeza, abertos com
+`mmap_mode='r'`):
+
+    rain_prob.npy   P(chuva) por hora                       float32 (S, 53, 24)
+    rain_mm.npy     média de mm/h (todas as horas)          float32 (S, 53, 24)
+    rain_mm_wet.npy média de mm/h nas horas com chuva       float32 (S, 53, 24)
+    temp_pct.npy    temperatura p10 / p50 / p90             float32 (S, 53, 24, 3)
+    stations.json   códigos das estações (linha de cada array) e anos usados
+
+Consultas (`Climatology.lookup`, `.day`) são indexação direta: O(1) por
+(estação, semana, hora), sem ler o arquivo inteiro.
+
+Uso:
+    python -m src.climatology --estacoes A701 A771 A755 --anos 2014 2023
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.data import DATA_DIR
+from src.fetchers import fetch_inmet_station_data
+from src.weather_impact import reduction_factor
+
+CLIMATOLOGY_DIR = os.path.join(DATA_DIR, "climatologia")
+WEEKS = 53
+HOURS = 24
+RAIN_MM = 0.2                  # mm/h mínimos para contar como hora chuvosa
+TEMP_MIN, TEMP_MAX, TEMP_STEP = -5.0, 45.0, 0.5
+TEMP_BINS = int((TEMP_MAX - TEMP_MIN) / TEMP_STEP)
+PERCENTILES = (10, 50, 90)
+UTC_OFFSET_H = -3              # INMET publica em UTC; a climatologia usa hora local
+
+
+class ClimatologyAccumulator:
+    """Acumuladores aditivos por estação x semana x hora (memória fixa, independe dos anos lidos)."""
+
+    def __init__(self, stations: Sequence[str]):
+        self.stations = list(stations)
+        shape = (len(self.stations), WEEKS, HOURS)
+        self.n = np.zeros(shape, dtype=np.int32)
+        self.n_rain = np.zeros(shape, dtype=np.int32)
+        self.sum_mm = np.zeros(shape, dtype=np.float64)
+        self.temp_hist = np.zeros(shape + (TEMP_BINS,), dtype=np.uint16)
+        self.years: set = set()
+
+    def add(self, station: str, records: List[dict]) -> int:
+        """Soma um bloco de registros horários do INMET (DT_MEDICAO, HR_MEDICAO, CHUVA, TEM_INS)."""
+        if not records:
+            return 0
+        s = self.stations.index(station)
+        df = pd.DataFrame.from_records(records, columns=['DT_MEDICAO', 'HR_MEDICAO', 'CHUVA', 'TEM_INS'])
+        hhmm = pd.to_numeric(df['HR_MEDICAO'], errors='coerce')
+        day = pd.to_datetime(df['DT_MEDICAO'], errors='coerce')
+        ts = day + pd.to_timedelta(hhmm // 100 + UTC_OFFSET_H, unit='h')
+        ok = ts.notna().to_numpy()
+        ts = ts[ok]
+        week = ts.dt.isocalendar().week.to_numpy(dtype=np.int64) - 1
+        hour = ts.dt.hour.to_numpy(dtype=np.int64)
+        self.years.update(int(y) for y in day[ok].dt.year.unique())
+
+        rain = pd.to_numeric(df['CHUVA'], errors='coerce').to_numpy(dtype=float)[ok]
+        temp = pd.to_numeric(df['TEM_INS'], errors='coerce').to_numpy(dtype=float)[ok]
+        cell = week * HOURS + hour
+        size = WEEKS * HOURS
+
+        has_rain = ~np.isnan(rain)
+        self.n[s] += np.bincount(cell[has_rain], minlength=size).reshape(WEEKS, HOURS).astype(np.int32)
+        wet = has_rain & (rain >= RAIN_MM)
+        self.n_rain[s] += np.bincount(cell[wet], minlength=size).reshape(WEEKS, HOURS).astype(np.int32)
+        self.sum_mm[s] += np.bincount(cell[has_rain], weights=rain[has_rain], minlength=size).reshape(WEEKS, HOURS)
+
+        has_temp = ~np.isnan(temp)
+        tbin = np.clip(((temp[has_temp] - TEMP_MIN) / TEMP_STEP).astype(np.int64), 0, TEMP_BINS - 1)
+        flat = cell[has_temp] * TEMP_BINS + tbin
+        hist = np.bincount(flat, minlength=size * TEMP_BINS).reshape(WEEKS, HOURS, TEMP_BINS)
+        self.temp_hist[s] = np.minimum(self.temp_hist[s].astype(np.int64) + hist, np.iinfo(np.uint16).max)
+        return int(ok.sum())
+
+    def _percentiles(self) -> np.ndarray:
+        """Percentis de temperatura a partir do histograma acumulado (centro do bin)."""
+        cum = np.cumsum(self.temp_hist, axis=-1, dtype=np.int64)
+        total = cum[..., -1:]
+        out = np.full(self.n.shape + (len(PERCENTILES),), np.nan, dtype=np.float32)
+        for k, p in enumerate(PERCENTILES):
+            idx = (cum < np.ceil(total * p / 100.0)).sum(axis=-1)
+            values = TEMP_MIN + (np.minimum(idx, TEMP_BINS - 1) + 0.5) * TEMP_STEP
+            out[..., k] = np.where(total[..., 0] > 0, values, np.nan)
+        return out
+
+    def save(self, out_dir: str = CLIMATOLOGY_DIR) -> str:
+        """Grava os arrays finais como .npy (abertos depois em memória mapeada)."""
+        os.makedirs(out_dir, exist_ok=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            arrays = {
+                'rain_prob': np.where(self.n > 0, self.n_rain / self.n, np.nan),
+                'rain_mm': np.where(self.n > 0, self.sum_mm / self.n, np.nan),
+                'rain_mm_wet': np.where(self.n_rain > 0, self.sum_mm / self.n_rain, np.nan),
+                'temp_pct': self._percentiles(),
+            }
+        for name, values in arrays.items():
+            path = os.path.join(out_dir, f"{name}.npy")
+            mm = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=np.float32, shape=values.shape)
+            mm[...] = values
+            mm.flush()
+            del mm
+            os.replace(path + '.tmp', path)
+        meta = {'stations': self.stations, 'years': sorted(self.years), 'percentiles': list(PERCENTILES),
+                'rain_mm_threshold': RAIN_MM, 'generated_at': datetime.now().isoformat(timespec='seconds')}
+        with open(os.path.join(out_dir, 'stations.json'), 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh, ensure_ascii=False, indent=2)
+        return out_dir
+
+
+def build_climatology(stations: Sequence[str], years: Iterable[int], out_dir: str = CLIMATOLOGY_DIR,
+                      fetch: Callable[..., List[dict]] = fetch_inmet_station_data) -> str:
+    """Busca ano a ano o histórico de cada estação, acumula e grava a climatologia."""
+    acc = ClimatologyAccumulator(stations)
+    for station in stations:
+        for year in years:
+            t0 = time.perf_counter()
+            records = fetch(station, f"{year}-01-01", f"{year}-12-31")
+            n = acc.add(station, records)
+            print(f"[Climatologia] {station} {year}: {n:,} registros em {time.perf_counter() - t0:.1f}s")
+    return acc.save(out_dir)
+
+
+class Climatology:
+    """Leitura O(1) da climatologia gravada (arrays em memória mapeada, só leitura)."""
+
+    def __init__(self, out_dir: str = CLIMATOLOGY_DIR):
+        with open(os.path.join(out_dir, 'stations.json'), encoding='utf-8') as fh:
+            self.meta = json.load(fh)
+        self.stations = self.meta['stations']
+        self._row = {code: i for i, code in enumerate(self.stations)}
+        self.rain_prob = np.load(os.path.join(out_dir, 'rain_prob.npy'), mmap_mode='r')
+        self.rain_mm = np.load(os.path.join(out_dir, 'rain_mm.npy'), mmap_mode='r')
+        self.rain_mm_wet = np.load(os.path.join(out_dir, 'rain_mm_wet.npy'), mmap_mode='r')
+        self.temp_pct = np.load(os.path.join(out_dir, 'temp_pct.npy'), mmap_mode='r')
+
+    @classmethod
+    def load(cls, out_dir: str = CLIMATOLOGY_DIR) -> Optional['Climatology']:
+        """Climatologia gravada em `out_dir`, ou None se o job ainda não rodou."""
+        if not os.path.exists(os.path.join(out_dir, 'stations.json')):
+            return None
+        return cls(out_dir)
+
+    def __contains__(self, station: str) -> bool:
+        return station in self._row
+
+    @staticmethod
+    def week_of(day: date) -> int:
+        return day.isocalendar()[1] - 1
+
+    def lookup(self, station: str, week: int, hour: int) -> dict:
+        """Indicadores de uma estação numa semana (0-52) e hora local (0-23)."""
+        s = self._row[station]
+        p10, p50, p90 = (float(v) for v in self.temp_pct[s, week, hour])
+        return {
+            'prob_chuva': float(self.rain_prob[s, week, hour]),
+            'chuva_mm': float(self.rain_mm[s, week, hour]),
+            'chuva_mm_quando_chove': float(self.rain_mm_wet[s, week, hour]),
+            'temp_p10': p10, 'temp_p50': p50, 'temp_p90': p90,
+        }
+
+    def day(self, station: str, day: date) -> pd.DataFrame:
+        """Perfil típico das 24 horas da semana de `day`, com o fator de fluxo OOH esperado."""
+        s, w = self._row[station], self.week_of(day)
+        temp = np.asarray(self.temp_pct[s, w], dtype=float)
+        rain_mm = np.asarray(self.rain_mm[s, w], dtype=float)
+        return pd.DataFrame({
+            'Hora': np.arange(HOURS),
+            'Prob. Chuva (%)': np.asarray(self.rain_prob[s, w], dtype=float) * 100,
+            'Chuva Média (mm/h)': rain_mm,
+            'Temp. p10 (°C)': temp[:, 0],
+            'Temp. p50 (°C)': temp[:, 1],
+            'Temp. p90 (°C)': temp[:, 2],
+            'Fator OOH Esperado': reduction_factor(np.nan_to_num(rain_mm), np.nan_to_num(temp[:, 1], nan=20.0)),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--estacoes', nargs='+', default=['A701', 'A771', 'A755'])
+    parser.add_argument('--anos', nargs=2, type=int, default=[date.today().year - 10, date.today().year - 1],
+                        metavar=('INICIO', 'FIM'))
+    parser.add_argument('--saida', default=CLIMATOLOGY_DIR)
+    args = parser.parse_args()
+    out = build_climatology(args.estacoes, range(args.anos[0], args.anos[1] + 1), args.saida)
+    print(f"Climatologia gravada em {out}")
+
+
+if __name__ == '__main__':
+    main()
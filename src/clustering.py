@@ -0,0 +1,136 @@
+# src/clustering.py - clusterização hierárquica em grade (estilo supercluster) feita no servidor
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+TILE_EXTENT = 256  # tamanho do tile Web Mercator em pixels
+
+
+def _project(lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Projeta lat/lon para coordenadas Web Mercator normalizadas em [0, 1)."""
+    x = (lons + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(np.clip(lats, -85.05112878, 85.05112878)))
+    y = 0.5 - 0.25 * np.log((1 + sin_lat) / (1 - sin_lat)) / math.pi
+    return np.clip(x, 0.0, 1.0 - 1e-12), np.clip(y, 0.0, 1.0 - 1e-12)
+
+
+def _unproject(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverso de `_project`: coordenadas normalizadas -> lat/lon."""
+    lons = x * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(math.pi * (1 - 2 * y))))
+    return lats, lons
+
+
+def bounds_from_center(lat: float, lon: float, zoom: float, width_px: int = 900, height_px: int = 600) -> dict:
+    """
+    Estima os limites visíveis do mapa a partir do centro e do zoom.
+    Usado antes do primeiro retorno de `st_folium` (quando ainda não há 'bounds').
+    Retorna dict no formato do Leaflet: {'_southWest': {...}, '_northEast': {...}}.
+    """
+    scale = TILE_EXTENT * (2 ** zoom)
+    cx, cy = _project(np.array([lat]), np.array([lon]))
+    dx, dy = width_px / 2 / scale, height_px / 2 / scale
+    (south, north), (west, east) = _unproject(
+        np.array([cx[0] - dx, cx[0] + dx]), np.array([cy[0] + dy, cy[0] - dy])
+    )
+    return {'_southWest': {'lat': south, 'lng': west}, '_northEast': {'lat': north, 'lng': east}}
+
+
+class GridClusterer:
+    """
+    Índice de clusters por nível de zoom, construído uma única vez.
+
+    - O nível `max_zoom` agrupa os pontos em células de `radius_px` pixels;
+      cada nível mais afastado funde 2x2 células do nível seguinte, então a
+      hierarquia é exata e o custo de construção é O(n) por nível.
+    - `get_clusters(bounds, zoom)` devolve apenas os clusters e pontos
+      isolados (leaves) visíveis, com custo proporcional à tela e não ao total.
+    """
+
+    def __init__(self, lats, lons, min_zoom: int = 0, max_zoom: int = 17, radius_px: int = 64):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.radius_px = radius_px
+        self._x, self._y = _project(self.lats, self.lons)
+        self._leaf_order = np.argsort(self._x, kind='stable')
+        self.levels = {}
+        self._build()
+
+    def __len__(self):
+        return len(self.lats)
+
+    def _build(self):
+        """Monta os níveis do mais próximo (max_zoom) ao mais afastado (min_zoom)."""
+        n_cells = TILE_EXTENT * (2 ** self.max_zoom) // self.radius_px
+        ix = np.floor(self._x * n_cells).astype(np.int64)
+        iy = np.floor(self._y * n_cells).astype(np.int64)
+        level = self._aggregate(ix, iy, np.ones(len(ix)), self._x, self._y, np.arange(len(ix)))
+        self.levels[self.max_zoom] = level
+
+        for z in range(self.max_zoom - 1, self.min_zoom - 1, -1):
+            prev = self.levels[z + 1]
+            level = self._aggregate(
+                prev['ix'] // 2, prev['iy'] // 2, prev['count'],
+                prev['sx'] / prev['count'], prev['sy'] / prev['count'], prev['leaf'],
+            )
+            self.levels[z] = level
+
+    @staticmethod
+    def _aggregate(ix, iy, count, x, y, leaf) -> dict:
+        """Agrupa itens por célula (ix, iy) somando contagem e coordenadas ponderadas."""
+        key = (ix << 32) | iy
+        uniq, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        total = np.bincount(inverse, weights=count)
+        sx = np.bincount(inverse, weights=x * count)
+        sy = np.bincount(inverse, weights=y * count)
+        cx, cy = sx / total, sy / total
+        lats, lons = _unproject(cx, cy)
+        order = np.argsort(cx, kind='stable')
+        return {
+            'ix': (uniq >> 32)[order], 'iy': (uniq & 0xFFFFFFFF)[order],
+            'count': total[order], 'sx': sx[order], 'sy': sy[order], 'cx': cx[order],
+            'lat': lats[order], 'lon': lons[order],
+            # índice de um ponto representante; só é usado quando count == 1
+            'leaf': np.asarray(leaf)[first][order],
+        }
+
+    def get_clusters(self, bounds: Optional[dict], zoom: float) -> pd.DataFrame:
+        """
+        Retorna clusters e leaves visíveis no zoom/bounds atuais.
+        - bounds: dict do Leaflet ('_southWest'/'_northEast') ou None para tudo.
+        Colunas: lat, lon, count, point_index (-1 para clusters com mais de 1 ponto).
+        """
+        z = int(np.clip(math.floor(zoom), self.min_zoom, self.max_zoom + 1))
+
+        if bounds:
+            south, west = bounds['_southWest']['lat'], bounds['_southWest']['lng']
+            north, east = bounds['_northEast']['lat'], bounds['_northEast']['lng']
+            (x_min, x_max), _ = _project(np.array([0.0, 0.0]), np.array([west, east]))
+        else:
+            south, north, x_min, x_max = -90, 90, 0.0, 1.0
+
+        if z > self.max_zoom:
+            # Acima do zoom máximo todo ponto é exibido individualmente
+            xs = self._x[self._leaf_order]
+            lo, hi = np.searchsorted(xs, [x_min, x_max], side='left')
+            idx = self._leaf_order[lo:hi]
+            idx = idx[(self.lats[idx] >= south) & (self.lats[idx] <= north)]
+            return pd.DataFrame({
+                'lat': self.lats[idx], 'lon': self.lons[idx],
+                'count': np.ones(len(idx), dtype=int), 'point_index': idx,
+            })
+
+        level = self.levels[z]
+        lo, hi = np.searchsorted(level['cx'], [x_min, x_max], side='left')
+        sl = slice(lo, hi)
+        lat, lon, count, leaf = level['lat'][sl], level['lon'][sl], level['count'][sl], level['leaf'][sl]
+        mask = (lat >= south) & (lat <= north)
+        count = count[mask].astype(int)
+        return pd.DataFrame({
+            'lat': lat[mask], 'lon': lon[mask], 'count': count,
+            'point_index': np.where(count == 1, leaf[mask], -1),
+        })
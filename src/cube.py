@@ -0,0 +1,253 @@
+# src/cube.py - cubo de agregados (mês x tipo de mídia x zona/faixa) com medidas aditivas
+"""
+Os KPIs das páginas são somas, médias e desvios de poucas medidas recortadas
+por poucas dimensões. `AggregateCube` guarda, para cada célula da grade de
+dimensões, apenas medidas aditivas:
+
+- n: linhas da célula
+- cnt / sum / sumsq: valores não nulos, soma e soma dos quadrados de cada medida
+
+Qualquer combinação de filtros vira uma soma sobre as células selecionadas
+(média = sum/cnt, variância a partir de sumsq), sem voltar às linhas. Como
+tudo é aditivo, `append(novas_linhas)` atualiza o cubo incrementalmente.
+
+Dimensões numéricas (CPM, custo) entram em faixas de largura fixa (`bins`),
+com os valores exatamente sobre a grade em células próprias: a chave 2k
+guarda os valores iguais a k*w e a chave 2k-1 os valores em ((k-1)*w, k*w).
+Faixas inclusivas [lo, hi] com limites na grade de `w` (o passo dos sliders)
+são exatas, iguais a `>= lo & <= hi` do pandas; limites fora da grade
+levantam ValueError em vez de aproximar.
+
+Uso:
+    cube = get_cube('campanhas')
+    kpis = cube.agg(equals={'Mês': ['Jan']}, ranges={'CPM (R$)': (None, 8.0)},
+                    total_investimento=('Investimento (R$)', 'sum'),
+                    media_cpm=('CPM (R$)', 'mean'))
+    por_mes = cube.agg(by='Mês', total=('Investimento (R$)', 'sum'))
+"""
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data import get_table, table_version
+
+STATS = ('sum', 'mean', 'count', 'std', 'var')
+
+# tabela -> (dimensões, medidas, largura das faixas das dimensões numéricas)
+CUBES: Dict[str, tuple] = {
+    'campanhas': (
+        ['Mês', 'Tipo de Mídia', 'CPM (R$)'],
+        ['Investimento (R$)', 'Reach (Milhões)', 'Impressões (Milhões)', 'CPM (R$)'],
+        {'CPM (R$)': 0.5},
+    ),
+    'inventario': (
+        ['Tipo', 'Zona', 'Custo Mensal (R$ Mil)'],
+        ['Audiência Diária (Milhares)', 'Custo Mensal (R$ Mil)'],
+        {'Custo Mensal (R$ Mil)': 1.0},
+    ),
+    'campanhas_relatorio': (
+        ['Mes', 'Tipo_Midia'],
+        ['Investimento_Mil_R$', 'Reach_Milhoes', 'CPM_R$', 'Frequencia'],
+        {},
+    ),
+}
+
+
+class AggregateCube:
+    """Grade densa dimensões x medidas com n, cnt, sum e sumsq por célula."""
+
+    def __init__(self, dims: Sequence[str], measures: Sequence[str], bins: Optional[Dict[str, float]] = None):
+        self.dims = list(dims)
+        self.measures = list(measures)
+        self.bins = dict(bins or {})
+        self.labels: Dict[str, list] = {d: [] for d in self.dims}
+        self._pos: Dict[str, dict] = {d: {} for d in self.dims}
+        self._ordered: Dict[str, Optional[bool]] = {d: None for d in self.dims}  # None: não categórico
+        shape = (0,) * len(self.dims)
+        self.n = np.zeros(shape, dtype=np.int64)
+        self.cnt = np.zeros(shape + (len(self.measures),), dtype=np.int64)
+        self.sum = np.zeros(shape + (len(self.measures),), dtype=np.float64)
+        self.sumsq = np.zeros(shape + (len(self.measures),), dtype=np.float64)
+        self.rows = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dims: Sequence[str], measures: Sequence[str],
+                   bins: Optional[Dict[str, float]] = None) -> 'AggregateCube':
+        cube = cls(dims, measures, bins)
+        cube.append(df)
+        return cube
+
+    # ---------------------------
+    # CARGA INCREMENTAL
+    # ---------------------------
+    def _grow(self, axis: int, size: int) -> None:
+        pad = [(0, 0)] * self.n.ndim
+        pad[axis] = (0, size - self.n.shape[axis])
+        self.n = np.pad(self.n, pad)
+        self.cnt, self.sum, self.sumsq = (np.pad(a, pad + [(0, 0)]) for a in (self.cnt, self.sum, self.sumsq))
+
+    def _codes(self, dim: str, s: pd.Series) -> np.ndarray:
+        """Posição de cada linha no eixo `dim` (-1 para nulos), criando rótulos novos quando preciso."""
+        if dim in self.bins:
+            values = s.to_numpy(dtype=float)
+            ok = ~np.isnan(values)
+            keys = np.zeros(len(values), dtype=np.int64)
+            q = values[ok] / self.bins[dim]
+            r = np.rint(q)
+            on_edge = np.abs(q - r) < 1e-9
+            keys[ok] = np.where(on_edge, 2 * r, 2 * np.ceil(q) - 1).astype(np.int64)
+            codes, uniques = pd.factorize(np.where(ok, keys, np.iinfo(np.int64).min))
+            uniques = [None if u == np.iinfo(np.int64).min else int(u) for u in uniques]
+        else:
+            if isinstance(s.dtype, pd.CategoricalDtype) and not self.labels[dim]:
+                # Categórico na primeira carga: eixo na ordem das categorias (meses em ordem de calendário)
+                self._ordered[dim] = bool(s.cat.ordered)
+                for value in s.cat.categories:
+                    self._pos[dim][value] = len(self.labels[dim])
+                    self.labels[dim].append(value)
+            codes, uniques = pd.factorize(s)
+            uniques = list(uniques)
+
+        pos = self._pos[dim]
+        for value in uniques:
+            if value is not None and value not in pos:
+                pos[value] = len(self.labels[dim])
+                self.labels[dim].append(value)
+        lookup = np.array([pos[v] if v is not None else -1 for v in uniques] + [-1], dtype=np.int64)
+        return lookup[codes]  # código -1 (nulo) cai na última posição do lookup
+
+    def append(self, df: pd.DataFrame) -> None:
+        """Soma as linhas de `df` às células (linhas com dimensão nula são ignoradas, como no groupby)."""
+        codes = [self._codes(d, df[d]) for d in self.dims]
+        for axis, d in enumerate(self.dims):
+            if len(self.labels[d]) > self.n.shape[axis]:
+                self._grow(axis, len(self.labels[d]))
+
+        valid = np.logical_and.reduce([c >= 0 for c in codes]) if codes else np.ones(len(df), dtype=bool)
+        flat = np.ravel_multi_index([c[valid] for c in codes], self.n.shape)
+        size = self.n.size
+        self.n += np.bincount(flat, minlength=size).reshape(self.n.shape)
+        for j, m in enumerate(self.measures):
+            values = df[m].to_numpy(dtype=np.float64)[valid]
+            ok = ~np.isnan(values)
+            self.cnt[..., j] += np.bincount(flat[ok], minlength=size).reshape(self.n.shape)
+            self.sum[..., j] += np.bincount(flat[ok], weights=values[ok], minlength=size).reshape(self.n.shape)
+            self.sumsq[..., j] += np.bincount(flat[ok], weights=values[ok] ** 2, minlength=size).reshape(self.n.shape)
+        self.rows += len(df)
+
+    # ---------------------------
+    # CONSULTAS
+    # ---------------------------
+    def _select(self, dim: str, values: Optional[Iterable] = None,
+                bounds: Optional[Tuple[Optional[float], Optional[float]]] = None) -> np.ndarray:
+        """Posições do eixo `dim` que passam no filtro de igualdade e/ou de faixa."""
+        labels = self.labels[dim]
+        keep = np.ones(len(labels), dtype=bool)
+        if values is not None:
+            wanted = set(values)
+            keep &= np.array([v in wanted for v in labels], dtype=bool)
+        if bounds is not None:
+            lo, hi = bounds
+            if dim in self.bins:
+                k = np.array(labels, dtype=np.int64)
+                if lo is not None:
+                    keep &= k >= 2 * self._grid_step(dim, lo)
+                if hi is not None:
+                    keep &= k <= 2 * self._grid_step(dim, hi)
+            else:
+                v = np.array(labels, dtype=float)
+                if lo is not None:
+                    keep &= v >= lo
+                if hi is not None:
+                    keep &= v <= hi
+        return np.flatnonzero(keep)
+
+    def _grid_step(self, dim: str, bound: float) -> int:
+        """Índice do limite na grade da dimensão; limites fora da grade não têm resposta exata."""
+        w = self.bins[dim]
+        q = float(bound) / w
+        if abs(q - round(q)) > 1e-9:
+            raise ValueError(f"Limite {bound} de '{dim}' fora da grade de {w}; use um múltiplo de {w}")
+        return int(round(q))
+
+    def _stat(self, cnt, s, sq, stat: str):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if stat == 'sum':
+                return s
+            if stat == 'count':
+                return cnt
+            if stat == 'mean':
+                return np.where(cnt > 0, s / cnt, np.nan)
+            var = np.where(cnt > 1, (sq - s * s / np.maximum(cnt, 1)) / (cnt - 1), np.nan)
+            var = np.maximum(var, 0)  # erro de arredondamento pode dar -0.0000001
+            return var if stat == 'var' else np.sqrt(var)
+
+    def agg(self, by: Optional[str] = None, equals: Optional[Dict[str, Iterable]] = None,
+            ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None, **named):
+        """
+        Agrega as células filtradas. `named` segue o `groupby().agg` do pandas:
+        nome=(medida, estatística), com estatística em STATS.
+        Sem `by` retorna um dict de escalares (inclui 'linhas'); com `by`, um DataFrame
+        com uma linha por valor observado da dimensão.
+        """
+        equals, ranges = equals or {}, ranges or {}
+        selectors = [self._select(d, equals.get(d), ranges.get(d)) for d in self.dims]
+        block = np.ix_(*selectors)
+        n, cnt, s, sq = self.n[block], self.cnt[block], self.sum[block], self.sumsq[block]
+
+        keep_axis = self.dims.index(by) if by is not None else None
+        axes = tuple(a for a in range(len(self.dims)) if a != keep_axis)
+        n, cnt, s, sq = n.sum(axis=axes), cnt.sum(axis=axes), s.sum(axis=axes), sq.sum(axis=axes)
+
+        if by is not None:
+            labels = [self.labels[by][i] for i in selectors[keep_axis]]
+            if by in self.bins:
+                # Células da borda (2k) e do interior (2k-1) formam a faixa ((k-1)*w, k*w]
+                steps, inverse = np.unique(np.array([(k + 1) // 2 for k in labels], dtype=np.int64),
+                                           return_inverse=True)
+                merged = []
+                for a in (n, cnt, s, sq):
+                    acc = np.zeros((len(steps),) + a.shape[1:], dtype=a.dtype)
+                    np.add.at(acc, inverse, a)
+                    merged.append(acc)
+                n, cnt, s, sq = merged
+                labels = [int(k) * self.bins[by] for k in steps]
+
+        out = {}
+        for name, (measure, stat) in named.items():
+            if stat not in STATS:
+                raise ValueError(f"Estatística '{stat}' não suportada; use uma de {STATS}")
+            j = self.measures.index(measure)
+            out[name] = self._stat(cnt[..., j], s[..., j], sq[..., j], stat)
+
+        if by is None:
+            return {'linhas': int(n), **{k: float(v) for k, v in out.items()}}
+        result = pd.DataFrame({by: labels, **out})[n > 0]
+        if self._ordered[by] is not None:
+            result[by] = pd.Categorical(result[by], categories=self.labels[by], ordered=self._ordered[by])
+        else:
+            result = result.sort_values(by)
+        return result.reset_index(drop=True)
+
+
+# -------------------------------
+# UM CUBO POR TABELA E POR PROCESSO
+# -------------------------------
+_cubes: Dict[str, Tuple[str, AggregateCube]] = {}
+_lock = threading.Lock()
+
+
+def get_cube(name: str) -> AggregateCube:
+    """Cubo da tabela `name` (ver `CUBES`), montado uma vez por versão dos dados."""
+    version = table_version(name)
+    cached = _cubes.get(name)
+    if cached is None or cached[0] != version:
+        with _lock:
+            cached = _cubes.get(name)
+            if cached is None or cached[0] != version:
+                dims, measures, bins = CUBES[name]
+                cached = (version, AggregateCube.from_frame(get_table(name), dims, measures, bins))
+                _cubes[name] = cached
+    return cached[1]
@@ -0,0 +1,236 @@
+# src/data.py - camada de dados compartilhada (inventário e campanhas carregados uma vez por processo)
+"""
+Cada tabela é lida uma única vez por processo, de Parquet ou Arrow/Feather em
+`data/` quando o arquivo existe, ou gerada a partir dos dados simulados.
+Na carga, texto repetitivo vira categórico (meses com ordem de calendário) e
+números são reduzidos ao menor tipo que comporta os valores.
+
+`get_table(nome)` devolve uma visão rasa do DataFrame compartilhado: os
+buffers são os mesmos para todas as sessões (sem cópia e sem pickle do
+`st.cache_data`) e estão marcados como somente leitura; com Copy-on-Write,
+alterações numa página criam cópias locais sem afetar as outras sessões.
+
+Para gravar os dados simulados em Parquet (ou trocar por dados reais):
+    python -m src.data
+"""
+import os
+import threading
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from src.exports import data_version
+
+DATA_DIR = "data"
+MES_ORDER = ['Jan', 'Fev', 'Mar', 'Abr', 'Maio', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+MONTH_COLUMNS = ('Mes', 'Mês')
+MAX_CATEGORY_RATIO = 0.5
+CURRENCY_MARK = 'R$'   # colunas monetárias (Investimento, CPM, CPP, Custo) ficam em float64
+
+
+# -------------------------------
+# GERADORES DE DADOS SIMULADOS
+# -------------------------------
+def generate_report_data(n_campanhas: int = 100, seed: int = 42) -> pd.DataFrame:
+    """Gera um DataFrame unificado simulando campanhas ao longo de 12 meses."""
+    np.random.seed(seed)
+
+    # Probabilidade (sazonalidade)
+    meses = np.random.choice(MES_ORDER, n_campanhas, p=[0.06, 0.07, 0.08, 0.07, 0.08, 0.08, 0.08, 0.07, 0.08, 0.09, 0.10, 0.14])
+
+    tipos_midia = np.random.choice(['Digital', 'Estática'], n_campanhas, p=[0.6, 0.4])
+
+    investimentos = np.random.uniform(50, 400, n_campanhas).round(1)
+    investimentos[meses == 'Dez'] *= 1.5
+
+    reach = (investimentos * np.random.uniform(0.015, 0.025, n_campanhas)).round(2)
+
+    cpm = np.random.uniform(2.0, 7.0, n_campanhas).round(2)
+    cpm[tipos_midia == 'Digital'] *= 0.8
+
+    frequencia = np.random.uniform(3.0, 8.0, n_campanhas).round(1)
+
+    data = {
+        'ID_Campanha': [f'C{i:03d}' for i in range(1, n_campanhas + 1)],
+        'Mes': meses,
+        'Tipo_Midia': tipos_midia,
+        'Investimento_Mil_R$': investimentos,
+        'Reach_Milhoes': reach,
+        'Frequencia': frequencia,
+        'CPM_R$': cpm,
+        'Audiencia_Pico_K': np.random.randint(70, 300, n_campanhas)
+    }
+    return pd.DataFrame(data)
+
+
+def generate_campaign_data(seed: int = 7) -> pd.DataFrame:
+    """Gera dados simulados de várias campanhas OOH."""
+    rng = np.random.RandomState(seed)
+    data = {
+        'Campanha': [f'Campanha {i}' for i in range(1, 11)],
+        'Investimento (R$)': rng.randint(50000, 300000, 10),
+        'Reach (Milhões)': rng.uniform(0.8, 4.5, 10).round(2),
+        'Impressões (Milhões)': rng.uniform(5.0, 30.0, 10).round(1),
+        'Frequência Média': rng.uniform(4.0, 7.0, 10).round(1),
+        'Tipo de Mídia': ['Digital', 'Estática'] * 5,
+        'Mês': ['Jan', 'Fev', 'Mar', 'Abr', 'Maio'] * 2
+    }
+    df = pd.DataFrame(data)
+
+    # Calcular CPM (Custo por Mil Impressões)
+    df['CPM (R$)'] = (df['Investimento (R$)'] / df['Impressões (Milhões)']) / 1000
+    df['CPM (R$)'] = df['CPM (R$)'].round(2)
+
+    # Calcular CPP (Custo por Ponto de Audiência, simplificado)
+    df['CPP (R$)'] = df['Investimento (R$)'] / (df['Reach (Milhões)'] * 1000000)
+    df['CPP (R$)'] = df['CPP (R$)'].round(2)
+
+    return df
+
+
+def generate_ooh_points(seed: int = 11) -> pd.DataFrame:
+    """Gera dados simulados de pontos OOH (Out-of-Home) em São Paulo."""
+    rng = np.random.RandomState(seed)
+
+    # Coordenadas aproximadas de pontos centrais e estratégicos de SP
+    data = {
+        'ID_Ponto': [f'OOH-{i:03}' for i in range(1, 26)],
+        'Latitude': [
+            -23.5505, -23.5430, -23.5614, -23.5520, -23.5630,  # Centro/Paulista
+            -23.5850, -23.6000, -23.5780, -23.5700, -23.5480,  # Zona Oeste/Sul
+            -23.5200, -23.5000, -23.4800, -23.4700, -23.4500,  # Zona Norte
+            -23.6500, -23.6300, -23.6100, -23.5900, -23.5300,  # Zona Sul/Marginal
+            -23.5400, -23.5350, -23.5450, -23.5550, -23.5650,  # Outros
+        ],
+        'Longitude': [
+            -46.6333, -46.6500, -46.6667, -46.6833, -46.6200,
+            -46.6900, -46.6700, -46.6550, -46.6450, -46.6350,
+            -46.6100, -46.5900, -46.5700, -46.5500, -46.5300,
+            -46.6000, -46.5800, -46.5600, -46.5400, -46.6400,
+            -46.6700, -46.6800, -46.6600, -46.6550, -46.6450,
+        ],
+        'Audiência Diária (Milhares)': rng.randint(20, 150, 25),
+        'Custo Mensal (R$ Mil)': rng.uniform(5.0, 50.0, 25).round(1),
+        'Tipo': ['Digital', 'Estático'] * 12 + ['Digital'],
+        'Zona': ['Centro', 'Oeste', 'Sul', 'Norte', 'Leste'] * 5
+    }
+    df = pd.DataFrame(data)
+
+    # --- Cálculo do Score (Métrica principal para ranking) ---
+    # Score é Audiência * (1 / Custo) * Fator de Impacto
+    df['Custo por Audiência (R$/mil)'] = (df['Custo Mensal (R$ Mil)'] * 1000) / df['Audiência Diária (Milhares)']
+    df['Fator de Impacto'] = rng.uniform(0.8, 1.2, 25).round(2)
+
+    # Exemplo simples de Score: quanto maior, melhor
+    df['Score OOH'] = (df['Audiência Diária (Milhares)'] / df['Custo por Audiência (R$/mil)']) * df['Fator de Impacto']
+    df['Score OOH'] = df['Score OOH'].rank(ascending=False).astype(int)
+
+    return df
+
+
+# nome -> (arquivo em DATA_DIR, sem extensão; gerador usado quando o arquivo não existe)
+TABLES: Dict[str, tuple] = {
+    'inventario': ('inventario_ooh', generate_ooh_points),
+    'campanhas': ('campanhas_ooh', generate_campaign_data),
+    'campanhas_relatorio': ('campanhas_relatorio', generate_report_data),
+}
+
+
+# -------------------------------
+# TIPOS COMPACTOS
+# -------------------------------
+def optimize_dtypes(df: pd.DataFrame, max_ratio: float = MAX_CATEGORY_RATIO) -> pd.DataFrame:
+    """
+    Meses -> categórico ordenado; texto com até `max_ratio` de valores distintos
+    -> categórico; inteiros e floats -> menor tipo numérico (float32 no máximo).
+    Colunas monetárias (nome com `CURRENCY_MARK`) não são reduzidas: valores em
+    reais ficam em float64, para que somas e médias batam com o dado original.
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in MONTH_COLUMNS:
+            s = pd.Categorical(s.astype(str), categories=MES_ORDER, ordered=True)
+        elif isinstance(s.dtype, pd.CategoricalDtype):
+            pass
+        elif pd.api.types.is_bool_dtype(s):
+            pass
+        elif CURRENCY_MARK in col and pd.api.types.is_numeric_dtype(s):
+            if pd.api.types.is_float_dtype(s):
+                s = s.astype('float64')
+        elif pd.api.types.is_integer_dtype(s):
+            s = pd.to_numeric(s, downcast='integer')
+        elif pd.api.types.is_float_dtype(s):
+            s = pd.to_numeric(s, downcast='float')
+        elif (s.dtype == object or pd.api.types.is_string_dtype(s)) and len(s):
+            if s.nunique(dropna=True) <= max_ratio * len(s):
+                s = s.astype('category')
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def _freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tabela com os buffers numéricos somente leitura (escrita acidental in-place levanta erro).
+
+    Cada coluna numpy é copiada uma vez para um array próprio, marcado com
+    `flags.writeable = False` e embrulhado sem cópia: marcar o retorno de
+    `np.asarray(col)` não bastaria, porque ele pode ser só uma visão do bloco.
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, np.dtype) and s.dtype != object:
+            arr = np.array(s, copy=True)
+            arr.flags.writeable = False
+            s = pd.Series(arr, index=df.index, name=col, copy=False)
+        out[col] = s
+    return pd.DataFrame(out, index=df.index, copy=False)
+
+
+# -------------------------------
+# CARGA ÚNICA POR PROCESSO
+# -------------------------------
+_tables: Dict[str, pd.DataFrame] = {}
+_versions: Dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def _read(name: str, data_dir: str) -> pd.DataFrame:
+    stem, generator = TABLES[name]
+    for ext, reader in (('.parquet', pd.read_parquet), ('.arrow', pd.read_feather), ('.feather', pd.read_feather)):
+        path = os.path.join(data_dir, stem + ext)
+        if os.path.exists(path):
+            print(f"[Data] {name}: lendo {path}")
+            return reader(path)
+    return generator()
+
+
+def get_table(name: str, data_dir: str = DATA_DIR) -> pd.DataFrame:
+    """Visão somente leitura (sem cópia dos dados) da tabela compartilhada `name`."""
+    if name not in _tables:
+        with _lock:
+            if name not in _tables:
+                df = _freeze(optimize_dtypes(_read(name, data_dir)))
+                _versions[name] = data_version(df)
+                _tables[name] = df
+    return _tables[name].copy(deep=False)
+
+
+def table_version(name: str) -> str:
+    """Hash do conteúdo da tabela, calculado uma vez na carga (chave de caches derivados)."""
+    get_table(name)
+    return _versions[name]
+
+
+def memory_usage_mb(name: str) -> float:
+    return get_table(name).memory_usage(deep=True).sum() / 1e6
+
+
+if __name__ == '__main__':
+    os.makedirs(DATA_DIR, exist_ok=True)
+    for name, (stem, generator) in TABLES.items():
+        path = os.path.join(DATA_DIR, stem + '.parquet')
+        optimize_dtypes(generator()).to_parquet(path, index=False)
+        print(f"{name}: {path} ({memory_usage_mb(name):.3f} MB em memória)")
@@ -0,0 +1,105 @@
+# src/exports.py - exportação de DataFrames em CSV gzip e Parquet (em blocos, sob demanda, com cache por versão)
+"""
+Os arquivos são gerados só quando o download é pedido e gravados num cache em
+disco com o nome `<versão dos dados>.<formato>`; downloads seguintes (ou de
+outras sessões) da mesma versão apenas leem o arquivo pronto.
+
+- CSV: escrito em blocos de `CHUNK_ROWS` linhas direto num stream gzip, sem
+  montar a string do arquivo inteiro em memória.
+- Parquet: colunas de texto repetitivas viram categóricas (dictionary encoding)
+  e cada bloco vira um row group.
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO
+
+import pandas as pd
+
+CHUNK_ROWS = 100_000
+MAX_CATEGORY_RATIO = 0.5  # texto com até 50% de valores distintos vira categórico
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "ooh_exports")
+
+FORMATS = {
+    'csv.gz': 'application/gzip',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def data_version(df: pd.DataFrame) -> str:
+    """Hash do conteúdo do DataFrame (muda sempre que os dados mudam)."""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values.tobytes()).hexdigest()[:16]
+
+
+def file_version(path: str) -> str:
+    """Hash do conteúdo de um arquivo (lido em blocos de 1 MB), no mesmo formato de `data_version`."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def with_categoricals(df: pd.DataFrame, max_ratio: float = MAX_CATEGORY_RATIO) -> pd.DataFrame:
+    """Converte colunas de texto com poucos valores distintos em `category`."""
+    out = df.copy(deep=False)
+    for col in out.columns:
+        s = out[col]
+        if (s.dtype == object or pd.api.types.is_string_dtype(s)) and len(s):
+            if s.nunique(dropna=True) <= max_ratio * len(s):
+                out[col] = s.astype('category')
+    return out
+
+
+def write_csv_gzip(df: pd.DataFrame, fh: BinaryIO, chunk_rows: int = CHUNK_ROWS):
+    """Grava o CSV comprimido em blocos (apenas um bloco de texto em memória por vez)."""
+    with gzip.GzipFile(fileobj=fh, mode='wb', compresslevel=6, mtime=0) as gz:
+        for start in range(0, max(len(df), 1), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            gz.write(chunk.to_csv(index=False, header=(start == 0)).encode('utf-8'))
+
+
+def write_parquet(df: pd.DataFrame, fh: BinaryIO, chunk_rows: int = CHUNK_ROWS):
+    """Grava Parquet (zstd) com categóricas em dictionary encoding, um row group por bloco."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = with_categoricals(df)
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(fh, schema, compression='zstd') as writer:
+        for start in range(0, max(len(df), 1), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+_WRITERS = {'csv.gz': write_csv_gzip, 'parquet': write_parquet}
+
+
+def export_path(df: pd.DataFrame, fmt: str, version: str = None, export_dir: str = EXPORT_DIR) -> str:
+    """
+    Caminho do arquivo exportado para esta versão dos dados, gerando-o se ainda
+    não existir. A escrita vai para um arquivo temporário renomeado no final,
+    então leitores concorrentes nunca veem um arquivo pela metade.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Formato não suportado: {fmt} (use {', '.join(_WRITERS)})")
+    version = version or data_version(df)
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, f"{version}.{fmt}")
+    if not os.path.exists(path):
+        fd, tmp = tempfile.mkstemp(dir=export_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                _WRITERS[fmt](df, fh)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    return path
+
+
+def export_bytes(df: pd.DataFrame, fmt: str, version: str = None) -> bytes:
+    """Conteúdo do arquivo exportado (para `st.download_button(data=...)`)."""
+    with open(export_path(df, fmt, version), 'rb') as fh:
+        return fh.read()
@@ -5,15 +5,21 @@ from typing import Optional, List, Dict
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 
+from src.timing import timed
+
 
 # ===============================
 # 1. OVERPASS – BUSCA POIs (ônibus, outdoors, etc.)
 # ===============================
-def fetch_pois_overpass(bbox: str, tags: List[str] = None, timeout: int = 25) -> pd.DataFrame:
+@timed('fetch.overpass')
+def fetch_pois_overpass(bbox: str, tags: List[str] = None, timeout: int = 25,
+                        raise_errors: bool = False) -> pd.DataFrame:
     """
     Busca pontos de interesse (POIs) usando Overpass API.
     - bbox: 'minlat,minlon,maxlat,maxlon'
     - tags: lista de ['key=value']
+    - raise_errors: propaga falhas (429, timeout...) em vez de devolver vazio,
+      para quem guarda o resultado em cache distinguir "sem POIs" de "erro"
     Retorna DataFrame com id, lat, lon e tags.
     """
     if tags is None:
@@ -46,12 +52,15 @@ def fetch_pois_overpass(bbox: str, tags: List[str] = None, timeout: int = 25) ->
         return pd.DataFrame(rows)
     except Exception as e:
         print(f"[Overpass] Erro: {e}")
+        if raise_errors:
+            raise
         return pd.DataFrame()  # Retorna vazio em erro
 
 
 # ===============================
 # 2. IBGE – PROJEÇÃO POPULACIONAL
 # ===============================
+@timed('fetch.ibge_populacao')
 def fetch_population_ibge(
     municipio_id: str = None,
     periodo: Optional[str] = None,
@@ -83,6 +92,7 @@ def fetch_population_ibge(
 # ===============================
 # 3. IBGE – PIB MUNICIPAL (SIDRA)
 # ===============================
+@timed('fetch.ibge_pib')
 def fetch_pib_ibge(municipio_id: str = "3550308", ano: str = "2021") -> Optional[int]:
     """
     Busca PIB municipal via SIDRA (tabela 5938).
@@ -103,6 +113,7 @@ def fetch_pib_ibge(municipio_id: str = "3550308", ano: str = "2021") -> Optional
 # ===============================
 # 4. INMET – DADOS DE ESTAÇÃO
 # ===============================
+@timed('fetch.inmet')
 def fetch_inmet_station_data(
     station_code: str,
     start_date: Optional[str] = None,
@@ -142,6 +153,7 @@ class SPTransClient:
         self.session = requests.Session()
         self.authenticated = False
 
+    @timed('fetch.sptrans_login')
     def authenticate(self) -> bool:
         """Autentica com token. Retorna True se sucesso."""
         if not self.token:
@@ -156,6 +168,7 @@ class SPTransClient:
             print(f"[SPTrans] Falha na autenticação: {e}")
             return False
 
+    @timed('fetch.sptrans_posicoes')
     def get_positions(self) -> Optional[dict]:
         """Retorna JSON com posições de veículos ou None."""
         if not self.authenticated:
@@ -169,6 +182,7 @@ class SPTransClient:
             print(f"[SPTrans] Erro ao buscar posições: {e}")
             return None
 
+    @timed('fetch.sptrans_contagem')
     def get_bus_count(self) -> int:
         """Retorna número de linhas (ônibus) em operação."""
         data = self.get_positions()
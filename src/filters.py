@@ -0,0 +1,140 @@
+# src/filters.py - motor de filtros com bitmaps por valor categórico e arrays ordenados para faixas
+"""
+`BitmapIndex` é montado uma vez por tabela (por versão dos dados) e responde
+aos filtros das páginas sem varrer a tabela com `isin`:
+
+- colunas categóricas: um bitmap (bits empacotados em palavras de 64 bits)
+  por valor; a seleção de vários valores é um OR e colunas diferentes
+  são combinadas com AND;
+- colunas numéricas: valores ordenados + permutação + bitmaps-prefixo em
+  cortes por quantil; uma faixa vira dois `searchsorted`, o prefixo mais
+  próximo de cada limite e um ajuste das poucas linhas entre corte e limite.
+
+Uso:
+    idx = BitmapIndex(df, categorical=['Mês', 'Tipo de Mídia'], ranges=['CPM (R$)'])
+    rows = idx.query({'Mês': ['Jan', 'Fev']}, {'CPM (R$)': (None, 10.0)})
+    df_filtrado = df.iloc[rows]
+"""
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+Range = Tuple[Optional[float], Optional[float]]
+RANGE_BUCKETS = 32  # bitmaps-prefixo por coluna numérica (memória: n/8 bytes cada)
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    """Máscara booleana -> bitmap em palavras uint64 (bit i = linha i)."""
+    bits = np.packbits(mask, bitorder='little')
+    pad = (-len(bits)) % 8
+    if pad:
+        bits = np.concatenate([bits, np.zeros(pad, dtype=np.uint8)])
+    return bits.view(np.uint64)
+
+
+class BitmapIndex:
+    """Índices de bitmap (igualdade) e de ordenação (faixas) sobre um DataFrame imutável."""
+
+    def __init__(self, df: pd.DataFrame, categorical: Sequence[str] = (), ranges: Sequence[str] = (),
+                 range_buckets: int = RANGE_BUCKETS):
+        self.n = len(df)
+        self._full = _pack(np.ones(self.n, dtype=bool))
+        self._empty = np.zeros_like(self._full)
+
+        self.bitmaps: Dict[str, Dict[object, np.ndarray]] = {}
+        self._has_missing: Dict[str, bool] = {}
+        for col in categorical:
+            s = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype('category')
+            codes = s.cat.codes.to_numpy()
+            self._has_missing[col] = bool((codes < 0).any())
+            present = np.bincount(codes[codes >= 0], minlength=len(s.cat.categories)) > 0
+            self.bitmaps[col] = {value: _pack(codes == k)
+                                 for k, value in enumerate(s.cat.categories) if present[k]}
+
+        # NaN fica no fim da ordenação e nunca entra numa faixa (como `<=` no pandas).
+        # Além da ordenação, guarda bitmaps-prefixo em `range_buckets` pontos de corte
+        # (linhas até o k-ésimo quantil): uma faixa parte do prefixo mais próximo e
+        # só ajusta bit a bit as linhas entre o corte e o limite pedido.
+        self._sorted: Dict[str, tuple] = {}
+        for col in ranges:
+            values = df[col].to_numpy(dtype=float)
+            order = np.argsort(values, kind='stable')
+            sorted_values = values[order]
+            n_valid = self.n - int(np.count_nonzero(np.isnan(sorted_values)))
+            cuts = np.unique(np.linspace(0, n_valid, range_buckets + 1).round().astype(np.int64))
+            mask = np.zeros(self.n, dtype=bool)
+            prefixes = []
+            for a, b in zip(np.r_[0, cuts[:-1]], cuts):
+                mask[order[a:b]] = True
+                prefixes.append(_pack(mask))
+            self._sorted[col] = (order, sorted_values[:n_valid], cuts, prefixes)
+
+    def values(self, col: str) -> list:
+        """Valores presentes numa coluna categórica, na ordem das categorias (opções dos filtros)."""
+        return list(self.bitmaps[col])
+
+    def _equals_bits(self, col: str, selected: Iterable) -> Optional[np.ndarray]:
+        per_value = self.bitmaps[col]
+        selected = [v for v in selected if v in per_value]
+        if len(selected) == len(per_value) and not self._has_missing[col]:
+            return None  # tudo selecionado: não restringe
+        if not selected:
+            return self._empty
+        if len(selected) == 1:
+            return per_value[selected[0]]
+        return np.bitwise_or.reduce([per_value[v] for v in selected])
+
+    def _upto(self, col: str, i: int) -> np.ndarray:
+        """Bitmap das linhas nas posições [0, i) da ordenação, a partir do corte mais próximo."""
+        order, _, cuts, prefixes = self._sorted[col]
+        k = int(np.abs(cuts - i).argmin())
+        if cuts[k] == i:
+            return prefixes[k]
+        bits = prefixes[k].copy()
+        if cuts[k] < i:
+            rows = order[cuts[k]:i]
+            np.bitwise_or.at(bits, rows >> 6, np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+        else:
+            rows = order[i:cuts[k]]
+            np.bitwise_and.at(bits, rows >> 6, ~np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+        return bits
+
+    def _range_bits(self, col: str, lo: Optional[float], hi: Optional[float]) -> Optional[np.ndarray]:
+        if lo is None and hi is None:
+            return None  # sem filtro: mantém também as linhas NaN (fora de `sorted_values`)
+        sorted_values = self._sorted[col][1]
+        i0 = 0 if lo is None else int(np.searchsorted(sorted_values, lo, side='left'))
+        i1 = len(sorted_values) if hi is None else int(np.searchsorted(sorted_values, hi, side='right'))
+        if i0 == 0 and i1 == self.n:
+            return None
+        if i0 >= i1:
+            return self._empty
+        bits = self._upto(col, i1)
+        return bits if i0 == 0 else bits & ~self._upto(col, i0)
+
+    def bits(self, equals: Optional[Dict[str, Iterable]] = None,
+             ranges: Optional[Dict[str, Range]] = None) -> np.ndarray:
+        """Bitmap do filtro: AND entre colunas, OR entre valores da mesma coluna, faixas inclusivas."""
+        parts = [self._equals_bits(col, values) for col, values in (equals or {}).items()]
+        parts += [self._range_bits(col, lo, hi) for col, (lo, hi) in (ranges or {}).items()]
+        parts = [p for p in parts if p is not None]
+        if not parts:
+            return self._full
+        if len(parts) == 1:
+            return parts[0]
+        return np.bitwise_and.reduce(parts)
+
+    def query(self, equals: Optional[Dict[str, Iterable]] = None,
+              ranges: Optional[Dict[str, Range]] = None) -> np.ndarray:
+        """Posições (para `df.iloc`) das linhas que satisfazem o filtro, em ordem crescente."""
+        bits = self.bits(equals, ranges)
+        if bits is self._full:
+            return np.arange(self.n)
+        return np.flatnonzero(np.unpackbits(bits.view(np.uint8), count=self.n, bitorder='little'))
+
+    def count(self, equals: Optional[Dict[str, Iterable]] = None,
+              ranges: Optional[Dict[str, Range]] = None) -> int:
+        """Número de linhas do filtro (popcount, sem materializar as posições)."""
+        bits = self.bits(equals, ranges)
+        return int(np.bitwise_count(bits).sum())
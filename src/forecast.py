@@ -0,0 +1,296 @@
+# src/forecast.py - previsão sazonal da audiência diária de todos os pontos OOH de uma vez
+"""
+Modelo por ponto, no log da audiência diária:
+
+    log y[t, ponto] = X[t] @ B[:, ponto] + erro
+
+com a MESMA matriz de regressores X para todas as séries:
+
+    intercepto | tendência (anos) | dia da semana (6 dummies)
+    | sazonalidade anual (Fourier, FOURIER_K pares seno/cosseno)
+    | feriado (log do multiplicador de pedestres de `src.calendario`)
+
+Como X é compartilhada, o ajuste de N séries é uma única solução de sistema
+p x p com N lados direitos (B = (X'X)^-1 X'Y), sem laço por ponto. O modelo
+guarda só X'X, X'Y e a soma de y² (aditivos): `update(datas, Y)` soma dias
+novos e `fit()` resolve de novo em microssegundos, sem reler o histórico
+(o estado é gravado em disco entre execuções).
+Dias faltantes (NaN) de um ponto saem da X'X daquele ponto por uma correção
+esparsa (`_miss`), e os pontos são então resolvidos em lote.
+
+A previsão (dias x pontos, float32) fica em disco por versão do inventário e
+fim do histórico e é lida pelas páginas de Datas Sazonais e Relatório:
+
+    fc = get_forecast()
+    fc.yearly_total()            # audiência média diária do portfólio por ano
+    fc.monthly_total('2026-11')  # total projetado por mês
+"""
+import json
+import os
+import tempfile
+import threading
+from datetime import date, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.calendario import ANO_FIM, ANO_INICIO, get_multipliers
+from src.data import DATA_DIR, get_table, table_version
+
+FOURIER_K = 3
+RIDGE = 1e-8                   # regularização relativa (colunas sem variação no histórico)
+ORIGEM = np.datetime64(f"{ANO_INICIO}-01-01", 'D')
+HISTORY_PATH = os.path.join(DATA_DIR, "audiencia_diaria.parquet")
+FORECAST_DIR = os.path.join(tempfile.gettempdir(), "ooh_forecast")
+AUDIENCE_COL = 'Audiência Diária (Milhares)'
+
+# Histórico simulado (sem arquivo real): mesmas premissas da página de Datas Sazonais
+CRESCIMENTO_ANUAL = 0.15
+FATOR_DIA_SEMANA = np.array([1.0, 1.02, 1.03, 1.04, 1.08, 0.85, 0.70])  # seg..dom
+RUIDO = 0.08
+
+
+def design_matrix(datas) -> np.ndarray:
+    """Regressores (dias x p) compartilhados por todas as séries."""
+    d = np.asarray(datas, dtype='datetime64[D]')
+    dias = (d - ORIGEM).astype(np.int64)
+    dow = (dias + int((ORIGEM.astype(np.int64) + 3) % 7)) % 7  # 1970-01-01 foi quinta (3)
+    ano = 2 * np.pi * dias / 365.25
+    cols = [np.ones(len(d)), dias / 365.25]
+    cols += [(dow == k).astype(float) for k in range(1, 7)]
+    for k in range(1, FOURIER_K + 1):
+        cols += [np.sin(k * ano), np.cos(k * ano)]
+    pedestres, _ = get_multipliers().at(d)
+    cols.append(np.log(pedestres.astype(float)))
+    return np.column_stack(cols)
+
+
+class SeasonalModel:
+    """Regressão linear em lote (N séries, mesma X) com estatísticas suficientes incrementais."""
+
+    def __init__(self, n_series: int):
+        self.n_series = n_series
+        self.p = design_matrix(np.array([ORIGEM])).shape[1]
+        self.xtx = np.zeros((self.p, self.p))
+        self.xty = np.zeros((self.p, n_series))
+        self.yty = np.zeros(n_series)
+        self.nobs = np.zeros(n_series, dtype=np.int64)
+        self._miss: Optional[np.ndarray] = None  # (N, p, p): X'X dos dias faltantes de cada série
+        self.coef: Optional[np.ndarray] = None   # (p, N)
+        self.sigma2: Optional[np.ndarray] = None
+        self.last_day: Optional[np.datetime64] = None
+
+    def update(self, datas, Y: np.ndarray) -> None:
+        """Soma dias novos (Y: dias x séries, audiência > 0; NaN = faltante)."""
+        X = design_matrix(datas)
+        logy = np.log(np.asarray(Y, dtype=float))
+        missing = ~np.isfinite(logy)
+        logy = np.where(missing, 0.0, logy)
+
+        self.xtx += X.T @ X
+        self.xty += X.T @ logy
+        self.yty += np.einsum('tn,tn->n', logy, logy)
+        self.nobs += (~missing).sum(axis=0)
+        if missing.any():
+            if self._miss is None:
+                self._miss = np.zeros((self.n_series, self.p, self.p))
+            t, n = np.nonzero(missing)
+            np.add.at(self._miss, n, X[t, :, None] * X[t, None, :])
+        last = np.asarray(datas, dtype='datetime64[D]').max()
+        self.last_day = last if self.last_day is None else max(self.last_day, last)
+
+    def fit(self) -> 'SeasonalModel':
+        """Resolve todas as séries de uma vez."""
+        xtx = self.xtx if self._miss is None else self.xtx[None] - self._miss
+        ridge = RIDGE * np.trace(self.xtx) / self.p * np.eye(self.p)
+        if self._miss is None:
+            self.coef = np.linalg.solve(xtx + ridge, self.xty)
+            fitted_sq = np.einsum('pn,pq,qn->n', self.coef, self.xtx, self.coef)
+        else:
+            self.coef = np.linalg.solve(xtx + ridge, self.xty.T[..., None])[..., 0].T
+            fitted_sq = np.einsum('pn,npq,qn->n', self.coef, xtx, self.coef)
+        sse = self.yty - 2 * np.einsum('pn,pn->n', self.coef, self.xty) + fitted_sq
+        self.sigma2 = np.maximum(sse, 0) / np.maximum(self.nobs - self.p, 1)
+        return self
+
+    def predict(self, datas) -> np.ndarray:
+        """Audiência esperada (dias x séries), com correção da média log-normal."""
+        return np.exp(design_matrix(datas) @ self.coef + self.sigma2[None, :] / 2)
+
+    def save(self, path: str) -> None:
+        """Grava as estatísticas suficientes (o ajuste é refeito na carga)."""
+        arrays = dict(xtx=self.xtx, xty=self.xty, yty=self.yty, nobs=self.nobs,
+                      last_day=np.array([self.last_day], dtype='datetime64[D]'))
+        if self._miss is not None:
+            arrays['miss'] = self._miss
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SeasonalModel':
+        with np.load(path) as z:
+            model = cls(z['xty'].shape[1])
+            model.xtx, model.xty, model.yty, model.nobs = z['xtx'], z['xty'], z['yty'], z['nobs']
+            model._miss = z['miss'] if 'miss' in z.files else None
+            model.last_day = z['last_day'][0]
+        return model.fit()
+
+
+# -------------------------------
+# HISTÓRICO POR PONTO
+# -------------------------------
+def simulate_history(df_points: pd.DataFrame, inicio, fim, seed: int = 21) -> Tuple[np.ndarray, np.ndarray]:
+    """Audiência diária simulada (datas, dias x pontos) a partir da audiência média de cada ponto."""
+    rng = np.random.RandomState(seed)
+    datas = np.arange(np.datetime64(inicio, 'D'), np.datetime64(fim, 'D') + 1, dtype='datetime64[D]')
+    dias = (datas - ORIGEM).astype(np.int64)
+    dow = (dias + int((ORIGEM.astype(np.int64) + 3) % 7)) % 7
+    n = len(df_points)
+    amplitude = rng.uniform(0.03, 0.12, n)   # força da sazonalidade anual (pico em dezembro)
+    anual = 1 + amplitude[None, :] * np.cos(2 * np.pi * (dias[:, None] - 350) / 365.25)
+    tendencia = (1 + CRESCIMENTO_ANUAL) ** (dias / 365.25)
+    pedestres, _ = get_multipliers().at(datas)
+    base = df_points[AUDIENCE_COL].to_numpy(dtype=float)
+    ruido = np.exp(rng.normal(0, RUIDO, (len(datas), n)))
+    Y = base[None, :] * (tendencia * FATOR_DIA_SEMANA[dow] * pedestres)[:, None] * anual * ruido
+    return datas, Y
+
+
+def load_history(df_points: pd.DataFrame, fim, inicio=ORIGEM) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histórico (datas, dias x pontos na ordem de `df_points`) de `inicio` até `fim`.
+    Usa `HISTORY_PATH` (colunas ID_Ponto, data, audiencia) quando existe; senão, simula.
+    """
+    if not os.path.exists(HISTORY_PATH):
+        return simulate_history(df_points, inicio, fim)
+    hist = pd.read_parquet(HISTORY_PATH, columns=['ID_Ponto', 'data', 'audiencia'],
+                           filters=[('data', '>=', pd.Timestamp(inicio)), ('data', '<=', pd.Timestamp(fim))])
+    datas = np.arange(np.datetime64(inicio, 'D'), np.datetime64(fim, 'D') + 1, dtype='datetime64[D]')
+    wide = hist.pivot_table(index='data', columns='ID_Ponto', values='audiencia', aggfunc='sum')
+    wide = wide.reindex(index=pd.to_datetime(datas), columns=df_points['ID_Ponto'].astype(str))
+    return datas, wide.to_numpy(dtype=float)
+
+
+# -------------------------------
+# PREVISÃO GRAVADA (DIAS X PONTOS)
+# -------------------------------
+class AudienceForecast:
+    """Audiência diária ajustada/projetada (float32, dias x pontos) de `inicio` até o fim do calendário."""
+
+    def __init__(self, ids: Sequence[str], inicio, values: np.ndarray, history_end):
+        self.ids = list(ids)
+        self.inicio = np.datetime64(inicio, 'D')
+        self.values = values
+        self.history_end = np.datetime64(history_end, 'D')
+
+    @property
+    def datas(self) -> np.ndarray:
+        return self.inicio + np.arange(len(self.values)).astype('timedelta64[D]')
+
+    def save(self, path: str) -> None:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            np.save(fh, self.values.astype(np.float32))
+        os.replace(tmp, path)
+        with open(path[:-4] + '.json', 'w', encoding='utf-8') as fh:
+            json.dump({'ids': self.ids, 'inicio': str(self.inicio), 'history_end': str(self.history_end)}, fh)
+
+    @classmethod
+    def load(cls, path: str) -> 'AudienceForecast':
+        with open(path[:-4] + '.json', encoding='utf-8') as fh:
+            meta = json.load(fh)
+        return cls(meta['ids'], meta['inicio'], np.load(path, mmap_mode='r'), meta['history_end'])
+
+    def yearly_total(self) -> pd.Series:
+        """Audiência média diária do portfólio (soma dos pontos) por ano, na unidade da série."""
+        total = np.asarray(self.values, dtype=np.float64).sum(axis=1)
+        anos = self.datas.astype('datetime64[Y]').astype(int) + 1970
+        return pd.Series(total).groupby(anos).mean()
+
+    def monthly_total(self, inicio, meses: int = 12) -> pd.DataFrame:
+        """Total do portfólio por mês a partir de `inicio` ('AAAA-MM'), marcando meses projetados."""
+        total = np.asarray(self.values, dtype=np.float64).sum(axis=1)
+        mes = self.datas.astype('datetime64[M]')
+        primeiro = np.datetime64(inicio, 'M')
+        ok = (mes >= primeiro) & (mes < primeiro + meses)
+        df = pd.DataFrame({'mes': mes[ok], 'audiencia': total[ok]}).groupby('mes', as_index=False)['audiencia'].sum()
+        df['projetado'] = df['mes'].to_numpy() > self.history_end.astype('datetime64[M]')
+        df['mes'] = pd.to_datetime(df['mes'])
+        return df
+
+
+def build_forecast(df_points: pd.DataFrame, history_end, ano_fim: int = ANO_FIM,
+                   model: Optional[SeasonalModel] = None) -> Tuple[AudienceForecast, SeasonalModel]:
+    """
+    Ajusta o modelo em lote no histórico até `history_end` e projeta até o fim de `ano_fim`.
+    Com `model` (estado de um ajuste anterior), só os dias posteriores a `model.last_day` são lidos.
+    """
+    end = np.datetime64(history_end, 'D')
+    if model is None:
+        model = SeasonalModel(len(df_points))
+        inicio = ORIGEM
+    else:
+        inicio = model.last_day + 1
+    if inicio <= end:
+        datas, Y = load_history(df_points, end, inicio)
+        model.update(datas, Y)
+    model.fit()
+    horizonte = np.arange(ORIGEM, np.datetime64(f"{ano_fim + 1}-01-01", 'D'), dtype='datetime64[D]')
+    values = model.predict(horizonte).astype(np.float32)
+    return AudienceForecast(df_points['ID_Ponto'].astype(str), ORIGEM, values, history_end), model
+
+
+# -------------------------------
+# UMA PREVISÃO POR VERSÃO DO INVENTÁRIO E POR DIA
+# -------------------------------
+_forecasts: Dict[str, AudienceForecast] = {}
+_lock = threading.Lock()
+
+
+def _evict_older(version: str, history_end: date, cache_dir: str) -> None:
+    """Remove previsões da mesma versão com histórico anterior a `history_end` (memória e disco)."""
+    prefix = f"{version}_"
+    current = f"{history_end:%Y%m%d}"
+    for key in [k for k in _forecasts if k.startswith(prefix) and k[len(prefix):] < current]:
+        del _forecasts[key]
+    for name in os.listdir(cache_dir):
+        stem, ext = os.path.splitext(name)
+        day = stem[len(prefix):]
+        if name.startswith(prefix) and ext in ('.npy', '.json') and day.isdigit() and day < current:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass  # outro processo já removeu
+
+
+def get_forecast(history_end: Optional[date] = None, cache_dir: str = FORECAST_DIR) -> AudienceForecast:
+    """
+    Previsão do inventário com histórico até `history_end` (padrão: ontem), gravada em disco.
+    O estado do modelo (X'X, X'Y) fica em `<versão>_modelo.npz`: num dia novo, só os dias
+    ainda não vistos entram no ajuste, e as previsões de dias anteriores da mesma versão
+    são descartadas.
+    """
+    history_end = history_end or date.today() - timedelta(days=1)
+    version = table_version('inventario')
+    key = f"{version}_{history_end:%Y%m%d}"
+    if key not in _forecasts:
+        with _lock:
+            if key not in _forecasts:
+                os.makedirs(cache_dir, exist_ok=True)
+                path = os.path.join(cache_dir, f"{key}.npy")
+                if os.path.exists(path) and os.path.exists(path[:-4] + '.json'):
+                    _forecasts[key] = AudienceForecast.load(path)
+                else:
+                    state = os.path.join(cache_dir, f"{version}_modelo.npz")
+                    model = SeasonalModel.load(state) if os.path.exists(state) else None
+                    if model is not None and model.last_day > np.datetime64(history_end, 'D'):
+                        model = None  # estado à frente do pedido: reajusta do início
+                    forecast, model = build_forecast(get_table('inventario'), history_end, model=model)
+                    forecast.save(path)
+                    model.save(state)
+                    _forecasts[key] = forecast
+                _evict_older(version, history_end, cache_dir)
+    return _forecasts[key]
@@ -0,0 +1,312 @@
+# src/gazetteer.py - índice local de bairros, ruas e pontos de referência (busca sem depender do Nominatim)
+"""
+O gazetteer é carregado de um CSV com colunas `name, lat, lon[, kind]`, que pode
+vir da lista de localidades do IBGE ou de nomes exportados de um extrato OSM
+(ex.: `osmium export sao-paulo.osm.pbf -f geojsonseq` + `python -m src.gazetteer`).
+Resultados do Nominatim podem ser acrescentados com `add()`, então uma busca só
+depende do serviço externo na primeira vez.
+
+`data/gazetteer_sp.csv` acompanha o repositório como semente (os 96 distritos
+de São Paulo, avenidas e pontos de referência, com centróides aproximados).
+Para o extrato completo de bairros e vias do OSM:
+
+    python -m src.gazetteer --overpass data/gazetteer_sp.csv
+"""
+import bisect
+import csv
+import json
+import os
+import re
+import sys
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+ABREVIACOES = {
+    'av': 'avenida', 'r': 'rua', 'al': 'alameda', 'pca': 'praca', 'pc': 'praca',
+    'tv': 'travessa', 'est': 'estrada', 'rod': 'rodovia', 'vd': 'viaduto',
+    'lgo': 'largo', 'jd': 'jardim', 'vl': 'vila', 'pq': 'parque', 'sta': 'santa', 'sto': 'santo',
+}
+KIND_PRIORITY = {'bairro': 0, 'distrito': 0, 'ponto': 1, 'rua': 2}
+MIN_FUZZY_SCORE = 0.45
+MAX_PREFIX_SCAN = 5000  # limita consultas muito curtas ('r', 'av')
+SP_BBOX = "-24.01,-46.83,-23.35,-46.36"  # município de São Paulo (minlat,minlon,maxlat,maxlon)
+OVERPASS_TAGS = [
+    'place=suburb', 'place=neighbourhood', 'place=quarter', 'place=city_district',
+    'highway=trunk', 'highway=primary', 'highway=secondary', 'highway=tertiary',
+    'railway=station', 'leisure=park', 'shop=mall', 'tourism=attraction', 'tourism=museum',
+]
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sem acentos/pontuação e com abreviações comuns expandidas ('Av.' -> 'avenida')."""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    tokens = _NON_ALNUM.sub(' ', text).split()
+    return ' '.join(ABREVIACOES.get(t, t) for t in tokens)
+
+
+def trigrams(norm: str) -> set:
+    """Trigramas com preenchimento nas bordas (estilo pg_trgm)."""
+    padded = f'  {norm} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """
+    Índice em memória com duas estruturas:
+    - prefixos: lista ordenada de todos os sufixos de palavra de cada nome
+      ('avenida paulista', 'paulista'), consultada com `bisect`;
+    - trigramas: listas invertidas trigrama -> ids, para busca aproximada
+      (erros de digitação) por similaridade de Jaccard.
+
+    O índice é compartilhado entre sessões: `add()` e `search()` usam o mesmo
+    lock, porque a inserção altera a lista ordenada e as listas invertidas.
+    """
+
+    def __init__(self, entries: Optional[pd.DataFrame] = None):
+        self.names: List[str] = []
+        self.kinds: List[str] = []
+        self.lats: List[float] = []
+        self.lons: List[float] = []
+        self._norm: List[str] = []
+        self._n_trigrams: List[int] = []
+        self._n_trigrams_arr = None
+        self._keys: List[tuple] = []
+        self._postings = defaultdict(list)
+        self._seen = {}
+        self._lock = threading.Lock()
+        if entries is not None:
+            # Carga em lote: acrescenta sem manter a ordem e ordena uma única vez
+            for row in entries.itertuples(index=False):
+                self._insert(row.name, row.lat, row.lon, getattr(row, 'kind', 'ponto'), keep_sorted=False)
+            self._keys.sort()
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_csv(cls, *paths: str) -> 'Gazetteer':
+        """Carrega o gazetteer de um ou mais CSVs (name, lat, lon[, kind]); arquivos ausentes são ignorados."""
+        frames = []
+        for path in paths:
+            if not path or not os.path.exists(path):
+                continue
+            df = pd.read_csv(path, dtype={'name': str, 'kind': str})
+            df = df.dropna(subset=['name', 'lat', 'lon'])
+            if 'kind' not in df.columns:
+                df['kind'] = 'ponto'
+            frames.append(df[['name', 'lat', 'lon', 'kind']].fillna({'kind': 'ponto'}))
+        if not frames:
+            return cls()
+        return cls(pd.concat(frames, ignore_index=True))
+
+    def add(self, name: str, lat: float, lon: float, kind: str = 'ponto', persist_to: Optional[str] = None) -> int:
+        """
+        Acrescenta uma entrada (ignora nomes normalizados repetidos) e, se
+        `persist_to` for informado, grava a linha no CSV. Retorna o id da entrada.
+        """
+        with self._lock:
+            is_new = normalize(name) not in self._seen
+            idx = self._insert(name, lat, lon, kind, keep_sorted=True)
+            if persist_to and is_new and idx >= 0:
+                new_file = not os.path.exists(persist_to)
+                os.makedirs(os.path.dirname(persist_to) or '.', exist_ok=True)
+                with open(persist_to, 'a', newline='', encoding='utf-8') as fh:
+                    writer = csv.writer(fh)
+                    if new_file:
+                        writer.writerow(['name', 'lat', 'lon', 'kind'])
+                    writer.writerow([name, lat, lon, kind])
+        return idx
+
+    def _insert(self, name, lat, lon, kind, keep_sorted: bool) -> int:
+        norm = normalize(name)
+        if not norm:
+            return -1
+        if norm in self._seen:
+            return self._seen[norm]
+
+        idx = len(self.names)
+        self._seen[norm] = idx
+        self.names.append(str(name))
+        self.kinds.append(kind)
+        self.lats.append(float(lat))
+        self.lons.append(float(lon))
+        self._norm.append(norm)
+
+        tokens = norm.split()
+        for i in range(len(tokens)):
+            key = (' '.join(tokens[i:]), idx)
+            if keep_sorted:
+                bisect.insort(self._keys, key)
+            else:
+                self._keys.append(key)
+        grams = trigrams(norm)
+        self._n_trigrams.append(len(grams))
+        self._n_trigrams_arr = None
+        for g in grams:
+            self._postings[g].append(idx)
+        return idx
+
+    def _result(self, idx: int, score: float) -> dict:
+        return {'name': self.names[idx], 'lat': self.lats[idx], 'lon': self.lons[idx],
+                'kind': self.kinds[idx], 'score': round(score, 3)}
+
+    def search(self, query: str, limit: int = 5) -> List[dict]:
+        """
+        Busca por prefixo (qualquer início de palavra) e, se faltar resultado,
+        por similaridade de trigramas. Ordena por score e tipo (bairro > ponto > rua).
+        Apenas o trecho antes da primeira vírgula é usado ('Av. Paulista, São Paulo').
+        """
+        q = normalize(str(query).split(',')[0])
+        if not q or not self.names:
+            return []
+        with self._lock:
+            return self._search(q, limit)
+
+    def _search(self, q: str, limit: int) -> List[dict]:
+        scores = {}
+        lo = bisect.bisect_left(self._keys, (q, -1))
+        for key, idx in self._keys[lo:lo + MAX_PREFIX_SCAN]:
+            if not key.startswith(q):
+                break
+            if self._norm[idx] == q:
+                s = 1.0
+            elif self._norm[idx].startswith(q):
+                s = 0.95
+            else:
+                s = 0.9
+            scores[idx] = max(s, scores.get(idx, 0))
+
+        if len(scores) < limit:
+            q_grams = trigrams(q)
+            postings = [self._postings[g] for g in q_grams if g in self._postings]
+            if postings:
+                shared = np.bincount(np.concatenate(postings), minlength=len(self.names))
+                if self._n_trigrams_arr is None:
+                    self._n_trigrams_arr = np.asarray(self._n_trigrams)
+                cand = np.flatnonzero(shared)
+                jaccard = shared[cand] / (len(q_grams) + self._n_trigrams_arr[cand] - shared[cand])
+                for idx, sim in zip(cand.tolist(), jaccard.tolist()):
+                    if sim >= MIN_FUZZY_SCORE and idx not in scores:
+                        scores[idx] = 0.85 * sim
+
+        ranked = sorted(
+            scores.items(),
+            key=lambda kv: (-kv[1], KIND_PRIORITY.get(self.kinds[kv[0]], 3), len(self._norm[kv[0]])),
+        )
+        return [self._result(idx, s) for idx, s in ranked[:limit]]
+
+    def exact(self, query: str) -> Optional[dict]:
+        """Entrada cujo nome normalizado é igual à consulta inteira (sem cortar na vírgula), ou None."""
+        with self._lock:
+            idx = self._seen.get(normalize(query))
+            return None if idx is None else self._result(idx, 1.0)
+
+    def resolve(self, address: str, min_score: float = 1.0) -> Optional[dict]:
+        """
+        Coordenadas de um endereço só quando o gazetteer responde por ele inteiro:
+        nome exato (sem cortar na vírgula) ou, se não houver número, `lookup` com
+        `min_score`. "Rua X, 123" nunca vira o centróide da rua; fica para o Nominatim.
+        """
+        match = self.exact(address)
+        if match is None and not any(c.isdigit() for c in str(address)):
+            match = self.lookup(address, min_score=min_score)
+        return match
+
+    def lookup(self, query: str, min_score: float = 0.4) -> Optional[dict]:
+        """Melhor resultado com score mínimo, ou None (miss -> usar Nominatim)."""
+        results = self.search(query, limit=1)
+        if results and results[0]['score'] >= min_score:
+            return results[0]
+        return None
+
+
+def _kind_from_tags(props: dict) -> str:
+    """Classifica uma feature OSM em bairro/rua/ponto pelas tags mais comuns."""
+    if props.get('place') in ('suburb', 'neighbourhood', 'quarter', 'city_district'):
+        return 'bairro'
+    if props.get('highway'):
+        return 'rua'
+    return 'ponto'
+
+
+def geojsonseq_to_csv(src: str, dst: str) -> int:
+    """
+    Converte um extrato OSM em GeoJSON Sequence (uma feature por linha, ex.: saída
+    do `osmium export`) no CSV do gazetteer, usando o centróide de cada geometria.
+    Processa em streaming; retorna o número de entradas escritas.
+    """
+    from shapely.geometry import shape
+
+    written = 0
+    seen = set()
+    with open(src, encoding='utf-8') as fin, open(dst, 'w', newline='', encoding='utf-8') as fout:
+        writer = csv.writer(fout)
+        writer.writerow(['name', 'lat', 'lon', 'kind'])
+        for line in fin:
+            line = line.strip().lstrip('\x1e')
+            if not line:
+                continue
+            feat = json.loads(line)
+            props = feat.get('properties') or {}
+            name = props.get('name')
+            if not name or not feat.get('geometry'):
+                continue
+            kind = _kind_from_tags(props)
+            key = (normalize(name), kind)
+            if key in seen:  # ruas aparecem fatiadas em vários ways
+                continue
+            seen.add(key)
+            c = shape(feat['geometry']).centroid
+            writer.writerow([name, round(c.y, 6), round(c.x, 6), kind])
+            written += 1
+    return written
+
+
+def overpass_to_csv(dst: str, bbox: str = SP_BBOX, tags: List[str] = OVERPASS_TAGS, timeout: int = 180) -> int:
+    """
+    Monta o CSV do gazetteer direto do Overpass (bairros, vias principais e
+    pontos de referência com nome dentro de `bbox`), sem baixar o extrato OSM.
+    Retorna o número de entradas escritas.
+    """
+    from src.fetchers import fetch_pois_overpass
+
+    df = fetch_pois_overpass(bbox, tags=tags, timeout=timeout, raise_errors=True)
+    written = 0
+    seen = set()
+    os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+    with open(dst, 'w', newline='', encoding='utf-8') as fout:
+        writer = csv.writer(fout)
+        writer.writerow(['name', 'lat', 'lon', 'kind'])
+        for props in df.to_dict('records'):
+            name = props.get('name')
+            if not isinstance(name, str) or not name:
+                continue
+            kind = _kind_from_tags({k: v for k, v in props.items() if isinstance(v, str)})
+            key = (normalize(name), kind)
+            if key in seen:
+                continue
+            seen.add(key)
+            writer.writerow([name, round(props['lat'], 6), round(props['lon'], 6), kind])
+            written += 1
+    return written
+
+
+if __name__ == '__main__':
+    # Uso: python -m src.gazetteer extrato.geojsonseq data/gazetteer_sp.csv
+    #      python -m src.gazetteer --overpass data/gazetteer_sp.csv
+    if len(sys.argv) != 3:
+        print("Uso: python -m src.gazetteer <extrato.geojsonseq | --overpass> <saida.csv>")
+        sys.exit(1)
+    if sys.argv[1] == '--overpass':
+        n = overpass_to_csv(sys.argv[2])
+    else:
+        n = geojsonseq_to_csv(sys.argv[1], sys.argv[2])
+    print(f"{n} entradas gravadas em {sys.argv[2]}")
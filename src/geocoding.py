@@ -0,0 +1,255 @@
+# src/geocoding.py - geocodificação em lote de inventários OOH (fila com token bucket, cache e checkpoint)
+"""
+Uso:
+    python -m src.geocoding inventario.csv inventario_geo.csv --coluna endereco
+
+- Respeita a política de uso do Nominatim público (1 requisição/s, user-agent
+  identificado, resultados em cache). Para um Nominatim local, use
+  `--domain localhost:8080 --scheme http --rate 20`.
+- O cache SQLite é persistente e compartilhado entre execuções/arquivos.
+- O progresso é salvo a cada `--checkpoint` linhas; rodar o mesmo comando de
+  novo retoma de onde parou.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+
+from src.gazetteer import Gazetteer, normalize
+
+NOMINATIM_RATE = 1.0  # requisições por segundo (política do Nominatim público)
+DEFAULT_CACHE_PATH = "data/geocode_cache.sqlite"
+
+Coords = Optional[Tuple[float, float]]
+
+
+class TokenBucket:
+    """Limitador de taxa: `acquire()` bloqueia até haver uma ficha disponível."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class GeocodeCache:
+    """Cache persistente (SQLite) endereço normalizado -> coordenadas; misses também são guardados."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode (key TEXT PRIMARY KEY, lat REAL, lon REAL, provider TEXT, ts REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, address: str):
+        """Retorna (encontrado_no_cache, coords)."""
+        row = self._conn.execute("SELECT lat, lon FROM geocode WHERE key = ?", (normalize(address),)).fetchone()
+        if row is None:
+            return False, None
+        return True, (None if row[0] is None else (row[0], row[1]))
+
+    def put(self, address: str, coords: Coords, provider: str):
+        lat, lon = coords if coords else (None, None)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)",
+            (normalize(address), lat, lon, provider, time.time()),
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def nominatim_geocoder(user_agent: str = "ooh_analysis_app", domain: Optional[str] = None,
+                       scheme: str = "https", timeout: int = 10) -> Callable[[str], Coords]:
+    """Cria a função de geocodificação (Nominatim público ou instância local via `domain`)."""
+    from geopy.geocoders import Nominatim
+
+    kwargs = {'user_agent': user_agent, 'timeout': timeout, 'scheme': scheme}
+    if domain:
+        kwargs['domain'] = domain
+    geolocator = Nominatim(**kwargs)
+
+    def geocode(address: str) -> Coords:
+        location = geolocator.geocode(address, country_codes='br')
+        return (location.latitude, location.longitude) if location else None
+
+    return geocode
+
+
+class BulkGeocoder:
+    """
+    Geocodifica um CSV linha a linha, na ordem:
+    cache persistente -> gazetteer local (opcional) -> geocodificador externo (via token bucket).
+    """
+
+    def __init__(self, geocode_fn: Callable[[str], Coords], cache: GeocodeCache,
+                 rate: float = NOMINATIM_RATE, gazetteer: Optional[Gazetteer] = None,
+                 provider: str = "nominatim", max_retries: int = 3):
+        self.geocode_fn = geocode_fn
+        self.cache = cache
+        self.bucket = TokenBucket(rate)
+        self.gazetteer = gazetteer
+        self.provider = provider
+        self.max_retries = max_retries
+        self.stats = {'rows': 0, 'cache_hits': 0, 'gazetteer_hits': 0, 'requests': 0, 'found': 0, 'errors': 0}
+
+    def geocode(self, address: str) -> Coords:
+        """Geocodifica um endereço usando cache/gazetteer antes de consumir a cota do serviço."""
+        if not isinstance(address, str) or not address.strip():
+            return None
+        hit, coords = self.cache.get(address)
+        if hit:
+            self.stats['cache_hits'] += 1
+            return coords
+
+        if self.gazetteer is not None:
+            match = self.gazetteer.resolve(address)
+            if match:
+                self.stats['gazetteer_hits'] += 1
+                coords = (match['lat'], match['lon'])
+                self.cache.put(address, coords, 'gazetteer')
+                return coords
+
+        for attempt in range(self.max_retries):
+            self.bucket.acquire()
+            self.stats['requests'] += 1
+            try:
+                coords = self.geocode_fn(address)
+                break
+            except Exception as e:
+                print(f"[Geocoding] Erro ({attempt + 1}/{self.max_retries}) em '{address}': {e}")
+                time.sleep(2 ** attempt)
+        else:
+            # Falha de rede não entra no cache: a próxima execução tenta de novo
+            self.stats['errors'] += 1
+            return None
+
+        self.cache.put(address, coords, self.provider)
+        return coords
+
+    def run(self, input_csv: str, output_csv: str, address_col: str = 'endereco',
+            checkpoint_every: int = 100) -> dict:
+        """
+        Processa `input_csv` em blocos de `checkpoint_every` linhas, gravando
+        `output_csv` (colunas originais + lat, lon, geocode_ok) e um checkpoint
+        `<output_csv>.ckpt` após cada bloco. Retoma automaticamente.
+        """
+        ckpt_path = output_csv + '.ckpt'
+        done, offset = 0, 0
+        if os.path.exists(ckpt_path) and os.path.exists(output_csv):
+            with open(ckpt_path) as fh:
+                ckpt = json.load(fh)
+            done, offset = ckpt['rows_done'], ckpt['output_bytes']
+            # Descarta linhas gravadas depois do último checkpoint (interrupção no meio do bloco)
+            with open(output_csv, 'r+b') as fh:
+                fh.truncate(offset)
+            print(f"[Geocoding] Retomando a partir da linha {done:,}")
+        elif os.path.exists(output_csv):
+            os.remove(output_csv)  # sem checkpoint: saída antiga não é continuação desta execução
+
+        t0 = time.monotonic()
+        # Pula registros já processados contando linhas do DataFrame, não do arquivo:
+        # campos entre aspas podem ocupar várias linhas físicas
+        skip = done
+        reader = pd.read_csv(input_csv, chunksize=checkpoint_every, dtype=str)
+        for chunk in reader:
+            if skip:
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    continue
+                chunk, skip = chunk.iloc[skip:].copy(), 0
+            coords = [self.geocode(addr) for addr in chunk[address_col]]
+            chunk['lat'] = [c[0] if c else None for c in coords]
+            chunk['lon'] = [c[1] if c else None for c in coords]
+            chunk['geocode_ok'] = [c is not None for c in coords]
+
+            chunk.to_csv(output_csv, mode='a', header=(offset == 0), index=False)
+            done += len(chunk)
+            offset = os.path.getsize(output_csv)
+            self.stats['rows'] += len(chunk)
+            self.stats['found'] += int(chunk['geocode_ok'].sum())
+
+            tmp = ckpt_path + '.tmp'
+            with open(tmp, 'w') as fh:
+                json.dump({'input': input_csv, 'rows_done': done, 'output_bytes': offset}, fh)
+            os.replace(tmp, ckpt_path)
+            self._report(done, time.monotonic() - t0)
+
+        return self.summary(time.monotonic() - t0)
+
+    def summary(self, elapsed: float) -> dict:
+        """Vazão (linhas/s) e taxa de acerto do cache da execução atual."""
+        rows = self.stats['rows']
+        lookups = rows or 1
+        return {
+            **self.stats,
+            'elapsed_s': round(elapsed, 1),
+            'rows_per_s': round(rows / elapsed, 2) if elapsed > 0 else 0.0,
+            'cache_hit_rate': round(self.stats['cache_hits'] / lookups, 3),
+        }
+
+    def _report(self, done: int, elapsed: float):
+        s = self.summary(elapsed)
+        print(
+            f"[Geocoding] {done:,} linhas | {s['rows_per_s']} linhas/s | "
+            f"cache {s['cache_hit_rate']:.1%} | gazetteer {s['gazetteer_hits']} | "
+            f"requisições {s['requests']} | erros {s['errors']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input_csv')
+    parser.add_argument('output_csv')
+    parser.add_argument('--coluna', default='endereco', help='coluna com o endereço')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH)
+    parser.add_argument('--gazetteer', default=None, help='CSV do gazetteer local (consultado antes do serviço)')
+    parser.add_argument('--rate', type=float, default=NOMINATIM_RATE, help='requisições por segundo')
+    parser.add_argument('--domain', default=None, help='host de um Nominatim próprio (ex.: localhost:8080)')
+    parser.add_argument('--scheme', default='https')
+    parser.add_argument('--user-agent', default='ooh_analysis_app')
+    parser.add_argument('--checkpoint', type=int, default=100, help='linhas por checkpoint')
+    args = parser.parse_args()
+
+    if args.domain is None and args.rate > NOMINATIM_RATE:
+        parser.error("O Nominatim público permite no máximo 1 requisição/s; use --domain para um servidor próprio.")
+
+    cache = GeocodeCache(args.cache)
+    geocoder = BulkGeocoder(
+        nominatim_geocoder(args.user_agent, args.domain, args.scheme),
+        cache,
+        rate=args.rate,
+        gazetteer=Gazetteer.from_csv(args.gazetteer) if args.gazetteer else None,
+        provider=args.domain or 'nominatim',
+    )
+    try:
+        summary = geocoder.run(args.input_csv, args.output_csv, args.coluna, args.checkpoint)
+    finally:
+        cache.close()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# src/gtfs.py - partidas de ônibus por parada, hora e tipo de dia a partir do GTFS da SPTrans
+"""
+Importa o feed GTFS (zip local baixado do portal de desenvolvedores da SPTrans)
+e reduz `stop_times.txt` (milhões de linhas) a uma matriz compacta:
+
+    counts[parada, tipo de dia, hora] = nº de partidas (uint32)
+
+com tipo de dia em `DAY_TYPES` (útil, sábado, domingo, a partir do
+`calendar.txt`). O `stop_times.txt` é lido em blocos pelo leitor CSV
+incremental do pyarrow, só com as colunas trip_id, departure_time e stop_id;
+cada bloco é convertido em índices inteiros e somado com `bincount`, sem
+manter as linhas em memória.
+
+O resultado fica num cache em disco (`<sha256 do zip>.npz`) e alimenta:
+- o perfil horário/diário da página de Mobilidade (`StopDepartures.profile`);
+- a coluna `avg_bus_count` de `compute_score`, somando as partidas das
+  paradas a até `NEAR_RADIUS_M` de cada ponto candidato (`add_bus_counts`).
+  Esta parte é só de biblioteca: nenhuma página pontua pontos candidatos
+  (`compute_score` também precisa de `pop_500m` e `pib_percapita`, que o app
+  não carrega); quem pontua em lote chama `add_bus_counts` antes do score.
+
+Uso:
+    python -m src.gtfs data/gtfs_sptrans.zip
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data import DATA_DIR
+from src.exports import file_version
+from src.proximity import pairs_within
+
+GTFS_PATH = os.path.join(DATA_DIR, "gtfs_sptrans.zip")
+GTFS_DIR = os.path.join(tempfile.gettempdir(), "ooh_gtfs")
+DAY_TYPES = ('util', 'sabado', 'domingo')
+DAY_COLUMNS = (('monday', 'tuesday', 'wednesday', 'thursday', 'friday'), ('saturday',), ('sunday',))
+BLOCK_BYTES = 16 << 20  # 16 MB de CSV por bloco
+NEAR_RADIUS_M = 300
+
+
+# -------------------------------
+# PARTIDAS POR PARADA
+# -------------------------------
+class StopDepartures:
+    """Partidas por parada x tipo de dia x hora (0-23), com as coordenadas das paradas."""
+
+    def __init__(self, stop_ids: np.ndarray, lats: np.ndarray, lons: np.ndarray, counts: np.ndarray):
+        self.stop_ids = np.asarray(stop_ids)
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.counts = np.asarray(counts, dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.stop_ids)
+
+    def profile(self, day_type: str = 'util') -> np.ndarray:
+        """Partidas na cidade inteira por hora (24 posições) num dia do tipo `day_type`."""
+        return self.counts[:, DAY_TYPES.index(day_type), :].sum(axis=0, dtype=np.int64)
+
+    def daily_totals(self) -> dict:
+        """Partidas num dia típico de cada tipo."""
+        totals = self.counts.sum(axis=(0, 2), dtype=np.int64)
+        return {d: int(t) for d, t in zip(DAY_TYPES, totals)}
+
+    def near(self, lats, lons, radius_m: float = NEAR_RADIUS_M) -> np.ndarray:
+        """Soma das partidas das paradas a até `radius_m` de cada ponto: array (pontos, tipos de dia, 24)."""
+        i, j = pairs_within(lats, lons, self.lats, self.lons, radius_m)
+        out = np.zeros((len(np.atleast_1d(lats)), len(DAY_TYPES), 24), dtype=np.int64)
+        if len(i):
+            order = np.argsort(i, kind='stable')
+            i, j = i[order], j[order]
+            starts = np.flatnonzero(np.r_[True, i[1:] != i[:-1]])
+            out[i[starts]] = np.add.reduceat(self.counts[j].astype(np.int64), starts, axis=0)
+        return out
+
+    def save(self, path: str) -> None:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            np.savez(fh, stop_ids=self.stop_ids.astype(str), lats=self.lats, lons=self.lons, counts=self.counts)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'StopDepartures':
+        with np.load(path) as z:
+            return cls(z['stop_ids'], z['lats'], z['lons'], z['counts'])
+
+
+def _read_small(zf: zipfile.ZipFile, name: str, usecols) -> pd.DataFrame:
+    with zf.open(name) as fh:
+        return pd.read_csv(fh, usecols=usecols, dtype=str, encoding='utf-8-sig')
+
+
+def _service_masks(zf: zipfile.ZipFile) -> pd.Series:
+    """service_id -> bits dos tipos de dia em que o serviço roda (bit k = DAY_TYPES[k])."""
+    cols = [c for group in DAY_COLUMNS for c in group]
+    cal = _read_small(zf, 'calendar.txt', ['service_id'] + cols)
+    mask = np.zeros(len(cal), dtype=np.uint8)
+    for k, group in enumerate(DAY_COLUMNS):
+        runs = (cal[list(group)].astype(int) > 0).any(axis=1).to_numpy()
+        mask |= runs.astype(np.uint8) << k
+    return pd.Series(mask, index=cal['service_id'])
+
+
+def read_feed(zip_path: str, block_bytes: int = BLOCK_BYTES) -> StopDepartures:
+    """Lê o zip GTFS e conta as partidas de `stop_times.txt` bloco a bloco."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+
+    with zipfile.ZipFile(zip_path) as zf:
+        stops = _read_small(zf, 'stops.txt', ['stop_id', 'stop_lat', 'stop_lon'])
+        trips = _read_small(zf, 'trips.txt', ['trip_id', 'service_id'])
+        service_mask = _service_masks(zf)
+
+        trip_mask = trips['service_id'].map(service_mask).fillna(0).to_numpy(dtype=np.uint8)
+        trip_ids = pa.array(trips['trip_id'].to_numpy(), type=pa.string())
+        stop_ids = pa.array(stops['stop_id'].to_numpy(), type=pa.string())
+        counts = np.zeros((len(stops), len(DAY_TYPES), 24), dtype=np.int64)
+        cells = counts.size
+
+        reader = pacsv.open_csv(
+            io.BufferedReader(zf.open('stop_times.txt'), buffer_size=block_bytes),
+            read_options=pacsv.ReadOptions(block_size=block_bytes, encoding='utf-8-sig'),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=['trip_id', 'departure_time', 'stop_id'],
+                column_types={c: pa.string() for c in ('trip_id', 'departure_time', 'stop_id')},
+                strings_can_be_null=True,
+            ),
+        )
+        for batch in reader:
+            trip_idx = pc.index_in(batch.column('trip_id'), value_set=trip_ids)
+            stop_idx = pc.index_in(batch.column('stop_id'), value_set=stop_ids)
+            # 'HH:MM:SS', com HH >= 24 para viagens que passam da meia-noite
+            hour = pc.cast(pc.list_element(pc.split_pattern(batch.column('departure_time'), ':'), 0), pa.int32())
+            ok = pc.and_(pc.and_(pc.is_valid(trip_idx), pc.is_valid(stop_idx)), pc.is_valid(hour))
+
+            t = pc.filter(trip_idx, ok).to_numpy().astype(np.int64)
+            s = pc.filter(stop_idx, ok).to_numpy().astype(np.int64)
+            h = pc.filter(hour, ok).to_numpy().astype(np.int64) % 24
+            masks = trip_mask[t]
+            for k in range(len(DAY_TYPES)):
+                runs = (masks >> k) & 1 == 1
+                flat = (s[runs] * len(DAY_TYPES) + k) * 24 + h[runs]
+                counts += np.bincount(flat, minlength=cells).reshape(counts.shape)
+
+    return StopDepartures(
+        stops['stop_id'].to_numpy(),
+        pd.to_numeric(stops['stop_lat']).to_numpy(),
+        pd.to_numeric(stops['stop_lon']).to_numpy(),
+        counts,
+    )
+
+
+def load_departures(zip_path: str = GTFS_PATH, cache_dir: str = GTFS_DIR) -> Optional[StopDepartures]:
+    """Partidas do feed em `zip_path` (importado só na primeira vez por versão do zip); None sem feed."""
+    if not os.path.exists(zip_path):
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{file_version(zip_path)}.npz")
+    if os.path.exists(path):
+        return StopDepartures.load(path)
+    departures = read_feed(zip_path)
+    departures.save(path)
+    return departures
+
+
+def add_bus_counts(df: pd.DataFrame, departures: StopDepartures, radius_m: float = NEAR_RADIUS_M,
+                   lat_col: str = 'lat', lon_col: str = 'lon') -> pd.DataFrame:
+    """
+    Acrescenta `avg_bus_count` (partidas por hora, média de um dia útil, das
+    paradas a até `radius_m`) e `bus_peak_count` (partidas na hora mais cheia).
+    """
+    near = departures.near(df[lat_col].to_numpy(), df[lon_col].to_numpy(), radius_m)
+    util = near[:, DAY_TYPES.index('util'), :]
+    out = df.copy()
+    out['avg_bus_count'] = util.sum(axis=1) / 24.0
+    out['bus_peak_count'] = util.max(axis=1)
+    return out
+
+
+if __name__ == '__main__':
+    zip_path = sys.argv[1] if len(sys.argv) > 1 else GTFS_PATH
+    t0 = time.perf_counter()
+    departures = read_feed(zip_path)
+    os.makedirs(GTFS_DIR, exist_ok=True)
+    out = os.path.join(GTFS_DIR, f"{file_version(zip_path)}.npz")
+    departures.save(out)
+    print(f"{len(departures)} paradas, partidas por dia: {departures.daily_totals()} "
+          f"({time.perf_counter() - t0:.1f}s) -> {out}")
@@ -0,0 +1,65 @@
+# src/heatmap.py - HeatMap pré-agregado no servidor (grade ponderada dependente de zoom/bounds)
+import math
+from typing import Optional
+
+import numpy as np
+
+from src.clustering import TILE_EXTENT, _project, _unproject
+
+MAX_HEAT_CELLS = 2000  # teto de células enviadas ao navegador
+HEAT_CELL_PX = 12      # tamanho alvo da célula na tela, em pixels
+
+
+def bin_heatmap(
+    lats,
+    lons,
+    weights=None,
+    bounds: Optional[dict] = None,
+    zoom: float = 13,
+    cell_px: int = HEAT_CELL_PX,
+    max_cells: int = MAX_HEAT_CELLS,
+) -> np.ndarray:
+    """
+    Agrupa pontos numa grade Web Mercator e devolve no máximo `max_cells` células.
+
+    - A célula tem ~`cell_px` pixels no zoom atual; se houver mais células
+      ocupadas que `max_cells`, a grade é engrossada (2x) até caber.
+    - bounds: dict do Leaflet ('_southWest'/'_northEast'); pontos fora dele
+      (com uma célula de margem) são descartados.
+    - weights: população, score etc.; None conta pontos.
+    Retorna array (n, 3) com [lat, lon, peso normalizado em 0-1], pronto para `HeatMap`.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    w = np.ones(len(lats)) if weights is None else np.nan_to_num(np.asarray(weights, dtype=float))
+    valid = np.isfinite(lats) & np.isfinite(lons) & (w > 0)
+    lats, lons, w = lats[valid], lons[valid], w[valid]
+
+    x, y = _project(lats, lons)
+    cell = cell_px / (TILE_EXTENT * 2 ** zoom)
+
+    if bounds:
+        (x0, x1), (y1, y0) = _project(
+            np.array([bounds['_southWest']['lat'], bounds['_northEast']['lat']]),
+            np.array([bounds['_southWest']['lng'], bounds['_northEast']['lng']]),
+        )
+        inside = (x >= x0 - cell) & (x <= x1 + cell) & (y >= y0 - cell) & (y <= y1 + cell)
+        x, y, w = x[inside], y[inside], w[inside]
+
+    if len(w) == 0:
+        return np.empty((0, 3))
+
+    while True:
+        ix = np.floor(x / cell).astype(np.int64)
+        iy = np.floor(y / cell).astype(np.int64)
+        _, inverse = np.unique((ix << 32) | iy, return_inverse=True)
+        n_cells = inverse.max() + 1
+        if n_cells <= max_cells:
+            break
+        cell *= 2 ** math.ceil(math.log(n_cells / max_cells, 4))
+
+    total = np.bincount(inverse, weights=w)
+    cx = np.bincount(inverse, weights=x * w) / total
+    cy = np.bincount(inverse, weights=y * w) / total
+    cell_lats, cell_lons = _unproject(cx, cy)
+    return np.column_stack([cell_lats, cell_lons, total / total.max()])
@@ -0,0 +1,112 @@
+# src/maplayers.py - camadas GeoJSON vetorizadas para o Folium (sem iterrows por marcador)
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import folium
+
+TYPE_COLUMNS = ('highway', 'advertising')
+ADVERTISING_TYPES = ['billboard', 'poster_box', 'column']
+
+
+def _features(lats, lons, props: pd.DataFrame) -> List[dict]:
+    """Monta a lista de Features Point a partir de arrays já prontos."""
+    records = props.to_dict('records')
+    return [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon, lat]}, 'properties': p}
+        for lat, lon, p in zip(lats.tolist(), lons.tolist(), records)
+    ]
+
+
+def poi_feature_collections(
+    df: pd.DataFrame,
+    selected_types: Optional[Iterable[str]] = None,
+    type_columns: Iterable[str] = TYPE_COLUMNS,
+) -> Dict[str, dict]:
+    """
+    Converte POIs (colunas lat/lon + tags) em um FeatureCollection por tipo de POI.
+    Cor, rótulo e popup são calculados por coluna e gravados nas properties,
+    então o estilo no mapa é lido das próprias features.
+    """
+    df = df[df['lat'].notna() & df['lon'].notna()]
+    selected = set(selected_types) if selected_types is not None else None
+
+    # Tipo do POI: primeira coluna de tag (na ordem de type_columns) com valor selecionado
+    poi_type = pd.Series(None, index=df.index, dtype=object)
+    for col in reversed(list(type_columns)):
+        if col in df.columns:
+            values = df[col]
+            ok = values.notna() if selected is None else values.isin(selected)
+            poi_type = poi_type.where(~ok, values)
+    keep = poi_type.notna()
+    df, poi_type = df[keep], poi_type[keep].astype(str)
+
+    highway = df['highway'] if 'highway' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    advertising = df['advertising'] if 'advertising' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    color = np.select(
+        [highway.eq('bus_stop').to_numpy(), advertising.isin(ADVERTISING_TYPES).to_numpy()],
+        ['green', 'red'],
+        default='blue',
+    )
+    label = poi_type.str.replace('_', ' ').str.title()
+    name = df['name'].fillna('N/A').astype(str) if 'name' in df.columns else pd.Series('N/A', index=df.index)
+
+    props = pd.DataFrame({
+        'poi_type': poi_type,
+        'color': color,
+        'popup': '<b>' + label + '</b><br>Nome: ' + name,
+    }, index=df.index)
+
+    lats, lons = df['lat'].to_numpy(dtype=float), df['lon'].to_numpy(dtype=float)
+    collections = {}
+    for t, idx in props.groupby('poi_type', sort=True).indices.items():
+        collections[t] = {
+            'type': 'FeatureCollection',
+            'features': _features(lats[idx], lons[idx], props.iloc[idx]),
+        }
+    return collections
+
+
+def cluster_feature_collection(clusters: pd.DataFrame) -> dict:
+    """Converte o resultado de `GridClusterer.get_clusters` (count > 1) em FeatureCollection."""
+    clusters = clusters[clusters['count'] > 1]
+    count = clusters['count'].to_numpy()
+    props = pd.DataFrame({
+        'count': count,
+        'radius': 10 + np.minimum(np.floor(np.log10(count)) * 4, 12),
+        'label': pd.Series(count).map('{:,} POIs'.format).to_numpy(),
+    })
+    return {
+        'type': 'FeatureCollection',
+        'features': _features(clusters['lat'].to_numpy(), clusters['lon'].to_numpy(), props),
+    }
+
+
+def poi_layer_groups(collections: Dict[str, dict], show: bool = True) -> List[folium.FeatureGroup]:
+    """Um `FeatureGroup` com um único `folium.GeoJson` por tipo de POI (estilo e popup vindos das properties)."""
+    groups = []
+    for poi_type, fc in collections.items():
+        if not fc['features']:
+            continue
+        group = folium.FeatureGroup(name=poi_type.replace('_', ' ').title(), show=show)
+        folium.GeoJson(
+            fc,
+            marker=folium.CircleMarker(radius=5, fill=True, fill_opacity=0.8, weight=2),
+            style_function=lambda f: {'color': f['properties']['color'], 'fillColor': f['properties']['color']},
+            popup=folium.GeoJsonPopup(fields=['popup'], labels=False, max_width=300),
+        ).add_to(group)
+        groups.append(group)
+    return groups
+
+
+def cluster_layer_group(fc: dict, name: str = 'Clusters') -> folium.FeatureGroup:
+    """Clusters como um único GeoJson (raio proporcional ao log da contagem)."""
+    group = folium.FeatureGroup(name=name)
+    if fc['features']:
+        folium.GeoJson(
+            fc,
+            marker=folium.CircleMarker(fill=True, fill_opacity=0.75, weight=1),
+            style_function=lambda f: {'radius': f['properties']['radius'], 'color': '#1E90FF', 'fillColor': '#1E90FF'},
+            tooltip=folium.GeoJsonTooltip(fields=['label'], labels=False),
+        ).add_to(group)
+    return group
@@ -0,0 +1,81 @@
+# src/projection.py - superfície de projeção sazonal pré-calculada (12 meses x % de aumento)
+"""
+A projeção do simulador é linear no investimento:
+
+    novo_investimento = investimento_base[mês] * (1 + aumento)
+    novo_reach (MM)   = novo_investimento / CPM_base[mês]
+
+então todas as combinações mês x aumento cabem em duas matrizes 12 x N,
+calculadas uma vez por versão dos dados com broadcasting. Sliders da tela,
+PDF e tabela de sensibilidade só fazem consultas por índice.
+"""
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.data import MES_ORDER
+
+INCREASE_PERCENTS = np.arange(0, 101)  # 0% a 100%, passo de 1 p.p.
+SENSITIVITY_PERCENTS = (10, 25, 50, 75, 100)
+
+
+class ProjectionSurface:
+    """
+    Projeções para todos os meses e aumentos. Meses sem histórico usam a média
+    mensal (mesma regra do relatório original), marcados em `has_history`.
+
+    Atributos (arrays 12 x len(increases), linha = mês em `MES_ORDER`):
+    - investimento, reach: cenário projetado
+    - investimento_base, reach_base, cpm_base: vetores de 12 posições
+    """
+
+    def __init__(self, df_monthly: pd.DataFrame, increases: Sequence[int] = INCREASE_PERCENTS):
+        monthly = df_monthly.assign(Mes=df_monthly['Mes'].astype(str)).set_index('Mes')
+        monthly = monthly.reindex(MES_ORDER)
+        self.has_history = monthly['Total_Investimento'].notna().to_numpy()
+
+        def base(col: str) -> np.ndarray:
+            values = monthly[col].to_numpy(dtype=float)
+            return np.where(self.has_history, values, np.nanmean(values))
+
+        self.investimento_base = base('Total_Investimento')
+        self.cpm_base = base('Media_CPM')
+        self.reach_base = base('Total_Reach')
+
+        self.increases = np.asarray(increases, dtype=int)
+        factor = 1 + self.increases / 100.0
+        self.investimento = self.investimento_base[:, None] * factor[None, :]
+        self.reach = self.investimento / self.cpm_base[:, None]
+
+    def _month(self, mes: str) -> int:
+        return MES_ORDER.index(mes)
+
+    def point(self, mes: str, aumento_percent: float) -> dict:
+        """Cenário histórico x projetado de um mês; aumentos fora da grade são calculados na hora."""
+        m = self._month(mes)
+        hit = np.flatnonzero(self.increases == aumento_percent)
+        if hit.size:
+            investimento, reach = self.investimento[m, hit[0]], self.reach[m, hit[0]]
+        else:
+            investimento = self.investimento_base[m] * (1 + aumento_percent / 100.0)
+            reach = investimento / self.cpm_base[m]
+        return {
+            'mes': mes,
+            'has_history': bool(self.has_history[m]),
+            'cpm_base': float(self.cpm_base[m]),
+            'investimento_base': float(self.investimento_base[m]),
+            'reach_base': float(self.reach_base[m]),
+            'novo_investimento': float(investimento),
+            'novo_reach': float(reach),
+            'incremento_investimento': float(investimento - self.investimento_base[m]),
+            'incremento_reach': float(reach - self.reach_base[m]),
+        }
+
+    def sensitivity_table(self, metric: str = 'reach',
+                          percents: Iterable[int] = SENSITIVITY_PERCENTS) -> pd.DataFrame:
+        """Tabela mês x aumento (%) do `metric` projetado ('reach' ou 'investimento')."""
+        percents = list(percents)
+        cols = [int(np.flatnonzero(self.increases == p)[0]) for p in percents]
+        values = getattr(self, metric)[:, cols]
+        return pd.DataFrame(values, index=pd.Index(MES_ORDER, name='Mes'), columns=[f"+{p}%" for p in percents])
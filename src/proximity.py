@@ -0,0 +1,56 @@
+# src/proximity.py - vizinhança entre conjuntos de pontos em metros (grade + busca binária, sem scipy)
+from typing import Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_000.0
+
+
+def _to_meters(lats: np.ndarray, lons: np.ndarray, lat0: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Projeção equiretangular local (erro desprezível na escala de uma cidade)."""
+    x = np.radians(lons) * EARTH_RADIUS_M * np.cos(np.radians(lat0))
+    y = np.radians(lats) * EARTH_RADIUS_M
+    return x, y
+
+
+def pairs_within(lats_a, lons_a, lats_b, lons_b, radius_m: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pares (i, j) com o ponto i de A a até `radius_m` do ponto j de B.
+    B é distribuído numa grade de células de `radius_m`; cada ponto de A só
+    compara com as 3x3 células vizinhas (busca binária nas chaves ordenadas).
+    """
+    lats_a, lons_a = np.asarray(lats_a, dtype=float), np.asarray(lons_a, dtype=float)
+    lats_b, lons_b = np.asarray(lats_b, dtype=float), np.asarray(lons_b, dtype=float)
+    if not len(lats_a) or not len(lats_b):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    lat0 = float(np.mean(lats_b))
+    xa, ya = _to_meters(lats_a, lons_a, lat0)
+    xb, yb = _to_meters(lats_b, lons_b, lat0)
+    x_min, y_min = min(xa.min(), xb.min()), min(ya.min(), yb.min())
+    cxa, cya = ((xa - x_min) // radius_m).astype(np.int64), ((ya - y_min) // radius_m).astype(np.int64)
+    cxb, cyb = ((xb - x_min) // radius_m).astype(np.int64), ((yb - y_min) // radius_m).astype(np.int64)
+    n_rows = int(max(cya.max(), cyb.max())) + 3
+
+    key_b = (cxb + 1) * n_rows + (cyb + 1)
+    order = np.argsort(key_b, kind='stable')
+    sorted_keys = key_b[order]
+
+    left, right = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            key = (cxa + 1 + dx) * n_rows + (cya + 1 + dy)
+            start = np.searchsorted(sorted_keys, key, side='left')
+            stop = np.searchsorted(sorted_keys, key, side='right')
+            sizes = stop - start
+            if not sizes.any():
+                continue
+            i = np.repeat(np.arange(len(key)), sizes)
+            offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            j = order[np.repeat(start, sizes) + offsets]
+            close = (xa[i] - xb[j]) ** 2 + (ya[i] - yb[j]) ** 2 <= radius_m ** 2
+            left.append(i[close])
+            right.append(j[close])
+    if not left:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(left), np.concatenate(right)
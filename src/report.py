@@ -0,0 +1,579 @@
+# src/report.py - relatório executivo em PDF (usado pela página 8 e em lote via CLI)
+"""
+Uso em lote:
+    python -m src.report --meses Nov Dez --aumentos 10 25 50 --workers 4 --saida relatorios/
+    python -m src.report --dados campanhas.csv --por Tipo_Midia --meses Dez --aumentos 25
+
+Cada combinação (grupo x mês da projeção x aumento) gera um PDF num pool de
+processos. Os agregados de cada grupo (`df_monthly`, `df_media`) são calculados
+uma vez no processo principal e entregues a cada worker uma única vez
+(initializer), em vez de serem refeitos a cada relatório.
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.charts import render_many
+from src.cube import CUBES, AggregateCube
+from src.data import MES_ORDER, generate_report_data
+from src.projection import SENSITIVITY_PERCENTS, ProjectionSurface
+
+if TYPE_CHECKING:  # fpdf e plotly só são importados ao gerar um PDF (página 8 abre sem eles)
+    import plotly.graph_objects as go
+    from fpdf import FPDF
+
+# Anexo com todas as campanhas: (coluna, cabeçalho, largura em caracteres, formato numérico ou None p/ texto)
+APPENDIX_COLUMNS = [
+    ('ID_Campanha', 'ID', 12, None),
+    ('Mes', 'Mês', 6, None),
+    ('Tipo_Midia', 'Mídia', 10, None),
+    ('Investimento_Mil_R$', 'Invest.(K)', 12, '%.1f'),
+    ('Reach_Milhoes', 'Reach(MM)', 11, '%.1f'),
+    ('Frequencia', 'Freq.', 7, '%.1f'),
+    ('CPM_R$', 'CPM', 8, '%.2f'),
+    ('Audiencia_Pico_K', 'Audiência(K)', 14, '%d'),
+]
+APPENDIX_FONT_SIZE = 7
+APPENDIX_ROW_H = 4.0     # mm
+APPENDIX_HEADER_H = 6.0  # mm
+CHART_W_MM = 170
+
+
+def compute_aggregates(df: pd.DataFrame, cube: Optional[AggregateCube] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Agregados do relatório, calculados uma vez por conjunto de dados e
+    reaproveitados entre relatórios (meses/aumentos diferentes):
+    - df: cópia com 'Mes' categórico ordenado
+    - df_monthly / df_media: investimento, CPM, reach e frequência por mês / tipo de mídia,
+      lidos do cubo mês x tipo de mídia (`cube`, ou montado a partir de `df`)
+    - projection: `ProjectionSurface` com todos os meses x aumentos
+    """
+    df = df.copy()
+    df['Mes'] = pd.Categorical(df['Mes'], categories=MES_ORDER, ordered=True)
+    if cube is None:
+        cube = AggregateCube.from_frame(df, *CUBES['campanhas_relatorio'])
+
+    # Agregação Mensal Completa
+    df_monthly = cube.agg(
+        by='Mes',
+        Total_Investimento=('Investimento_Mil_R$', 'sum'),
+        Media_CPM=('CPM_R$', 'mean'),
+        Total_Reach=('Reach_Milhoes', 'sum'),
+        Media_Frequencia=('Frequencia', 'mean')
+    )
+
+    df_monthly['Media_Frequencia'] = df_monthly['Media_Frequencia'].round(1)
+    df_monthly['Media_CPM'] = df_monthly['Media_CPM'].round(2)
+    df_monthly['Total_Reach'] = df_monthly['Total_Reach'].round(1)
+    df_monthly['Total_Investimento'] = df_monthly['Total_Investimento'].round(0)
+
+    # Agregação por Mídia para Detalhe
+    df_media = cube.agg(
+        by='Tipo_Midia',
+        Media_CPM=('CPM_R$', 'mean'),
+        Total_Reach=('Reach_Milhoes', 'sum'),
+        Total_Investimento=('Investimento_Mil_R$', 'sum'),
+        Media_Frequencia=('Frequencia', 'mean')
+    )
+    df_media['Media_Frequencia'] = df_media['Media_Frequencia'].round(1)
+    df_media['Media_CPM'] = df_media['Media_CPM'].round(2)
+    df_media['Total_Reach'] = df_media['Total_Reach'].round(1)
+    df_media['Total_Investimento'] = df_media['Total_Investimento'].round(0)
+
+    return {'df': df, 'df_monthly': df_monthly, 'df_media': df_media, 'projection': ProjectionSurface(df_monthly)}
+
+
+def _media_value(df_media: pd.DataFrame, tipo: str, col: str) -> float:
+    """Indicador de um tipo de mídia; usa a média geral se o tipo não existir no recorte."""
+    values = df_media.loc[df_media['Tipo_Midia'] == tipo, col]
+    return values.iloc[0] if not values.empty else df_media[col].mean()
+
+
+def _format_rows(batch: pd.DataFrame) -> np.ndarray:
+    """
+    Formata um bloco de linhas do anexo de uma vez, coluna a coluna (numpy), em
+    linhas de largura fixa: cada linha vira um único comando de texto no PDF.
+    """
+    lines = None
+    for col, _, width, fmt in APPENDIX_COLUMNS:
+        values = batch[col].to_numpy()
+        if fmt is None:
+            cells = np.char.ljust(values.astype(str).astype(f'U{width - 2}'), width - 1)
+            cells = np.char.add(' ', cells)
+        else:
+            cells = np.char.add(np.char.rjust(np.char.mod(fmt, values), width - 1), ' ')
+        lines = cells if lines is None else np.char.add(lines, cells)
+    return lines
+
+
+def write_appendix(pdf: "FPDF", df: pd.DataFrame, title: str = "Anexo: Todas as Campanhas"):
+    """
+    Tabela com todas as campanhas (ordenadas por investimento), com cabeçalho
+    repetido em cada página. Usa fonte monoespaçada: o alinhamento sai do
+    preenchimento das strings e cada linha é um único `pdf.text`, em vez de
+    uma chamada `pdf.cell` por campo. Só o bloco da página atual é formatado
+    por vez.
+    """
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(200, 10, f"{title} ({len(df):,} campanhas)", 0, 1, "L")
+    pdf.ln(2)
+
+    pdf.set_font("Courier", "", APPENDIX_FONT_SIZE)
+    char_w = pdf.get_string_width("0")
+    widths = [width * char_w for _, _, width, _ in APPENDIX_COLUMNS]
+    table_w = sum(widths)
+    x0 = pdf.l_margin
+    header_line = ''.join(
+        (' ' + header.center(width - 2) + ' ')[:width] for _, header, width, _ in APPENDIX_COLUMNS
+    )
+    order = np.argsort(-df['Investimento_Mil_R$'].to_numpy(), kind='stable')
+
+    y = pdf.get_y()
+    start = 0
+    while start < len(df):
+        if start > 0:
+            pdf.add_page()
+            y = pdf.t_margin
+        n_rows = int((pdf.h - pdf.b_margin - y - APPENDIX_HEADER_H) // APPENDIX_ROW_H)
+        lines = _format_rows(df.iloc[order[start:start + n_rows]])
+
+        # Cabeçalho repetido
+        pdf.set_fill_color(230, 230, 230)
+        pdf.set_draw_color(0, 0, 0)
+        pdf.rect(x0, y, table_w, APPENDIX_HEADER_H, "DF")
+        pdf.set_font("Courier", "B", APPENDIX_FONT_SIZE)
+        pdf.text(x0, y + APPENDIX_HEADER_H * 0.65, header_line)
+        y_body = y + APPENDIX_HEADER_H
+
+        # Linhas (um comando de texto por linha)
+        pdf.set_font("Courier", "", APPENDIX_FONT_SIZE)
+        for i, line in enumerate(lines.tolist()):
+            pdf.text(x0, y_body + i * APPENDIX_ROW_H + APPENDIX_ROW_H * 0.7, line)
+
+        # Grade: contorno, divisórias de coluna e linhas horizontais claras
+        body_h = len(lines) * APPENDIX_ROW_H
+        pdf.rect(x0, y_body, table_w, body_h)
+        x = x0
+        for w in widths[:-1]:
+            x += w
+            pdf.line(x, y, x, y_body + body_h)
+        pdf.set_draw_color(200, 200, 200)
+        for i in range(1, len(lines)):
+            pdf.line(x0, y_body + i * APPENDIX_ROW_H, x0 + table_w, y_body + i * APPENDIX_ROW_H)
+        pdf.set_draw_color(0, 0, 0)
+
+        start += n_rows
+
+
+def report_figures(df_monthly: pd.DataFrame, df_media: pd.DataFrame, projecao_mes: str,
+                   novo_investimento: float) -> Dict[str, "go.Figure"]:
+    """Figuras do PDF: investimento mensal, CPM por tipo de mídia e projeção do mês alvo."""
+    import plotly.graph_objects as go
+
+    meses = df_monthly['Mes'].astype(str).tolist()
+    layout = dict(template='plotly_white', margin=dict(l=60, r=20, t=60, b=50))
+
+    fig_mensal = go.Figure(go.Bar(x=meses, y=df_monthly['Total_Investimento'], marker_color='#1E90FF'))
+    fig_mensal.update_layout(title='Investimento Agregado por Mês (R$ Mil)', **layout)
+
+    fig_cpm = go.Figure(go.Bar(x=df_media['Tipo_Midia'].astype(str), y=df_media['Media_CPM'], marker_color='#1E90FF'))
+    fig_cpm.update_layout(title='CPM Médio por Tipo de Mídia (R$)', **layout)
+
+    fig_proj = go.Figure([
+        go.Bar(name='Histórico', x=meses, y=df_monthly['Total_Investimento'], marker_color='#9DB9D8'),
+        go.Bar(name=f'Projeção {projecao_mes}', x=[projecao_mes], y=[novo_investimento], marker_color='#FF7F0E'),
+    ])
+    fig_proj.update_layout(title=f'Investimento Projetado para {projecao_mes} (R$ Mil)', barmode='group', **layout)
+
+    return {'mensal': fig_mensal, 'cpm_midia': fig_cpm, 'projecao': fig_proj}
+
+
+def build_pdf_report(
+    df: pd.DataFrame,
+    projecao_mes: str,
+    aumento_investimento_percent: float,
+    aggregates: Optional[Dict[str, pd.DataFrame]] = None,
+    appendix: bool = False,
+    charts: bool = True,
+) -> bytes:
+    """
+    Gera o relatório PDF focado em storytelling, detalhamento e projeção futura
+    baseada na sazonalidade. `aumento_investimento_percent` é decimal (0.25 = 25%).
+    `appendix=True` acrescenta a lista completa de campanhas (ver `write_appendix`).
+    `charts=True` inclui os gráficos (PNG do Kaleido em cache, ver `src.charts`; omitidos sem Kaleido).
+    Não usa Streamlit: erros são propagados para quem chama.
+    """
+    # 1. PRÉ-CÁLCULOS
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    df = aggregates['df']
+    df_monthly = aggregates['df_monthly']
+    df_media = aggregates['df_media']
+
+    # ENCONTRAR MÉTRICAS CHAVE GERAIS
+    melhor_midia_cpm = df_media.loc[df_media['Media_CPM'].idxmin()]
+    total_investimento_geral = df_monthly['Total_Investimento'].sum()
+    maior_investimento_mes = df_monthly.loc[df_monthly['Total_Investimento'].idxmax()]
+
+    # 2. PROJEÇÃO (consulta à superfície pré-calculada)
+    projection = aggregates['projection']
+    ponto = projection.point(projecao_mes, round(aumento_investimento_percent * 100, 6))
+    investimento_base = ponto['investimento_base']
+    reach_base = ponto['reach_base']
+    novo_investimento = ponto['novo_investimento']
+    novo_reach_proj_milhoes = ponto['novo_reach']
+    narrativa_sazonal = f"Performance Histórica de {projecao_mes}" if ponto['has_history'] else "Média Geral"
+
+    # GRÁFICOS (PNG em cache por hash da figura)
+    chart_paths = {}
+    if charts:
+        chart_paths = render_many(report_figures(df_monthly, df_media, projecao_mes, novo_investimento))
+
+    def add_chart(name: str):
+        if name in chart_paths:
+            pdf.image(chart_paths[name], x=(pdf.w - CHART_W_MM) / 2, w=CHART_W_MM)
+            pdf.ln(3)
+
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+
+    # --- CONFIGURAÇÕES BÁSICAS ---
+    pdf.set_auto_page_break(auto=True, margin=15)
+
+    # --- TÍTULO ---
+    pdf.set_font("Arial", "B", 18)
+    pdf.cell(200, 10, "Relatório Executivo de Performance OOH", 0, 1, "C")
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(200, 5, f"Período Analisado: 12 Meses | Projeção para: {projecao_mes} | Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M')}", 0, 1, "C")
+    pdf.ln(10)
+
+    # ------------------------------------------------------------------
+    # --- SEÇÃO 1: RESUMO EXECUTIVO (STORYTELLING) ---
+    # ------------------------------------------------------------------
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(200, 10, "1. Análise Sumária do Período", 0, 1, "L")
+
+    pdf.set_font("Arial", "", 12)
+    pdf.multi_cell(0, 6,
+        f"O período analisado (Total de {len(df)} campanhas) demonstrou um investimento total de "
+        f"R$ {total_investimento_geral:,.0f} mil. O alcance total foi de {df.loc[:, 'Reach_Milhoes'].sum():,.1f} milhões, com um CPM médio de R$ {df.loc[:, 'CPM_R$'].mean():.2f}. "
+        f"O mês com maior investimento foi **{maior_investimento_mes['Mes']}** (R$ {maior_investimento_mes['Total_Investimento']:,.0f} mil)."
+    )
+    pdf.ln(5)
+
+    # ------------------------------------------------------------------
+    # --- SEÇÃO 2: PERFORMANCE CONSOLIDADA POR MÍDIA (NARRATIVA) ---
+    # ------------------------------------------------------------------
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(200, 10, "2. Performance Tática por Tipo de Mídia", 0, 1, "L")
+
+    pdf.set_font("Arial", "", 12)
+
+    cpm_digital = _media_value(df_media, 'Digital', 'Media_CPM')
+    cpm_estatica = _media_value(df_media, 'Estática', 'Media_CPM')
+
+    reach_digital = _media_value(df_media, 'Digital', 'Total_Reach')
+    freq_digital = _media_value(df_media, 'Digital', 'Media_Frequencia')
+
+    narrativa_midia = (
+        f"A mídia **Digital** se estabeleceu como a opção mais eficiente, com um CPM médio de R$ {cpm_digital:.2f} (vs. R$ {cpm_estatica:.2f} da Estática). "
+        f"Esta eficiência resultou em um Reach total de {reach_digital:.1f} milhões, acompanhado por uma alta frequência média ({freq_digital:.1f} exposições). "
+        f"Recomendamos uma alocação prioritária em mídias com o menor custo por resultado para maximizar o alcance por real investido."
+    )
+    pdf.multi_cell(0, 6, narrativa_midia)
+
+    pdf.ln(5)
+
+    # ------------------------------------------------------------------
+    # --- SEÇÃO 3: ANÁLISE REACH vs. FREQUÊNCIA (NOVO DETALHE) ---
+    # ------------------------------------------------------------------
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(200, 10, "3. Análise: O Equilíbrio entre Alcance (Reach) e Frequência", 0, 1, "L")
+
+    pdf.set_font("Arial", "", 12)
+
+    frequencia_geral = df['Frequencia'].mean()
+    if frequencia_geral > 5.5:
+        foco_estrategico = "A estratégia da campanha se inclinou para garantir uma **Frequência** elevada, com média de {frequencia_geral:.1f} exposições por pessoa, otimizando a memorização da mensagem. A manutenção deste nível de frequência requer um investimento constante."
+    else:
+        foco_estrategico = "A estratégia foi balanceada, com maior foco no **Reach** (alcance) e uma frequência média de {frequencia_geral:.1f}. O próximo passo pode ser otimizar campanhas específicas para aumentar a frequência em segmentos-chave."
+
+    pdf.multi_cell(0, 6, foco_estrategico.format(frequencia_geral=frequencia_geral))
+
+    pdf.ln(5)
+
+    # Quebra de página para começar a projeção e detalhamento na próxima folha
+    pdf.add_page()
+
+    # ------------------------------------------------------------------
+    # --- SEÇÃO 4: PROJEÇÃO SAZONAL ---
+    # ------------------------------------------------------------------
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(200, 10, f"4. Projeção Estratégica: Campanha Sazonal {projecao_mes}", 0, 1, "L")
+
+    pdf.set_font("Arial", "", 12)
+    pdf.multi_cell(0, 6,
+        f"Focando no próximo período sazonal de **{projecao_mes}**, que historicamente demonstrou alta demanda (Base de Performance: **{narrativa_sazonal}**), esta projeção simula o potencial de alcance com um aumento de **{aumento_investimento_percent*100:.0f}%** no investimento."
+    )
+    pdf.ln(3)
+
+    # Tabela de Projeção
+    pdf.set_font("Arial", "B", 11)
+    col_widths_proj = [50, 40, 40, 40]
+    headers_proj = ["Métrica", "Cenário Histórico", "Cenário Projetado", "Incremento"]
+
+    for col, width in zip(headers_proj, col_widths_proj):
+        pdf.cell(width, 7, col, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 10)
+
+    # Linha Investimento
+    incremento_investimento = ponto['incremento_investimento']
+    pdf.cell(col_widths_proj[0], 7, "Investimento (R$K)", 1, 0)
+    pdf.cell(col_widths_proj[1], 7, f"R$ {investimento_base:,.0f}", 1, 0, "R")
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(col_widths_proj[2], 7, f"R$ {novo_investimento:,.0f}", 1, 0, "R")
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(col_widths_proj[3], 7, f"R$ {incremento_investimento:,.0f}", 1, 0, "R")
+    pdf.ln()
+
+    # Linha Reach
+    incremento_reach = ponto['incremento_reach']
+    pdf.cell(col_widths_proj[0], 7, "Reach (Milhões)", 1, 0)
+    pdf.cell(col_widths_proj[1], 7, f"{reach_base:.1f}", 1, 0, "R")
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(col_widths_proj[2], 7, f"{novo_reach_proj_milhoes:.1f}", 1, 0, "R")
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(col_widths_proj[3], 7, f"{incremento_reach:.1f}", 1, 0, "R")
+    pdf.ln()
+
+    pdf.ln(4)
+    add_chart('projecao')
+    pdf.ln(4)
+
+    # Sensibilidade: reach projetado (MM) para todos os meses x aumentos
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(200, 8, "Sensibilidade: Reach Projetado (Milhões) por Mês e Aumento de Investimento", 0, 1, "L")
+    sens = projection.sensitivity_table('reach', SENSITIVITY_PERCENTS)
+    col_widths_sens = [25] + [28] * len(sens.columns)
+
+    pdf.set_font("Arial", "B", 9)
+    for col, width in zip(["Mês"] + list(sens.columns), col_widths_sens):
+        pdf.cell(width, 6, col, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 9)
+    for mes, values in zip(sens.index, sens.to_numpy()):
+        destaque = mes == projecao_mes
+        pdf.set_font("Arial", "B" if destaque else "", 9)
+        pdf.cell(col_widths_sens[0], 5, mes, 1, 0)
+        for width, value in zip(col_widths_sens[1:], values):
+            pdf.cell(width, 5, f"{value:.1f}", 1, 0, "R")
+        pdf.ln()
+    pdf.set_font("Arial", "", 9)
+    pdf.ln(6)
+
+    # ------------------------------------------------------------------
+    # --- SEÇÃO 5: PERFORMANCE CONSOLIDADA POR MÍDIA (TABELA) ---
+    # ------------------------------------------------------------------
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(200, 10, "5. Detalhe Consolidado por Tipo de Mídia", 0, 1, "L")
+
+    pdf.set_font("Arial", "B", 10)
+    col_widths_media = [40, 40, 40, 40, 30]
+    headers_media = ["Mídia", "Investimento (R$K)", "Reach (Milhões)", "CPM Médio (R$)", "Freq. Média"]
+
+    for col, width in zip(headers_media, col_widths_media):
+        pdf.cell(width, 7, col, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 10)
+    for _, row in df_media.iterrows():
+        pdf.cell(col_widths_media[0], 7, row['Tipo_Midia'], 1, 0)
+        pdf.cell(col_widths_media[1], 7, f"R$ {row['Total_Investimento']:,.0f}", 1, 0, "R")
+        pdf.cell(col_widths_media[2], 7, f"{row['Total_Reach']:.1f}", 1, 0, "R")
+
+        if row['Media_CPM'] == melhor_midia_cpm['Media_CPM']:
+            pdf.set_font("Arial", "B", 10)
+        pdf.cell(col_widths_media[3], 7, f"R$ {row['Media_CPM']:.2f}", 1, 0, "R")
+        pdf.set_font("Arial", "", 10)
+
+        pdf.cell(col_widths_media[4], 7, f"{row['Media_Frequencia']:.1f}", 1, 0, "R")
+        pdf.ln()
+
+    pdf.ln(4)
+    add_chart('cpm_midia')
+    pdf.ln(2)
+
+    # ------------------------------------------------------------------
+    # --- SEÇÃO 6: TABELA DE PERFORMANCE MENSAL ---
+    # ------------------------------------------------------------------
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(200, 10, "6. Detalhe Completo de Evolução Mensal", 0, 1, "L")
+
+    pdf.set_font("Arial", "B", 9)
+    col_widths = [30, 35, 35, 35, 35]
+    headers = ["Mês", "Investimento (R$K)", "Reach (Milhões)", "CPM Médio (R$)", "Freq. Média"]
+
+    for col, width in zip(headers, col_widths):
+        pdf.cell(width, 7, col, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 9)
+    for _, row in df_monthly.iterrows():
+        pdf.cell(col_widths[0], 7, row['Mes'], 1, 0)
+        pdf.cell(col_widths[1], 7, f"R$ {row['Total_Investimento']:,.0f}", 1, 0, "R")
+        pdf.cell(col_widths[2], 7, f"{row['Total_Reach']:.1f}", 1, 0, "R")
+
+        if row['Media_CPM'] > df_monthly['Media_CPM'].mean() * 1.1:
+            pdf.set_text_color(255, 0, 0) # Alto CPM
+        pdf.cell(col_widths[3], 7, f"R$ {row['Media_CPM']:.2f}", 1, 0, "R")
+        pdf.set_text_color(0, 0, 0)
+
+        pdf.cell(col_widths[4], 7, f"{row['Media_Frequencia']:.1f}", 1, 0, "R")
+        pdf.ln()
+
+    pdf.ln(4)
+    add_chart('mensal')
+
+    # Quebra de página para a última tabela
+    pdf.add_page()
+
+    # ------------------------------------------------------------------
+    # --- SEÇÃO 7: DETALHE COMPLETO DA CAMPANHA (TOP 10) ---
+    # ------------------------------------------------------------------
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(200, 10, "7. Detalhe Tático por Campanha (Top 10 em Investimento)", 0, 1, "L")
+
+    pdf.set_font("Arial", "I", 10)
+    pdf.cell(200, 5, "Análise detalhada das 10 campanhas com maior investimento no período.", 0, 1, "L")
+    pdf.ln(2)
+
+    pdf.set_font("Arial", "B", 7)
+    col_widths_detalhe = [18, 15, 20, 20, 20, 20, 20, 20]
+    headers_detalhe = ["ID", "Mês", "Mídia", "Invest.(K)", "Reach(MM)", "Freq.", "CPM", "Audiência(K)"]
+
+    for col, width in zip(headers_detalhe, col_widths_detalhe):
+        pdf.cell(width, 7, col, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 7)
+    df_detail = df.sort_values(by='Investimento_Mil_R$', ascending=False).head(10)
+
+    for _, row in df_detail.iterrows():
+        pdf.cell(col_widths_detalhe[0], 5, row['ID_Campanha'], 1, 0)
+        pdf.cell(col_widths_detalhe[1], 5, row['Mes'], 1, 0, "C")
+        pdf.cell(col_widths_detalhe[2], 5, row['Tipo_Midia'], 1, 0)
+        pdf.cell(col_widths_detalhe[3], 5, f"{row['Investimento_Mil_R$']:.1f}", 1, 0, "R")
+        pdf.cell(col_widths_detalhe[4], 5, f"{row['Reach_Milhoes']:.1f}", 1, 0, "R")
+        pdf.cell(col_widths_detalhe[5], 5, f"{row['Frequencia']:.1f}", 1, 0, "R")
+        pdf.cell(col_widths_detalhe[6], 5, f"{row['CPM_R$']:.2f}", 1, 0, "R")
+        pdf.cell(col_widths_detalhe[7], 5, f"{row['Audiencia_Pico_K']}", 1, 0, "R")
+        pdf.ln()
+
+    if appendix:
+        write_appendix(pdf, df)
+
+    # RETORNO BINÁRIO
+    buffer = io.BytesIO(pdf.output(dest='S'))
+    return buffer.getvalue()
+
+
+# ===============================
+# GERAÇÃO EM LOTE
+# ===============================
+_SHARED: Dict[str, tuple] = {}
+
+
+def _init_worker(shared: Dict[str, tuple]):
+    """Recebe, uma vez por processo, os dados e agregados de cada grupo."""
+    global _SHARED
+    _SHARED = shared
+
+
+def _run_job(grupo: str, projecao_mes: str, aumento_percent: int, out_path: str, appendix: bool) -> dict:
+    t0 = time.perf_counter()
+    df, aggregates = _SHARED[grupo]
+    pdf_bytes = build_pdf_report(df, projecao_mes, aumento_percent / 100.0, aggregates, appendix)
+    with open(out_path, 'wb') as fh:
+        fh.write(pdf_bytes)
+    return {
+        'grupo': grupo, 'mes': projecao_mes, 'aumento_percent': aumento_percent,
+        'arquivo': out_path, 'bytes': len(pdf_bytes), 'segundos': round(time.perf_counter() - t0, 3),
+    }
+
+
+def _slug(text) -> str:
+    return ''.join(c if c.isalnum() else '_' for c in str(text)).strip('_') or 'grupo'
+
+
+def run_batch(df: pd.DataFrame, meses, aumentos, saida: str, por: Optional[str] = None,
+              workers: Optional[int] = None, appendix: bool = False) -> list:
+    """
+    Gera um PDF por (grupo, mês, aumento %) em `saida` usando um pool de processos.
+    `por` divide os dados por uma coluna (cliente, região...). Retorna o tempo de cada relatório.
+    """
+    os.makedirs(saida, exist_ok=True)
+    grupos = {'todos': df} if por is None else {str(k): g for k, g in df.groupby(por)}
+    shared = {nome: (g, compute_aggregates(g)) for nome, g in grupos.items()}
+
+    jobs = [
+        (grupo, mes, aumento, os.path.join(saida, f"relatorio_{_slug(grupo)}_{mes}_{aumento}pct.pdf"), appendix)
+        for grupo, mes, aumento in itertools.product(shared, meses, aumentos)
+    ]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+        futures = [pool.submit(_run_job, *job) for job in jobs]
+        for future in as_completed(futures):
+            r = future.result()
+            results.append(r)
+            print(f"[Relatório] {r['arquivo']} ({r['bytes'] / 1024:.0f} KB) em {r['segundos']:.2f}s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', default=None, help='CSV/Parquet de campanhas (padrão: dados simulados)')
+    parser.add_argument('--por', default=None, help='coluna usada para gerar um relatório por valor')
+    parser.add_argument('--meses', nargs='+', default=['Dez'], choices=MES_ORDER)
+    parser.add_argument('--aumentos', nargs='+', type=int, default=[25], help='aumentos de investimento, em %%')
+    parser.add_argument('--saida', default='relatorios')
+    parser.add_argument('--workers', type=int, default=None, help='processos (padrão: nº de CPUs)')
+    parser.add_argument('--anexo', action='store_true', help='inclui a tabela completa de campanhas')
+    args = parser.parse_args()
+
+    if args.dados is None:
+        df = generate_report_data()
+    elif args.dados.endswith('.parquet'):
+        df = pd.read_parquet(args.dados)
+    else:
+        df = pd.read_csv(args.dados)
+
+    t0 = time.perf_counter()
+    results = run_batch(df, args.meses, args.aumentos, args.saida, args.por, args.workers, args.anexo)
+    total = time.perf_counter() - t0
+
+    with open(os.path.join(args.saida, 'tempos.json'), 'w', encoding='utf-8') as fh:
+        json.dump(results, fh, ensure_ascii=False, indent=2)
+    tempos = [r['segundos'] for r in results]
+    print(
+        f"[Relatório] {len(results)} PDFs em {total:.1f}s | "
+        f"média {np.mean(tempos):.2f}s | máx {np.max(tempos):.2f}s por relatório"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
 import pandas as pd
 
+from src.timing import timed
+
+@timed('score.compute_score')
 def compute_score(df, weights=None):
     """Calcula score 0-100 a partir de colunas: pop_500m, avg_bus_count, pib_percapita."""
     if weights is None:
@@ -0,0 +1,173 @@
+# src/startup.py - tempo de importação por página e pré-carga das bibliotecas pesadas em segundo plano
+"""
+Bibliotecas pesadas (geopandas, folium, plotly.express, fpdf, geopy...) são
+importadas dentro das funções que as usam, como já fazem `src.exports`
+(pyarrow) e `src.geocoding` (geopy). Assim uma página só paga pelo que
+desenha.
+
+O adiamento vale para `src/` e para o `app.py`. As páginas continuam
+importando plotly (3 a 8) e folium/streamlit_folium (1) no topo: toda
+execução dessas páginas desenha o gráfico ou o mapa, então mover a
+importação para dentro do código de desenho não encurtaria nenhuma execução.
+O custo delas aparece no relatório abaixo (folium ~0,35 s na página 1;
+plotly 0,06-0,08 s nas demais) e é o que `warm_up()` antecipa.
+
+`warm_up()` importa `HEAVY_MODULES` numa thread daemon, uma vez por processo.
+O `app.py` a chama depois de desenhar a página inicial, para que a primeira
+troca de página encontre os módulos já em `sys.modules`.
+
+Relatório de importação: cada página roda num interpretador novo com
+`-X importtime` (só as importações de topo do arquivo, sem executar a
+página), somando o tempo por pacote de primeiro nível:
+
+    python -m src.startup
+    python -m src.startup --top 8 --json startup.json
+"""
+import argparse
+import ast
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+HEAVY_MODULES = (
+    'pandas',
+    'plotly.graph_objects',
+    'plotly.express',
+    'pyarrow',
+    'shapely',
+    'geopandas',
+    'folium',
+    'streamlit_folium',
+    'fpdf',
+    'PIL.Image',
+    'geopy.geocoders',
+)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(ROOT, 'pages')
+APP_PATH = os.path.join(ROOT, 'app.py')
+
+
+# -------------------------------
+# PRÉ-CARGA EM SEGUNDO PLANO
+# -------------------------------
+_warm_times: Dict[str, float] = {}
+_warm_thread: Optional[threading.Thread] = None
+_warm_lock = threading.Lock()
+
+
+def _warm(modules: Iterable[str]) -> None:
+    for name in modules:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue  # dependência opcional ausente: a página que a usa mostra o erro
+        _warm_times[name] = time.perf_counter() - t0
+
+
+def warm_up(modules: Iterable[str] = HEAVY_MODULES) -> threading.Thread:
+    """Importa `modules` numa thread daemon (uma vez por processo) e devolve a thread."""
+    global _warm_thread
+    with _warm_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=_warm, args=(tuple(modules),), name='ooh-warmup', daemon=True)
+            _warm_thread.start()
+    return _warm_thread
+
+
+def warm_up_times() -> Dict[str, float]:
+    """Segundos gastos por módulo na pré-carga (≈0 para os que já estavam carregados)."""
+    return dict(_warm_times)
+
+
+# -------------------------------
+# RELATÓRIO DE IMPORTAÇÃO POR PÁGINA
+# -------------------------------
+def top_level_imports(path: str) -> str:
+    """Código só com as importações de topo do arquivo (incluindo as de blocos try/if de topo)."""
+    with open(path, encoding='utf-8') as fh:
+        tree = ast.parse(fh.read(), filename=path)
+    lines: List[str] = []
+
+    def visit(body):
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                lines.append(ast.unparse(node))
+            elif isinstance(node, ast.Try):
+                for block in [node.body] + [h.body for h in node.handlers] + [node.orelse, node.finalbody]:
+                    visit(block)
+            elif isinstance(node, ast.If):
+                visit(node.body)
+                visit(node.orelse)
+
+    visit(tree.body)
+    return '\n'.join(f"try:\n    {line}\nexcept ImportError:\n    pass" for line in lines)
+
+
+def _parse_importtime(stderr: str) -> Dict[str, float]:
+    """Tempo acumulado (s) por pacote de primeiro nível a partir da saída de `-X importtime`."""
+    totals: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, _, rest = line.partition(':')
+        _self_us, cumulative_us, name = (part for part in rest.split('|'))
+        if name.startswith('  '):  # dependência de outro módulo: já contada no pai
+            continue
+        root = name.strip().split('.')[0]
+        totals[root] = totals.get(root, 0.0) + int(cumulative_us) / 1e6
+    return totals
+
+
+def import_profile(path: str, python: str = sys.executable) -> Tuple[float, Dict[str, float]]:
+    """(tempo total, tempo por pacote) das importações de topo de `path` num interpretador novo."""
+    code = top_level_imports(path)
+    t0 = time.perf_counter()
+    proc = subprocess.run([python, '-X', 'importtime', '-c', code], cwd=ROOT,
+                          capture_output=True, text=True, env={**os.environ, 'PYTHONPATH': ROOT})
+    wall = time.perf_counter() - t0
+    return wall, _parse_importtime(proc.stderr)
+
+
+def startup_report(paths: Optional[Iterable[str]] = None, top: int = 5) -> List[dict]:
+    """Uma linha por página: tempo total de importação e os `top` pacotes mais caros."""
+    if paths is None:
+        pages = sorted(f for f in os.listdir(PAGES_DIR) if f.endswith('.py'))
+        paths = [APP_PATH] + [os.path.join(PAGES_DIR, f) for f in pages]
+    rows = []
+    for path in paths:
+        wall, per_module = import_profile(path)
+        heaviest = sorted(per_module.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        rows.append({
+            'pagina': os.path.relpath(path, ROOT),
+            'total_s': round(wall, 3),
+            'imports_s': round(sum(per_module.values()), 3),
+            'mais_pesados': {name: round(sec, 3) for name, sec in heaviest},
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paginas', nargs='*', help='arquivos a medir (padrão: app.py e pages/*.py)')
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--json', help='grava o relatório neste arquivo')
+    args = parser.parse_args()
+
+    rows = startup_report(args.paginas or None, top=args.top)
+    width = max(len(r['pagina']) for r in rows)
+    for r in rows:
+        heaviest = ', '.join(f"{k} {v:.2f}s" for k, v in r['mais_pesados'].items())
+        print(f"{r['pagina']:<{width}}  {r['total_s']:6.2f}s  ({heaviest})")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(rows, fh, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# src/timing.py - tempos por etapa (spans) sem dependência do Streamlit
+"""
+`span` (context manager) e `timed` (decorador) medem etapas e guardam os
+registros em memória para o painel de debug das páginas.
+
+O log JSONL é opcional: fora do app ele só é gravado com `OOH_TIMINGS_LOG`
+definido; o app (via `src.utils`) chama `enable_log()`, que usa o caminho
+padrão no diretório temporário. `OOH_TIMINGS_LOG=""` desliga nos dois casos.
+Assim o relatório em lote, os workers e os benchmarks medem sem gravar nada.
+"""
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+DEFAULT_LOG = os.path.join(tempfile.gettempdir(), "ooh_timings.jsonl")
+TIMINGS_LOG = os.environ.get("OOH_TIMINGS_LOG", "")
+TIMINGS_MAX_BYTES = 20 << 20   # acima disso o log vira .1 e recomeça
+RECENT_SPANS = 2000            # spans mantidos em memória para o painel
+
+
+def enable_log(path: Optional[str] = None) -> str:
+    """Liga o log JSONL (`path`, ou OOH_TIMINGS_LOG, ou o caminho padrão). Retorna o caminho ('' = desligado)."""
+    global TIMINGS_LOG
+    TIMINGS_LOG = path if path is not None else os.environ.get("OOH_TIMINGS_LOG", DEFAULT_LOG)
+    return TIMINGS_LOG
+
+
+_local = threading.local()
+_recent: deque = deque(maxlen=RECENT_SPANS)
+_log_lock = threading.Lock()
+
+
+def start_run(page: str) -> str:
+    """Marca o início de uma execução da página nesta thread; os spans seguintes levam page/run."""
+    _local.run = {"page": page, "run": uuid.uuid4().hex[:8]}
+    _local.stack = []
+    return _local.run["run"]
+
+
+def current_run() -> Optional[str]:
+    """Id da execução da página nesta thread (None fora de uma execução)."""
+    return (getattr(_local, "run", None) or {}).get("run")
+
+
+def _write_log(record: dict) -> None:
+    if not TIMINGS_LOG:
+        return
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _log_lock:
+        try:
+            with open(TIMINGS_LOG, "a", encoding="utf-8") as fh:
+                fh.write(line)
+                size = fh.tell()
+            if size > TIMINGS_MAX_BYTES:
+                os.replace(TIMINGS_LOG, TIMINGS_LOG + ".1")
+        except OSError:
+            pass  # log é diagnóstico: nunca derruba a página
+
+
+class span:
+    """
+    Mede uma etapa (context manager). Spans aninhados guardam o pai; `set()`
+    anexa atributos (ex.: linhas processadas).
+
+        with span("mapa.overpass", tiles=4) as s:
+            df = tile_cache.get(tiles)
+            s.set(linhas=len(df))
+    """
+
+    def __init__(self, name: str, **attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs) -> "span":
+        self.attrs.update(attrs)
+        return self
+
+    def __enter__(self) -> "span":
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        self.depth = len(stack)
+        stack.append(self)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.t0) * 1000
+        _local.stack.pop()
+        run = getattr(_local, "run", None) or {}
+        record = {
+            "ts": round(time.time(), 3),
+            "stage": self.name,
+            "ms": round(ms, 3),
+            "ok": exc_type is None,
+            "parent": self.parent,
+            "depth": self.depth,
+            "page": run.get("page"),
+            "run": run.get("run"),
+            **self.attrs,
+        }
+        _recent.append(record)
+        _write_log(record)
+        return False
+
+
+def _size(result) -> Optional[int]:
+    if result is None or isinstance(result, (str, bytes, dict)):
+        return None
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorador: cada chamada vira um span (`name` ou módulo.função), com o nº de linhas do resultado."""
+    def decorator(fn: Callable) -> Callable:
+        stage = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage) as s:
+                result = fn(*args, **kwargs)
+                n = _size(result)
+                if n is not None:
+                    s.set(linhas=n)
+                return result
+        return wrapper
+    return decorator
+
+
+def recent_spans(run: Optional[str] = None) -> List[dict]:
+    """Spans em memória (todos, ou só os da execução `run`)."""
+    return [r for r in list(_recent) if run is None or r.get("run") == run]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Percentil com interpolação linear (mesmo critério do numpy.percentile)."""
+    pos = (len(values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def load_timings(path: Optional[str] = None, last: Optional[int] = None) -> List[dict]:
+    """Registros do log JSONL (os `last` mais recentes, se pedido; padrão: o log ativo)."""
+    path = TIMINGS_LOG if path is None else path
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as fh:
+        lines = fh.readlines() if last is None else deque(fh, maxlen=last)
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue  # linha truncada por escrita concorrente
+    return records
+
+
+def timings_summary(records: Optional[Iterable[dict]] = None, path: Optional[str] = None) -> List[dict]:
+    """p50/p95/máx (ms) e nº de chamadas por etapa, da mais lenta (p95) para a mais rápida."""
+    by_stage: Dict[str, List[float]] = {}
+    for r in (load_timings(path) if records is None else records):
+        by_stage.setdefault(r["stage"], []).append(float(r["ms"]))
+    rows = []
+    for stage, values in by_stage.items():
+        values.sort()
+        rows.append({
+            "etapa": stage,
+            "n": len(values),
+            "p50_ms": round(_percentile(values, 50), 1),
+            "p95_ms": round(_percentile(values, 95), 1),
+            "max_ms": round(values[-1], 1),
+        })
+    return sorted(rows, key=lambda r: r["p95_ms"], reverse=True)
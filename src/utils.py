@@ -1,6 +1,14 @@
-# src/utils.py - helpers pequenos (cache, formatação)
+# src/utils.py - helpers pequenos (cache, formatação, painel de tempos por etapa)
+import os
+
 import streamlit as st
 
+from src import timing
+from src.timing import load_timings, recent_spans, span, start_run, timed, timings_summary  # noqa: F401
+
+# No app o log JSONL de tempos fica ligado por padrão (desligue com OOH_TIMINGS_LOG="")
+timing.enable_log()
+
 def get_secret(key, default=None):
     """Tenta ler st.secrets, fallback para None."""
     try:
@@ -20,6 +28,7 @@ def set_page_config_and_style(page_title: str, main_title: str, subtitle: str =
     """
     # 1. Configuração da Página
     st.set_page_config(page_title=page_title, layout="wide")
+    start_run(page_title)
 
     # 2. Título Principal Estilizado
     st.markdown(
@@ -47,3 +56,24 @@ def styled_metric(col, title, value, color):
                 <h2 style="margin:8px 0;">{value}</h2>
             </div>
             """.replace(",", "."), unsafe_allow_html=True)
+
+
+# -------------------------------
+# TEMPOS POR ETAPA (PAINEL)
+# -------------------------------
+def render_debug_panel(last: int = 20000) -> None:
+    """Painel opcional na barra lateral: etapas desta execução e p50/p95 do log."""
+    default = os.environ.get("OOH_DEBUG", "") not in ("", "0")
+    if not st.sidebar.checkbox("⏱️ Tempos por etapa (debug)", value=default, key="debug_timings"):
+        return
+    run = timing.current_run()
+    with st.sidebar.expander("Esta execução", expanded=True):
+        rows = [{"etapa": "  " * r["depth"] + r["stage"], "ms": r["ms"], "linhas": r.get("linhas")}
+                for r in sorted(recent_spans(run), key=lambda r: r["ts"] - r["ms"] / 1000)]
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        else:
+            st.caption("Nenhuma etapa medida (resultados em cache).")
+    with st.sidebar.expander("p50 / p95 por etapa (log)"):
+        st.dataframe(timings_summary(load_timings(last=last)), hide_index=True, use_container_width=True)
+        st.caption(f"Log: {timing.TIMINGS_LOG or 'desligado'}")
@@ -0,0 +1,130 @@
+# src/viewport.py - carregamento de POIs por área visível (tiles) com prefetch em segundo plano
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from src.geocoding import TokenBucket
+
+TILE_DEG = 0.04        # lado do tile em graus (~4,4 km em SP)
+MAX_VIEW_TILES = 16    # acima disso o enquadramento é grande demais para o Overpass
+PREFETCH_RATE = 0.5    # consultas de prefetch por segundo ao Overpass público
+
+Tile = Tuple[int, int]
+
+
+def tile_bbox(tile: Tile, tile_deg: float = TILE_DEG) -> str:
+    """Bbox do tile no formato do Overpass: 'minlat,minlon,maxlat,maxlon'."""
+    i, j = tile
+    return f"{i * tile_deg:.6f},{j * tile_deg:.6f},{(i + 1) * tile_deg:.6f},{(j + 1) * tile_deg:.6f}"
+
+
+def tiles_for_bounds(bounds: dict, tile_deg: float = TILE_DEG) -> List[Tile]:
+    """Tiles que cobrem os bounds do Leaflet ('_southWest'/'_northEast')."""
+    i0 = math.floor(bounds['_southWest']['lat'] / tile_deg)
+    i1 = math.floor(bounds['_northEast']['lat'] / tile_deg)
+    j0 = math.floor(bounds['_southWest']['lng'] / tile_deg)
+    j1 = math.floor(bounds['_northEast']['lng'] / tile_deg)
+    return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+
+def neighbor_tiles(tiles: Iterable[Tile]) -> List[Tile]:
+    """Anel de tiles vizinhos ao redor do conjunto (candidatos a prefetch)."""
+    tiles = set(tiles)
+    ring = {(i + di, j + dj) for i, j in tiles for di in (-1, 0, 1) for dj in (-1, 0, 1)}
+    return sorted(ring - tiles)
+
+
+class TileCache:
+    """
+    Cache LRU de POIs por tile, compartilhado entre sessões (thread-safe).
+
+    - `get(tiles)` devolve os POIs dos tiles pedidos; tiles ausentes são
+      buscados na hora e tiles já em prefetch são aguardados, não refeitos.
+    - Só resultados bem-sucedidos entram no cache: se `fetch_fn` levanta
+      exceção (429, timeout), o tile fica de fora e é buscado de novo no
+      próximo pedido, em vez de ficar vazio até reiniciar o processo.
+    - `prefetch(tiles)` agenda tiles ausentes num pool em segundo plano. Cada
+      consulta de prefetch passa pelo mesmo `TokenBucket` do geocodificador em
+      lote (`prefetch_rate` por segundo), para respeitar o limite de uso do
+      Overpass. Um tile pedido por `get` que ainda está na fila sai dela e é
+      buscado na hora, sem esperar pelo limitador.
+    """
+
+    def __init__(self, fetch_fn: Callable[[str], pd.DataFrame], tile_deg: float = TILE_DEG,
+                 max_tiles: int = 512, max_workers: int = 2, prefetch_rate: float = PREFETCH_RATE):
+        self._fetch = fetch_fn
+        self.tile_deg = tile_deg
+        self.max_tiles = max_tiles
+        self._tiles: "OrderedDict[Tile, pd.DataFrame]" = OrderedDict()
+        self._pending: Dict[Tile, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='poi-prefetch')
+        self._bucket = TokenBucket(prefetch_rate)
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, tile: Tile) -> pd.DataFrame:
+        try:
+            df = self._fetch(tile_bbox(tile, self.tile_deg))
+        except Exception:
+            with self._lock:
+                self._pending.pop(tile, None)
+            raise
+        with self._lock:
+            self._tiles[tile] = df
+            self._tiles.move_to_end(tile)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+            self._pending.pop(tile, None)
+        return df
+
+    def _prefetch_load(self, tile: Tile) -> pd.DataFrame:
+        self._bucket.acquire()
+        return self._load(tile)
+
+    def __contains__(self, tile: Tile) -> bool:
+        with self._lock:
+            return tile in self._tiles
+
+    def get(self, tiles: Iterable[Tile], failed: Optional[List[Tile]] = None) -> pd.DataFrame:
+        """POIs de todos os tiles (sem duplicatas de id); tiles com erro vão para `failed`, se informado."""
+        frames = []
+        for tile in tiles:
+            with self._lock:
+                df = self._tiles.get(tile)
+                future = self._pending.get(tile)
+                if df is not None:
+                    self._tiles.move_to_end(tile)
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if df is None:
+                if future is not None and future.cancel():
+                    future = None  # ainda na fila do prefetch: busca agora
+                try:
+                    df = future.result() if future is not None else self._load(tile)
+                except Exception:
+                    if failed is not None:
+                        failed.append(tile)
+                    continue
+            if not df.empty:
+                frames.append(df)
+        if not frames:
+            return pd.DataFrame()
+        out = pd.concat(frames, ignore_index=True)
+        return out.drop_duplicates(subset='id') if 'id' in out.columns else out
+
+    def prefetch(self, tiles: Iterable[Tile]) -> int:
+        """Agenda em segundo plano os tiles que ainda não estão em cache. Retorna quantos foram agendados."""
+        scheduled = 0
+        with self._lock:
+            for tile in tiles:
+                if tile in self._tiles or tile in self._pending:
+                    continue
+                self._pending[tile] = self._executor.submit(self._prefetch_load, tile)
+                scheduled += 1
+        return scheduled
@@ -0,0 +1,110 @@
+# src/weather_impact.py - audiência horária ajustada pelo clima para todos os pontos OOH
+"""
+Cada ponto recebe a estação INMET mais próxima (KD-tree sobre vetores 3D na
+esfera; scipy quando instalado, busca exata em blocos quando não). A previsão
+horária de todas as estações vira duas matrizes estação x hora (chuva e
+temperatura), o fator de redução de fluxo é calculado de uma vez para
+estações x horas e indexado pelos pontos:
+
+    fator[ponto, hora] = fator_estacao[estacao_do_ponto, hora]
+    audiencia[ponto, hora] = audiencia_base[ponto] * participacao[hora] * fator[ponto, hora]
+
+Sem laços em Python por ponto ou por hora.
+"""
+from datetime import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Estações automáticas do INMET (código, nome, cidade, lat, lon)
+STATIONS = pd.DataFrame([
+    ('A701', 'São Paulo - Mirante de Santana', 'São Paulo', -23.4963, -46.6200),
+    ('A771', 'São Paulo - Interlagos', 'São Paulo', -23.7244, -46.6776),
+    ('A755', 'Barueri', 'São Paulo', -23.5239, -46.8694),
+    ('A652', 'Rio de Janeiro - Forte de Copacabana', 'Rio de Janeiro', -22.9883, -43.1903),
+    ('A636', 'Rio de Janeiro - Jacarepaguá', 'Rio de Janeiro', -22.9400, -43.4028),
+    ('A521', 'Belo Horizonte - Pampulha', 'Belo Horizonte', -19.8836, -43.9697),
+], columns=['codigo', 'nome', 'cidade', 'lat', 'lon'])
+
+MIN_FACTOR = 0.8         # no mínimo 80% do fluxo
+RAIN_PENALTY = 0.05      # -5% por mm/h de chuva
+HEAT_THRESHOLD = 25.0    # °C
+HEAT_PENALTY = 0.01      # -1% por °C acima do limiar
+CHUNK = 65_536           # pontos por bloco na busca sem scipy
+
+
+def _unit_vectors(lats, lons) -> np.ndarray:
+    """lat/lon -> vetores unitários 3D (distância euclidiana monotônica com a distância na esfera)."""
+    la, lo = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lons, dtype=float))
+    return np.column_stack([np.cos(la) * np.cos(lo), np.cos(la) * np.sin(lo), np.sin(la)])
+
+
+def nearest_station(lats, lons, stations: pd.DataFrame = STATIONS) -> np.ndarray:
+    """Índice (linha de `stations`) da estação mais próxima de cada ponto."""
+    pts = _unit_vectors(lats, lons)
+    ref = _unit_vectors(stations['lat'], stations['lon'])
+    try:
+        from scipy.spatial import cKDTree
+        return cKDTree(ref).query(pts)[1].astype(np.int64)
+    except ImportError:
+        out = np.empty(len(pts), dtype=np.int64)
+        for start in range(0, len(pts), CHUNK):
+            block = pts[start:start + CHUNK]
+            out[start:start + CHUNK] = np.argmax(block @ ref.T, axis=1)  # maior cosseno = menor distância
+        return out
+
+
+def hourly_forecast(stations: pd.DataFrame = STATIONS, start: Optional[datetime] = None,
+                    hours: int = 24) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    """
+    Previsão horária simulada (substituível por uma API de previsão) para todas as
+    estações: (horários, temperatura[estação, hora], chuva mm/h[estação, hora]).
+    A primeira estação reproduz a curva da página de Clima; as demais têm a
+    janela de chuva deslocada e pequenas diferenças de temperatura.
+    """
+    start = start or datetime.now().replace(minute=0, second=0, microsecond=0)
+    times = pd.date_range(start, periods=hours, freq='h')
+    k = np.arange(len(stations))[:, None]
+    h = np.arange(hours)[None, :]
+
+    temp = 18.0 + (h % 10) + (k % 3) * 0.5
+    hr = h - (k % 3)  # deslocamento da chuva da tarde por estação
+    rain = np.where((hr >= 14) & (hr <= 18) & (hr % 2 == 0), 2 + hr / 4, 0.0)
+    return times, np.broadcast_to(temp, rain.shape).astype(float), rain.astype(float)
+
+
+def reduction_factor(rain: np.ndarray, temp: np.ndarray) -> np.ndarray:
+    """Fator de fluxo OOH (1 = sem redução) para arrays de chuva (mm/h) e temperatura (°C)."""
+    factor = 1.0 - rain * RAIN_PENALTY - np.where(temp > HEAT_THRESHOLD, (temp - HEAT_THRESHOLD) * HEAT_PENALTY, 0.0)
+    return np.maximum(MIN_FACTOR, factor)
+
+
+def condition_labels(rain: np.ndarray, hours: np.ndarray) -> np.ndarray:
+    """Rótulos de condição ('Sol', 'Nublado', 'Chuvisco', 'Chuva Forte') da previsão."""
+    return np.select(
+        [rain > 4, rain > 0, (hours >= 6) & (hours <= 9)],
+        ['Chuva Forte', 'Chuvisco', 'Nublado'],
+        default='Sol',
+    )
+
+
+def portfolio_impact(df_points: pd.DataFrame, audience_col: str, lat_col: str = 'Latitude',
+                     lon_col: str = 'Longitude', stations: pd.DataFrame = STATIONS,
+                     start: Optional[datetime] = None, hours: int = 24,
+                     hourly_share: Optional[np.ndarray] = None) -> dict:
+    """
+    Audiência horária ajustada pelo clima de todos os pontos.
+    `hourly_share` distribui a audiência diária nas horas (padrão: uniforme).
+    Retorna {'times', 'station' (índice por ponto), 'factor' e 'audience' (pontos x horas)}.
+    """
+    station = nearest_station(df_points[lat_col].to_numpy(), df_points[lon_col].to_numpy(), stations)
+    times, temp, rain = hourly_forecast(stations, start, hours)
+    factor = reduction_factor(rain, temp)[station]
+
+    share = np.full(24, 1 / 24) if hourly_share is None else np.asarray(hourly_share, dtype=float) / np.sum(hourly_share)
+    share_h = share[times.hour.to_numpy()]
+    base = df_points[audience_col].to_numpy(dtype=float)
+    audience = base[:, None] * share_h[None, :] * factor
+    return {'times': times, 'station': station, 'factor': factor, 'audience': audience,
+            'baseline': base[:, None] * share_h[None, :]}
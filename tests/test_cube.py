@@ -0,0 +1,68 @@
+# tests/test_cube.py - o cubo deve responder igual ao pandas sobre as linhas
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cube import AggregateCube
+
+W = 0.5
+
+
+def _frame(rng, n):
+    cpm = np.round(rng.uniform(0, 10, n), int(rng.integers(0, 3)))  # muitos valores sobre a grade
+    cpm[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        'Tipo': rng.choice(['Outdoor', 'Digital', 'Mobiliário'], n),
+        'CPM': cpm,
+        'Investimento': rng.gamma(2.0, 5_000.0, n),
+    })
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_ranges_match_pandas(seed):
+    rng = np.random.default_rng(seed)
+    df = _frame(rng, int(rng.integers(1, 300)))
+    cube = AggregateCube.from_frame(df, ['Tipo', 'CPM'], ['Investimento', 'CPM'], {'CPM': W})
+
+    lo = None if rng.random() < 0.3 else float(rng.integers(0, 21)) * W
+    hi = None if rng.random() < 0.3 else float(rng.integers(0, 21)) * W
+    tipos = list(rng.choice(['Outdoor', 'Digital', 'Mobiliário'], int(rng.integers(1, 4)), replace=False))
+
+    mask = df['Tipo'].isin(tipos) & df['CPM'].notna()
+    if lo is not None:
+        mask &= df['CPM'] >= lo
+    if hi is not None:
+        mask &= df['CPM'] <= hi
+    expected = df[mask]
+
+    got = cube.agg(equals={'Tipo': tipos}, ranges={'CPM': (lo, hi)},
+                   total=('Investimento', 'sum'), media=('CPM', 'mean'))
+    assert got['linhas'] == len(expected)
+    assert got['total'] == pytest.approx(expected['Investimento'].sum(), rel=1e-9, abs=1e-6)
+    if len(expected):
+        assert got['media'] == pytest.approx(expected['CPM'].mean(), rel=1e-9)
+
+
+def test_bound_equal_to_value_is_inclusive():
+    df = pd.DataFrame({'Tipo': ['a'] * 6, 'CPM': [0.5, 1.0, 1.0, 1.0, 1.0, 1.5], 'Investimento': 1.0})
+    cube = AggregateCube.from_frame(df, ['Tipo', 'CPM'], ['Investimento'], {'CPM': W})
+    assert cube.agg(ranges={'CPM': (1.0, 1.0)})['linhas'] == 4
+    assert cube.agg(ranges={'CPM': (0.5, 1.0)})['linhas'] == 5
+
+
+def test_bound_off_grid_is_rejected():
+    df = pd.DataFrame({'Tipo': ['a'], 'CPM': [1.2], 'Investimento': 1.0})
+    cube = AggregateCube.from_frame(df, ['Tipo', 'CPM'], ['Investimento'], {'CPM': W})
+    with pytest.raises(ValueError):
+        cube.agg(ranges={'CPM': (None, 1.3)})
+
+
+def test_group_by_binned_dimension_matches_bins():
+    rng = np.random.default_rng(1)
+    df = _frame(rng, 500).dropna()
+    cube = AggregateCube.from_frame(df, ['Tipo', 'CPM'], ['Investimento'], {'CPM': W})
+    got = cube.agg(by='CPM', total=('Investimento', 'sum'))
+    faixa = np.ceil(df['CPM'] / W - 1e-9) * W  # faixa ((k-1)*w, k*w]
+    expected = df.groupby(faixa)['Investimento'].sum()
+    assert got['CPM'].tolist() == pytest.approx(expected.index.tolist())
+    assert got['total'].tolist() == pytest.approx(expected.tolist())
@@ -0,0 +1,42 @@
+# tests/test_gazetteer.py - endereços com número não podem virar o centróide da rua
+import pandas as pd
+import pytest
+
+from src.gazetteer import Gazetteer
+from src.geocoding import BulkGeocoder, GeocodeCache
+
+
+@pytest.fixture
+def gazetteer():
+    return Gazetteer(pd.DataFrame({
+        'name': ['Rua Augusta', 'Rua da Consolação', 'Pinheiros'],
+        'lat': [-23.554, -23.550, -23.565],
+        'lon': [-46.658, -46.650, -46.692],
+        'kind': ['rua', 'rua', 'distrito'],
+    }))
+
+
+@pytest.mark.parametrize('address', ['Rua Augusta, 1500', 'Rua da Consolação 2000', 'R. Augusta 10, São Paulo'])
+def test_resolve_numbered_address_is_miss(gazetteer, address):
+    assert gazetteer.resolve(address) is None
+    assert gazetteer.resolve(address, min_score=0.4) is None
+
+
+def test_resolve_names_without_number(gazetteer):
+    assert gazetteer.resolve('Rua Augusta')['name'] == 'Rua Augusta'
+    assert gazetteer.resolve('pinheiros, São Paulo')['name'] == 'Pinheiros'
+    assert gazetteer.resolve('Consolação', min_score=0.9)['name'] == 'Rua da Consolação'
+
+
+def test_bulk_geocoder_numbered_address_goes_to_service(gazetteer, tmp_path):
+    calls = []
+
+    def service(address):
+        calls.append(address)
+        return (-23.5601, -46.6589)
+
+    geocoder = BulkGeocoder(service, GeocodeCache(str(tmp_path / 'cache.sqlite')), rate=1000, gazetteer=gazetteer)
+    assert geocoder.geocode('Rua Augusta, 1500') == (-23.5601, -46.6589)
+    assert geocoder.geocode('Rua Augusta') == (-23.554, -46.658)
+    assert calls == ['Rua Augusta, 1500']
+    assert geocoder.stats['gazetteer_hits'] == 1